@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Cold and warm loads of high resolution ldt file through parse cache.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_cache
+
+"""
+
+
+import os
+import tempfile
+
+from phfile import LDT
+from phfile.cache import ParseCache
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'large.ldt')
+        with open(path, 'w') as f:
+            f.write(synthetic_ldt())
+        cache = ParseCache(directory=os.path.join(tmp_dir, 'cache'))
+        report('load, no cache', lambda: LDT().load(path))
+        LDT().load(path, cache=cache)
+        report('load, memory hit', lambda: LDT().load(path, cache=cache))
+
+        def disk():
+            # new process finds only sidecar
+            return LDT().load(path, cache=ParseCache(
+                directory=os.path.join(tmp_dir, 'cache')))
+
+        report('load, disk hit', disk)
+
+
+if __name__ == '__main__':
+    main()
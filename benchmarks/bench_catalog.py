@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Full scan and incremental rescans of directory of ldt files.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_catalog
+
+"""
+
+
+import os
+import tempfile
+
+from phfile.catalog import Catalog
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = os.path.join(tmp_dir, 'files')
+        os.makedirs(directory)
+        text = synthetic_ldt(distance_dc=5, distance_dg=2.5)
+        for i in range(200):
+            with open(os.path.join(directory, '%s.ldt' % i), 'w') as f:
+                f.write(text.replace('Benchmark luminaire',
+                                     'luminaire %s' % i))
+        report('scan, 200 files',
+               lambda: Catalog().scan(directory), number=1)
+        report('scan, 200 files, 4 processes',
+               lambda: Catalog().scan(directory, processes=4), number=1)
+        catalog = Catalog()
+        catalog.scan(directory)
+        report('rescan, unchanged', lambda: catalog.scan(directory))
+
+        def touched():
+            # modification time changes, content does not
+            for i in range(200):
+                os.utime(os.path.join(directory, '%s.ldt' % i))
+            return catalog.scan(directory)
+
+        report('rescan, touched', touched, number=1)
+        report('query', lambda: catalog.paths(color_temp=4000,
+                                              flux=(500, None)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Conversion time of high resolution ldt files to ies.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_convert
+
+"""
+
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    for symmetry in range(0, 5):
+        ldt = LDT().loads(synthetic_ldt(symmetry=symmetry))
+        report('LDT.to_ies, symmetry %s %s' % (
+                   symmetry, ldt.item('luminous_intensities').shape),
+               ldt.to_ies)
+
+
+if __name__ == '__main__':
+    main()
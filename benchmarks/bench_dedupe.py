@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Deduplication of light distributions of catalogue.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_dedupe
+
+"""
+
+
+from phfile import LDT
+from phfile.dedupe import DistributionIndex
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    texts = [synthetic_ldt(symmetry, distance_dc, 2.5)
+             for symmetry in (0, 2, 4) for distance_dc in (5, 10, 15)]
+    ldts = [LDT().loads(texts[i % len(texts)]) for i in range(2000)]
+    best = report('index 2000 files',
+                  lambda: DistributionIndex().update(enumerate(ldts)),
+                  number=1)
+    print('%-40s %10.0f files/s' % ('', 2000 / best))
+
+
+if __name__ == '__main__':
+    main()
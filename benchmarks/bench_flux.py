@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Flux integration of single files and of catalogue batches.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_flux
+
+"""
+
+
+import numpy as np
+
+from phfile import LDT
+from phfile.flux import direct_ratios_batch, integrate_batch
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    ldt = LDT().loads(synthetic_ldt())
+    document = ldt.document
+    report('flux single %s' % (document['luminous_intensities'].shape, ),
+           # set() drops cached flux table
+           lambda: ldt.set().flux())
+    templates = [LDT().loads(synthetic_ldt(symmetry=symmetry,
+                                           distance_dc=15,
+                                           distance_dg=2.5))
+                 for symmetry in range(0, 5)]
+    ldts = [templates[i % 5] for i in range(5000)]
+    report('flux batch 5000 files', lambda: integrate_batch(ldts), number=1)
+    report('direct ratios batch 5000 files',
+           lambda: direct_ratios_batch(ldts), number=1)
+    tables = integrate_batch(ldts)
+    theta = np.linspace(0, 180, 10 ** 6)
+    report('cone flux 1e6 queries', lambda: tables[0].cone(theta), number=1)
+
+
+if __name__ == '__main__':
+    main()
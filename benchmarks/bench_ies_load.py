@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Load time of high resolution ies files.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_ies_load
+
+"""
+
+
+from phfile import IES
+
+from .common import report, synthetic_ies
+
+
+def main():
+    """Run benchmark."""
+    data = synthetic_ies().encode()
+    ies = IES().loads(data)
+    print('%s x %s ies file' % (ies.item('number_of_horizontal_angles'),
+                                ies.item('number_of_vertical_angles')))
+    report('IES.loads', lambda: IES().loads(data))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Point by point illuminance of 500 x 500 grid.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_illuminance
+
+"""
+
+
+from phfile import LDT
+from phfile.illuminance import Luminaire, grid_points
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    x, y = grid_points(40, 40, 500, 500, origin=(-20, -20))
+    luminaire = Luminaire(LDT().loads(synthetic_ldt(distance_dc=5,
+                                                    distance_dg=2.5)),
+                          (0, 0, 8), rotation=15, tilt=10)
+    for kind in ('horizontal', 'vertical', 'cylindrical'):
+        best = report('illuminance %s 500x500' % kind,
+                      lambda: luminaire.illuminance(x, y, kind=kind),
+                      number=1)
+        print('%-40s %10.2f Mpoints/s' % ('', x.size / best / 1e6))
+
+
+if __name__ == '__main__':
+    main()
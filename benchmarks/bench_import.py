@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Import time of phfile package.
+
+Uses `python -X importtime`, cumulative times of the slowest modules
+imported by each statement are printed.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_import
+
+"""
+
+
+import subprocess
+import sys
+
+
+STATEMENTS = (
+    'import phfile',
+    'from phfile import LDT',
+    'from phfile import IES',
+)
+
+
+def import_times(statement):
+    """Return cumulative import times of modules.
+
+    Args:
+        statement (str): python statement
+
+    Returns --
+        (dict): module name to cumulative import time in microseconds,
+            total time of statement under None key
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime',
+                             '-c', statement],
+                            check=True,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True).stderr
+    times = {None: 0}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+        # top level imports are indented with single space
+        if not name.startswith('  '):
+            times[None] += int(cumulative)
+    return times
+
+
+def main():
+    """Run benchmark."""
+    for statement in STATEMENTS:
+        times = import_times(statement)
+        print('%-40s %10.1f ms' % (statement, times[None] / 1000))
+        for heavy in ('numpy', 'cerberus', 'matplotlib'):
+            if heavy in times:
+                print('    %-36s %10.1f ms' % (heavy, times[heavy] / 1000))
+
+
+if __name__ == '__main__':
+    main()
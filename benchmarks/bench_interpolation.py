@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Interpolation of intensities at arbitrary directions.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_interpolation
+
+"""
+
+
+import numpy as np
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    rng = np.random.default_rng(0)
+    c = rng.uniform(0, 360, 10 ** 6)
+    gamma = rng.uniform(0, 180, 10 ** 6)
+    for symmetry in (0, 2, 4):
+        ldt = LDT().loads(synthetic_ldt(symmetry=symmetry, distance_dc=5,
+                                        distance_dg=2.5))
+        for method in ('linear', 'cubic'):
+            report('LDT.intensity_at 1e6, symmetry %s %s'
+                   % (symmetry, method),
+                   lambda: ldt.intensity_at(c, gamma, method), number=1)
+    angles = LDT().loads(synthetic_ldt(distance_dc=5, distance_dg=2.5))
+    angles_g = angles.item('angles_g').copy()
+    angles_g[1] += .5
+    angles.set(angles_g=angles_g)
+    report('LDT.intensity_at 1e6, non-uniform gamma',
+           lambda: angles.intensity_at(c, gamma), number=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Load time of high resolution ldt files.
+
+Compares LDT.load (bulk float64 parsing) with per-element Cerberus
+coercion of the same values, which is how intensities used to be stored.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_load
+
+"""
+
+
+import os
+import tempfile
+
+import cerberus
+
+from phfile import LDT
+from phfile.schemas import _to_float
+
+from .common import report, synthetic_ldt
+
+
+_per_element_schema = {
+    'luminous_intensities': {
+        'schema': {'coerce': (str, _to_float), 'type': 'float'},
+        'type': 'list',
+    },
+}
+
+
+def main():
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for decimal_comma in (False, True):
+            path = os.path.join(tmp_dir, 'large.ldt')
+            with open(path, 'w') as f:
+                f.write(synthetic_ldt(decimal_comma=decimal_comma))
+            ldt = LDT().load(path)
+            intensities = [str(i) for i
+                           in ldt.item('luminous_intensities').ravel()]
+            print('360 x 181 (%s values), decimal %s'
+                  % (len(intensities), 'comma' if decimal_comma else 'point'))
+            report('LDT.load', lambda: LDT().load(path))
+            validator = cerberus.Validator(_per_element_schema)
+            report('per-element coercion (intensities only)',
+                   lambda: validator.validate({
+                       'luminous_intensities': intensities,
+                   }), number=1)
+
+
+if __name__ == '__main__':
+    main()
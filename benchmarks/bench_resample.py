@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Resampling of many files sharing angle grid.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_resample
+
+"""
+
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    text = synthetic_ldt(distance_dc=5, distance_dg=2.5)
+    ldts = [LDT().loads(text) for _ in range(1000)]
+
+    def run():
+        for ldt in ldts:
+            ldt.resample(15, 5).resample(5, 2.5)
+
+    best = report('resample 1000 files twice', run, number=1)
+    print('%-40s %10.0f files/s' % ('', 2000 / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Sweep of road lighting installations.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_road
+
+"""
+
+
+from phfile import LDT
+from phfile.road import RTable, Road, sweep
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    ldt = LDT().loads(synthetic_ldt(distance_dc=5, distance_dg=2.5))
+    road = Road(RTable.lambertian(), lanes=2, lane_width=3.5)
+    spacings, heights = range(20, 50, 2), (6, 8, 10, 12)
+    overhangs, tilts = (0, 1, 2), (0, 5, 10, 15)
+    number = len(spacings) * len(heights) * len(overhangs) * len(tilts)
+    best = report('road sweep, %s installations' % number,
+                  lambda: sweep(ldt, road, spacings, heights, overhangs,
+                                tilts),
+                  number=1)
+    print('%-40s %10.0f installations/s' % ('', number / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Full load and header only load of high resolution ldt file.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_scan
+
+"""
+
+
+import os
+import tempfile
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'large.ldt')
+        with open(path, 'w') as f:
+            f.write(synthetic_ldt())
+        report('load', lambda: LDT().load(path))
+        report('load, header only',
+               lambda: LDT().load(path, header_only=True).item('company'))
+        report('load, header only, then arrays',
+               lambda: LDT().load(path, header_only=True)
+               .item('luminous_intensities'))
+
+
+if __name__ == '__main__':
+    main()
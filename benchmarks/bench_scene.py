@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Illuminance of site lit by 10000 luminaires.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_scene
+
+"""
+
+
+import numpy as np
+
+from phfile import LDT
+from phfile.illuminance import Luminaire, grid_points
+from phfile.scene import Scene
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    ldts = [LDT().loads(synthetic_ldt(symmetry=symmetry, distance_dc=15,
+                                      distance_dg=2.5))
+            for symmetry in (0, 2, 4)]
+    rng = np.random.default_rng(0)
+    positions = np.column_stack((rng.uniform(0, 1000, 10000),
+                                 rng.uniform(0, 1000, 10000),
+                                 rng.uniform(6, 10, 10000)))
+    scene = Scene(cutoff=1.)
+    for i, position in enumerate(positions):
+        scene.add(ldts[i % 3], position, rotation=rng.uniform(0, 360))
+    x, y = grid_points(1000, 1000, 250, 250)
+    best = report('scene 10000 luminaires, 250x250 points',
+                  lambda: scene.illuminance(x, y), number=1, repeat=1)
+    report('scene, 4 processes',
+           lambda: scene.illuminance(x, y, chunk_size=16384, processes=4),
+           number=1, repeat=1)
+    naive = report('all pairs, 10 of 10000 luminaires',
+                   lambda: [Luminaire(ldts[i % 3], positions[i])
+                            .illuminance(x, y) for i in range(10)],
+                   number=1, repeat=1)
+    print('%-40s %10.1f x' % ('speedup over all pairs',
+                               naive * 1000 / best))
+
+
+if __name__ == '__main__':
+    main()
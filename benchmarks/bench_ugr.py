@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""UGR tables of many luminaires.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_ugr
+
+"""
+
+
+from phfile import LDT
+from phfile.ugr import ugr_tables
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    text = synthetic_ldt(distance_dc=15, distance_dg=5)
+    ldts = [LDT().loads(text) for _ in range(200)]
+    best = report('ugr tables, 200 luminaires',
+                  lambda: ugr_tables(ldts), number=1)
+    print('%-40s %10.0f tables/s' % ('', 200 / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Validation time of high resolution ldt document.
+
+Compares compiled validator with cerberus based reference validator.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_validate
+
+"""
+
+
+import os
+import tempfile
+
+from phfile import LDT
+from phfile.schemas import ldt_schema
+from phfile.validator import CompiledValidator, Validator
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'large.ldt')
+        with open(path, 'w') as f:
+            f.write(synthetic_ldt())
+        document = LDT().load(path).document
+    for name, validator in (('compiled', CompiledValidator(ldt_schema)),
+                            ('cerberus (strict)', Validator(ldt_schema))):
+        report('%s, full document' % name,
+               lambda: validator.validate(document))
+        report('%s, single header item' % name,
+               lambda: validator.validate({'luminaire_name': 'name'},
+                                          update=True))
+
+
+if __name__ == '__main__':
+    main()
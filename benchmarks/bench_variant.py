@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Variants of single measured file.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_variant
+
+"""
+
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    text = synthetic_ldt(distance_dc=5, distance_dg=2.5)
+    base = LDT().loads(text)
+    report('500 loaded copies, text',
+           lambda: [LDT().loads(text).set(luminaire_name='%s' % i).text
+                    for i in range(500)],
+           number=1)
+    report('500 variants, text',
+           lambda: [base.variant(luminaire_name='%s' % i).text
+                    for i in range(500)],
+           number=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Text of loaded high resolution ldt file with changed header.
+
+Run from repository root:
+
+    $ python -m benchmarks.bench_write
+
+"""
+
+
+from phfile import LDT
+
+from .common import report, synthetic_ldt
+
+
+def main():
+    """Run benchmark."""
+    text = synthetic_ldt()
+    ldt = LDT().loads(text)
+    rendered = LDT().set(**ldt.document)
+
+    def run(ldt):
+        # the first text after load, numeric block is not cached yet
+        ldt._text_block = (None, None)
+        return ldt.set(luminaire_name='changed').text
+
+    report('text, rendered', lambda: run(rendered))
+    report('text, passthrough', lambda: run(ldt))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Common helpers for benchmarks.
+
+"""
+
+
+import math
+import timeit
+
+
+def synthetic_ldt(symmetry=0, distance_dc=1, distance_dg=1.0,
+                  decimal_comma=False):
+    """Return text of synthetic ldt file.
+
+    Args:
+        symmetry (int, optional): symmetry indicator
+        distance_dc (int, optional): distance between C-planes
+        distance_dg (float, optional): distance between gammas
+        decimal_comma (bool, optional): use ',' as decimal separator
+
+    Returns --
+        (str): ldt document
+    """
+    number_mc = 360 // distance_dc
+    number_ng = int(180 / distance_dg) + 1
+    mc1, mc2 = {
+        0: (1, number_mc),
+        1: (1, 1),
+        2: (1, number_mc // 2 + 1),
+        3: (3 * number_mc // 4 + 1, 5 * number_mc // 4 + 1),
+        4: (1, number_mc // 4 + 1),
+    }[symmetry]
+    angles_c = [i * distance_dc for i in range(number_mc)]
+    angles_g = [i * distance_dg for i in range(number_ng)]
+    intensities = [
+        round(300 * max(math.cos(math.radians(g)), 0)
+              * (1 + .25 * math.cos(
+                  math.radians(angles_c[(c - 1) % number_mc]))) + .5, 3)
+        for c in range(mc1, mc2 + 1)
+        for g in angles_g
+    ]
+    lines = [
+        'Benchmark INC', '1', str(symmetry), str(number_mc),
+        str(distance_dc), str(number_ng), str(distance_dg), 'report',
+        'Benchmark luminaire', '1', 'benchmark.ldt', 'bench', '100', '100',
+        '50', '90', '90', '0', '0', '0', '0', '100', '85', '1', '0', '1',
+        '1', 'LED', '1000', '4000', '80', '10',
+    ]
+    block = '\n'.join(['0.5'] * 10
+                      + list(map(str, angles_c + angles_g + intensities)))
+    if decimal_comma:
+        block = block.replace('.', ',')
+    return '\n'.join(lines + [block])
+
+
+def synthetic_ies(distance_h=1.0, distance_v=1.0):
+    """Return text of synthetic ies file.
+
+    Args:
+        distance_h (float, optional): distance between horizontal angles
+        distance_v (float, optional): distance between vertical angles
+
+    Returns --
+        (str): ies document
+    """
+    angles_h = [i * distance_h for i in range(int(360 / distance_h) + 1)]
+    angles_v = [i * distance_v for i in range(int(180 / distance_v) + 1)]
+    candela_values = [
+        round(300 * max(math.cos(math.radians(v)), 0)
+              * (1 + .25 * math.cos(math.radians(h))) + .5, 3)
+        for h in angles_h
+        for v in angles_v
+    ]
+
+    def wrapped(values):
+        values = list(map(str, values))
+        return '\n'.join(' '.join(values[i:i + 10])
+                         for i in range(0, len(values), 10))
+
+    return '\n'.join([
+        'IESNA:LM-63-2002', '[TEST] bench', '[MANUFAC] Benchmark INC',
+        'TILT=NONE',
+        '1 1000 1.0 %s %s 1 2 0.1 0.1 0.0' % (len(angles_v), len(angles_h)),
+        '1.0 1 10.0',
+        wrapped(angles_v), wrapped(angles_h), wrapped(candela_values),
+    ])
+
+
+def report(name, func, number=5, repeat=3):
+    """Time func and print best time per call.
+
+    Args:
+        name (str): benchmark name
+        func (callable): timed function
+        number (int, optional): calls per measurement
+        repeat (int, optional): number of measurements
+
+    Returns --
+        (float): best time per call in seconds
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print('%-40s %10.3f ms' % (name, best * 1000))
+    return best
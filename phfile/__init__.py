@@ -7,7 +7,35 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 """
 
 
+import importlib
+
 from .exceptions import PhotometryValidationError
-from .ies import IES
-from .ldt import LDT
 from .utils import safe_filename
+
+# LDT and IES are imported on first access (numpy is not needed
+# by workers which import only exceptions or utils)
+_lazy_attributes = {
+    'IES': '.ies',
+    'LDT': '.ldt',
+}
+
+__all__ = [
+    'IES',
+    'LDT',
+    'PhotometryValidationError',
+    'safe_filename',
+]
+
+
+def __getattr__(name):
+    """Import lazy attributes on first access."""
+    if name in _lazy_attributes:
+        module = importlib.import_module(_lazy_attributes[name], __name__)
+        globals()[name] = getattr(module, name)
+        return globals()[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    """Return list of module attributes including lazy ones."""
+    return sorted(list(globals().keys()) + list(_lazy_attributes.keys()))
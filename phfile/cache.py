@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Parse cache of ldt files.
+
+Loaded state of files (validated document and original text of items)
+is kept on two levels:
+
+    memory - LRU of states bounded by bytes, warm load shares arrays
+             of cached state read-only (see LDT.variant)
+    disk   - binary sidecar per file: JSON header with header items
+             and lamps followed by raw float64 arrays, read with mmap,
+             least recently used sidecars are removed over size limit
+
+Entries are keyed by real path, modification time and size of file,
+sidecars keep hash of file content, which is checked on request.
+Cached state is validated when file is parsed, so warm load neither
+parses nor validates.
+
+"""
+
+
+import collections
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+
+MAGIC = b'PHFCACHE'
+VERSION = 2
+
+_ARRAYS = ('direct_ratios', 'angles_c', 'angles_g', 'luminous_intensities')
+
+
+def _state_size(document, source, layout):
+    """Return approximate size of cached state in bytes."""
+    return 1024 + sum(document[item].nbytes for item in _ARRAYS
+                      if item in document)\
+        + sum(len(text) for item, (value, text) in source.items()
+              if item in _ARRAYS)
+
+
+class ParseCache(object):
+    """Two-level cache of parsed ldt files.
+
+    Counters of hits (memory and disk), misses and evictions are kept
+    in stats. Thread-safe.
+    """
+
+    __slots__ = (
+        '_entries',
+        '_lock',
+        '_size',
+        'counters',
+        'directory',
+        'max_bytes',
+        'max_disk_bytes',
+        'verify',
+    )
+
+    def __init__(self, max_bytes=64 << 20, directory=None,
+                 max_disk_bytes=None, verify=False):
+        """Class constructor.
+
+        Args:
+            max_bytes (int, optional): limit of memory level in bytes
+            directory (str, optional): directory of sidecars, without it
+                only memory level is used
+            max_disk_bytes (int, optional): limit of disk level in bytes,
+                unlimited by default
+            verify (bool, optional): check hash of file content on disk
+                hit, file is read but not parsed
+        """
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.counters = collections.Counter()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.verify = verify
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def stats(self):
+        """Return counters.
+
+        Returns --
+            (dict): hits, disk_hits, misses, evictions, entries and bytes
+                of memory level
+        """
+        with self._lock:
+            return {
+                'hits': self.counters['hits'],
+                'disk_hits': self.counters['disk_hits'],
+                'misses': self.counters['misses'],
+                'evictions': self.counters['evictions'],
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+    def _sidecar(self, path):
+        """Return path of sidecar of file."""
+        name = hashlib.blake2b(path.encode('utf-8'),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + '.phc')
+
+    def _remember(self, key, state):
+        """Put state to memory level evicting least recently used."""
+        size = _state_size(*state)
+        with self._lock:
+            previous = self._entries.pop(key[0], None)
+            if previous is not None:
+                self._size -= previous[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key[0]] = (key, state, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._size -= self._entries.popitem(last=False)[1][2]
+                self.counters['evictions'] += 1
+
+    def _recall(self, key):
+        """Return state from memory level or None."""
+        with self._lock:
+            entry = self._entries.get(key[0])
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(key[0])
+            self.counters['hits'] += 1
+            return entry[1]
+
+    def load(self, ldt, path, encoding=None):
+        """Load ldt file through cache.
+
+        Args:
+            ldt (obj): LDT object to load file into
+            path (str): path to ldt file
+            encoding (str, optional): encoding of text items
+
+        Returns --
+            (obj): ldt
+        """
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, encoding)
+        state = self._recall(key)
+        if state is None and self.directory:
+            state = self._read(key)
+            if state is not None:
+                self._remember(key, state)
+                with self._lock:
+                    self.counters['disk_hits'] += 1
+        if state is not None:
+            return ldt._restore(*state)
+        with open(path, 'rb') as f:
+            data = f.read()
+        ldt.loads(data, encoding)
+        state = ldt._state()
+        self._remember(key, state)
+        with self._lock:
+            self.counters['misses'] += 1
+        if self.directory:
+            self._write(key, hashlib.blake2b(data).hexdigest(), *state)
+        return ldt
+
+    def invalidate(self, path=None):
+        """Remove file or all files from cache.
+
+        Args:
+            path (str, optional): path to ldt file, by default all
+                entries and sidecars are removed
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                entry = self._entries.pop(os.path.realpath(path), None)
+                if entry is not None:
+                    self._size -= entry[2]
+        if not self.directory:
+            return
+        if path is None:
+            sidecars = [os.path.join(self.directory, name)
+                        for name in os.listdir(self.directory)
+                        if name.endswith('.phc')]
+        else:
+            sidecars = [self._sidecar(os.path.realpath(path))]
+        for sidecar in sidecars:
+            try:
+                os.remove(sidecar)
+            except FileNotFoundError:
+                pass
+
+    def _read(self, key):
+        """Return state from sidecar or None if it is missing or stale."""
+        sidecar = self._sidecar(key[0])
+        try:
+            with open(sidecar, 'rb') as f,\
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:8] != MAGIC:
+                    return None
+                length, = struct.unpack('<Q', mm[8:16])
+                header = json.loads(mm[16:16 + length].decode('utf-8'))
+                start = 16 + length + -(16 + length) % 8
+                if header['version'] != VERSION\
+                        or header['key'] != list(key):
+                    return None
+                if self.verify:
+                    with open(key[0], 'rb') as source:
+                        digest = hashlib.blake2b(source.read()).hexdigest()
+                    if digest != header['hash']:
+                        return None
+                document = header['items']
+                # arrays are copied, so mmap can be closed
+                for item, (offset, shape) in header['arrays'].items():
+                    document[item] = np.frombuffer(
+                        mm, dtype='<f8', count=int(np.prod(shape)),
+                        offset=start + offset).reshape(shape).copy()
+                    document[item].flags.writeable = False
+                source = {item: (value, text) for item, (value, text)
+                          in header['source'].items()}
+                layout = tuple(header['layout'])
+                for item, (offset, length) in header['texts'].items():
+                    source[item] = (document[item],
+                                    mm[start + offset:
+                                       start + offset + length]
+                                    .decode('ascii'))
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(sidecar)
+        return document, source, layout
+
+    def _write(self, key, digest, document, source, layout):
+        """Write sidecar of file, remove old sidecars over size limit."""
+        items = {item: value for item, value in document.items()
+                 if item not in _ARRAYS}
+        header = {
+            'version': VERSION,
+            'key': list(key),
+            'hash': digest,
+            'items': items,
+            'source': {item: entry for item, entry in source.items()
+                       if item not in _ARRAYS},
+            'layout': layout,
+            'arrays': {},
+            'texts': {},
+        }
+        blobs = [np.ascontiguousarray(document[item], dtype='<f8').tobytes()
+                 for item in _ARRAYS]
+        # offsets are relative to data following header
+        offset = 0
+        for item, blob in zip(_ARRAYS, blobs):
+            header['arrays'][item] = (offset, list(document[item].shape))
+            offset += len(blob)
+        for item in _ARRAYS:
+            if item in source:
+                blobs.append(source[item][1].encode('ascii'))
+                header['texts'][item] = (offset, len(blobs[-1]))
+                offset += len(blobs[-1])
+        encoded = json.dumps(header).encode('utf-8')
+        sidecar = self._sidecar(key[0])
+        temporary = '%s.%s.tmp' % (sidecar, threading.get_ident())
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+            f.write(b'\0' * (-(16 + len(encoded)) % 8))
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temporary, sidecar)
+        if self.max_disk_bytes is not None:
+            self._shrink()
+
+    def _shrink(self):
+        """Remove least recently used sidecars over size limit."""
+        sidecars = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.phc'):
+                stat = entry.stat()
+                sidecars.append((stat.st_mtime_ns, stat.st_size,
+                                 entry.path))
+        total = sum(size for _, size, _ in sidecars)
+        for _, size, path in sorted(sidecars):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.counters['evictions'] += 1
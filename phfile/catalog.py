@@ -0,0 +1,377 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Catalogue index of photometric files.
+
+Header items, lamps and derived metrics of ldt and ies files (ies files
+are indexed as converted to ldt) are kept in SQLite database:
+
+    files - one row per file: path, modification time, size and hash
+            of content, header items, maximum intensity [cd/klm], beam
+            angle [deg] and flux of luminaire [lm], error of files which
+            failed to load
+    lamps - one row per set of lamps of file
+
+Rescan is incremental: files of unchanged modification time and size are
+skipped, changed files are hashed and only files of changed content are
+parsed (optionally across process pool). Queries return paths or lazily
+loaded LDT objects.
+
+"""
+
+
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+
+from .ies import IES
+from .ldt import LDT
+from .schemas import ldt_schema
+
+
+VERSION = 1
+
+EXTENSIONS = ('.ldt', '.ies')
+
+_TYPES = {'integer': 'INTEGER', 'float': 'REAL', 'string': 'TEXT'}
+
+# header items and lamp items with types of columns
+HEADER = tuple(list(ldt_schema.keys())[:26])
+LAMP = tuple(ldt_schema['lamps']['schema']['schema'].keys())
+METRICS = ('max_intensity', 'beam_angle', 'flux')
+
+
+def _column(schema, item):
+    """Return declaration of column of item."""
+    return '%s %s' % (item, _TYPES.get(schema[item].get('type'), ''))
+
+
+def beam_angle(ldt):
+    """Return beam angle of luminaire.
+
+    Beam angle is twice the gamma angle at which intensity averaged over
+    C-planes falls to half of its maximum (linearly interpolated), for
+    rotationally symmetric distributions it is the usual full width at
+    half maximum.
+
+    Args:
+        ldt (obj): LDT object
+
+    Returns --
+        (float): beam angle in degrees, 0 for zero intensities
+    """
+    angles_g = ldt.document['angles_g']
+    profile = ldt.full_intensities().mean(axis=0)
+    peak = np.argmax(profile)
+    if not profile[peak]:
+        return 0.
+    below = np.flatnonzero(profile[peak:] < profile[peak] / 2)
+    if not len(below):
+        return 2 * float(angles_g[-1])
+    end = peak + below[0]
+    # gamma of half maximum between the last gamma above and first below
+    angle = np.interp(profile[peak] / 2, profile[end - 1:end + 1][::-1],
+                      angles_g[end - 1:end + 1][::-1])
+    return 2 * float(angle)
+
+
+def _record(path, digest):
+    """Load file and return its catalogue record.
+
+    Args:
+        path (str): path to ldt or ies file
+        digest (str): hash of content indexed earlier or None
+
+    Returns --
+        (tuple): hash of content, None if content is unchanged otherwise
+            tuple of header values, lamps values and metrics or error
+            message
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return None, '%s: %s' % (type(e).__name__, e)
+    current = hashlib.blake2b(data).hexdigest()
+    if current == digest:
+        return current, None
+    try:
+        if path.lower().endswith('.ies'):
+            ldt = IES().loads(data).to_ldt()
+        else:
+            ldt = LDT().loads(data)
+        if ldt.errors:
+            raise ValueError('incorrect items %s' % ', '.join(ldt.errors))
+        document = ldt.document
+        lamps = document['lamps']
+        # flux of luminaire with the first set of lamps
+        flux = ldt.flux().total / 1000 * lamps[0]['total_flux']\
+            if lamps else 0.
+        metrics = (float(document['luminous_intensities'].max(initial=0)),
+                   beam_angle(ldt), flux)
+    except Exception as e:
+        return current, '%s: %s' % (type(e).__name__, e)
+    return current, (tuple(document[item] for item in HEADER),
+                     [tuple(lamp[item] for item in LAMP) for lamp in lamps],
+                     metrics)
+
+
+def _records(jobs):
+    """Run _record for chunk of jobs."""
+    return [_record(*job) for job in jobs]
+
+
+def _load(path):
+    """Return LDT object of file, arrays of ldt file are parsed lazily."""
+    if path.lower().endswith('.ies'):
+        return IES().load(path).to_ldt()
+    return LDT().load(path, header_only=True)
+
+
+def _condition(column, value):
+    """Return SQL condition and parameters for value of column.
+
+    Args:
+        column (str): column name
+        value (obj): value compared for equality, list of allowed values
+            or tuple (low, high) of range (None for open end)
+
+    Returns --
+        (tuple): SQL expression, list of parameters
+    """
+    if isinstance(value, tuple):
+        low, high = value
+        terms = [('%s >= ?' % column, low), ('%s <= ?' % column, high)]
+        terms = [term for term in terms if term[1] is not None]
+        return ' AND '.join([term for term, _ in terms]) or '1',\
+            [parameter for _, parameter in terms]
+    if isinstance(value, list):
+        return '%s IN (%s)' % (column, ', '.join('?' * len(value))), value
+    return '%s = ?' % column, [value]
+
+
+class Catalog(object):
+    """Index of photometric files in SQLite database.
+
+    Single connection is used, so object is meant to be used from thread
+    which created it.
+    """
+
+    __slots__ = (
+        '_connection',
+        'path',
+    )
+
+    def __init__(self, path=':memory:'):
+        """Class constructor.
+
+        Database of another version is rebuilt.
+
+        Args:
+            path (str, optional): path to database file, by default
+                database is kept in memory
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        version, = self._connection.execute('PRAGMA user_version')\
+            .fetchone()
+        if version != VERSION:
+            self._create()
+
+    def _create(self):
+        """Create tables of database."""
+        columns = ', '.join(_column(ldt_schema, item) for item in HEADER)
+        lamp_columns = ', '.join(
+            _column(ldt_schema['lamps']['schema']['schema'], item)
+            for item in LAMP)
+        with self._connection as connection:
+            connection.executescript('''
+                DROP TABLE IF EXISTS lamps;
+                DROP TABLE IF EXISTS files;
+                CREATE TABLE files (
+                    path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,
+                    hash TEXT, error TEXT, %s,
+                    max_intensity REAL, beam_angle REAL, flux REAL);
+                CREATE TABLE lamps (
+                    path TEXT REFERENCES files ON DELETE CASCADE,
+                    position INTEGER, %s);
+                CREATE INDEX lamps_path ON lamps (path);
+                CREATE INDEX files_luminaire_no ON files (luminaire_no);
+                CREATE INDEX files_flux ON files (flux);
+                CREATE INDEX lamps_color_temp ON lamps (color_temp);
+                PRAGMA user_version = %s;
+            ''' % (columns, lamp_columns, VERSION))
+
+    def __len__(self):
+        """Return number of indexed files loaded without error."""
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM files WHERE error IS NULL').fetchone()[0]
+
+    def __enter__(self):
+        """Enter context."""
+        return self
+
+    def __exit__(self, *args):
+        """Close database on exit from context."""
+        self.close()
+
+    def close(self):
+        """Close database."""
+        self._connection.close()
+
+    def scan(self, directory, processes=1, chunksize=16):
+        """Index files in directory tree.
+
+        Files removed from directory since the last scan are removed from
+        index, only files of changed content are parsed.
+
+        Args:
+            directory (str): root of directory tree
+            processes (int, optional): number of worker processes, 0
+                means number of CPUs
+            chunksize (int, optional): number of files sent to worker at
+                once
+
+        Returns --
+            (dict): numbers of added, updated, unchanged, removed and
+                failed files
+        """
+        directory = os.path.realpath(directory)
+        found = {}
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    found[path] = (stat.st_mtime_ns, stat.st_size)
+        prefix = os.path.join(directory, '')
+        indexed = {path: (mtime_ns, size, digest)
+                   for path, mtime_ns, size, digest
+                   in self._connection.execute(
+                       'SELECT path, mtime_ns, size, hash FROM files'
+                       + " WHERE substr(path, 1, ?) = ?",
+                       (len(prefix), prefix))}
+        stats = dict.fromkeys(('added', 'updated', 'unchanged', 'removed',
+                               'failed'), 0)
+        removed = [path for path in indexed if path not in found]
+        stats['removed'] = len(removed)
+        # only files of changed modification time or size are read
+        jobs = []
+        for path, key in found.items():
+            if path in indexed and indexed[path][:2] == key:
+                stats['unchanged'] += 1
+            else:
+                jobs.append((path, indexed.get(path, (None, ) * 3)[2]))
+        chunks = [jobs[i:i + chunksize]
+                  for i in range(0, len(jobs), chunksize)]
+        if processes == 1 or len(chunks) < 2:
+            results = map(_records, chunks)
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                processes or None)
+            with executor:
+                results = list(executor.map(_records, chunks))
+        results = [result for chunk in results for result in chunk]
+        with self._connection as connection:
+            connection.executemany('DELETE FROM files WHERE path = ?',
+                                   [(path, ) for path in removed])
+            for (path, previous), (digest, record) in zip(jobs, results):
+                key = found[path]
+                if record is None:
+                    # content is the same, only modification time changed
+                    connection.execute(
+                        'UPDATE files SET mtime_ns = ?, size = ?'
+                        + ' WHERE path = ?', key + (path, ))
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated' if path in indexed else 'added'] += 1
+                connection.execute('DELETE FROM files WHERE path = ?',
+                                   (path, ))
+                if isinstance(record, str):
+                    stats['failed'] += 1
+                    connection.execute(
+                        'INSERT INTO files (path, mtime_ns, size, hash,'
+                        + ' error) VALUES (?, ?, ?, ?, ?)',
+                        (path, ) + key + (digest, record))
+                    continue
+                header, lamps, metrics = record
+                connection.execute(
+                    'INSERT INTO files (path, mtime_ns, size, hash, %s)'
+                    % ', '.join(HEADER + METRICS) + ' VALUES (%s)'
+                    % ', '.join('?' * (4 + len(HEADER) + len(METRICS))),
+                    (path, ) + key + (digest, ) + header + metrics)
+                connection.executemany(
+                    'INSERT INTO lamps (path, position, %s)'
+                    % ', '.join(LAMP) + ' VALUES (%s)'
+                    % ', '.join('?' * (2 + len(LAMP))),
+                    [(path, i) + lamp for i, lamp in enumerate(lamps)])
+        return stats
+
+    def errors(self):
+        """Return files which failed to load.
+
+        Returns --
+            (dict): error messages by path
+        """
+        return dict(self._connection.execute(
+            'SELECT path, error FROM files WHERE error IS NOT NULL'
+            + ' ORDER BY path'))
+
+    def paths(self, limit=None, **conditions):
+        """Return paths of files matching all conditions.
+
+        Conditions are given as item=value (equality), item=[values]
+        (any of values) or item=(low, high) (range, None for open end).
+        Items are header items, lamp items (matched by any set of lamps
+        of file) or metrics (max_intensity, beam_angle, flux).
+
+        Args:
+            limit (int, optional): maximum number of paths
+            conditions (dict): conditions by item
+
+        Returns --
+            (list): paths sorted alphabetically
+
+        Raises --
+            ValueError: in case of unknown item
+        """
+        terms, parameters = ['error IS NULL'], []
+        for item, value in sorted(conditions.items()):
+            if item in HEADER or item in METRICS:
+                term, values = _condition(item, value)
+            elif item in LAMP:
+                term, values = _condition(item, value)
+                term = 'EXISTS (SELECT 1 FROM lamps WHERE' \
+                    + ' lamps.path = files.path AND %s)' % term
+            else:
+                raise ValueError('unknown item %s' % item)
+            terms.append(term)
+            parameters.extend(values)
+        query = 'SELECT path FROM files WHERE %s ORDER BY path'\
+            % ' AND '.join(terms)
+        if limit is not None:
+            query += ' LIMIT %d' % limit
+        return [path for path,
+                in self._connection.execute(query, parameters)]
+
+    def query(self, limit=None, **conditions):
+        """Return files matching all conditions, see paths().
+
+        Ldt files are loaded with header only, their arrays are parsed
+        on first access. Ies files are converted to ldt when iterated to.
+
+        Args:
+            limit (int, optional): maximum number of files
+            conditions (dict): conditions by item
+
+        Returns --
+            (iterator): LDT objects loaded when iterated to
+
+        Raises --
+            ValueError: in case of unknown item
+        """
+        return map(_load, self.paths(limit, **conditions))
@@ -0,0 +1,314 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Command line interface.
+
+Processes whole directory trees of photometric files, optionally across
+process pool:
+
+    $ phfile plot -j 8 catalogue/
+    $ phfile set -s luminaire_name="New name" -o out/ 'catalogue/**/*.ldt'
+    $ phfile convert -j 8 --chunksize 64 --to ies -o out/ catalogue/
+    $ phfile convert --to ldt --pattern '*.ies' -o out/ catalogue/
+    $ phfile validate catalogue/
+
+"""
+
+
+import argparse
+import collections
+import concurrent.futures
+import fnmatch
+import functools
+import glob
+import os
+import sys
+
+from .ies import IES
+from .ldt import LDT
+
+
+# items handled by LDT before validation, with types of their values
+_HANDLED = {'number_of_lamps': int}
+
+
+def _job_paths(paths, pattern):
+    """Expand paths given in command line.
+
+    Directories are searched recursively for files matching pattern,
+    glob patterns are expanded. Base directory of files found in
+    directory or with glob pattern is the directory or the part of
+    pattern without magic, so output tree mirrors input tree.
+
+    Args:
+        paths (list): files, directories or glob patterns
+        pattern (str): pattern of file names searched in directories
+
+    Returns --
+        (list): list of tuples (file path, base directory)
+    """
+    results = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if fnmatch.fnmatch(name.lower(), pattern.lower()):
+                        results.setdefault(os.path.join(root, name), path)
+        elif glob.has_magic(path):
+            base = _glob_base(path)
+            for name in sorted(glob.glob(path, recursive=True)):
+                if os.path.isfile(name):
+                    results.setdefault(name, base)
+        else:
+            results.setdefault(path, os.path.dirname(path))
+    return list(results.items())
+
+
+def _glob_base(pattern):
+    """Return leading directories of glob pattern without magic.
+
+    Args:
+        pattern (str): glob pattern
+
+    Returns --
+        (str): base directory
+    """
+    head, parts = pattern, []
+    while head and head != os.path.dirname(head):
+        head, tail = os.path.split(head)
+        parts.append(tail)
+    parts.reverse()
+    base = head
+    for part in parts:
+        if glob.has_magic(part):
+            break
+        base = os.path.join(base, part)
+    return base or os.curdir
+
+
+def _output_path(path, base, output_dir, ext='', extension=None):
+    """Return path of output file.
+
+    Output directory mirrors structure of input directory tree,
+    without output directory file is written next to the input one.
+
+    Args:
+        path (str): input file path
+        base (str): base directory of input file
+        output_dir (str): output directory
+        ext (str, optional): extension appended to file name
+        extension (str, optional): extension of output format, replaces
+            extension of input file of other format
+
+    Returns --
+        (str): output file path
+    """
+    if output_dir:
+        path = os.path.join(output_dir, os.path.relpath(path, base))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    root, old = os.path.splitext(path)
+    if extension and old.lower() != extension:
+        path = root + extension
+    return path + ext
+
+
+def _load(path):
+    """Load ldt or ies file depending on its extension."""
+    if path.lower().endswith('.ies'):
+        return IES().load(path)
+    return LDT().load(path)
+
+
+def _load_ldt(path):
+    """Load ldt file or ies file converted to ldt."""
+    if path.lower().endswith('.ies'):
+        return IES().load(path).to_ldt()
+    return LDT().load(path)
+
+
+def _convert(path, output):
+    _load_ldt(path).write(output)
+
+
+def _convert_ies(path, output):
+    if path.lower().endswith('.ies'):
+        IES().load(path).write(output)
+    else:
+        LDT().load(path).to_ies().write(output)
+
+
+def _plot(path, output):
+    _load_ldt(path).plot(output)
+
+
+def _set(path, output, items):
+    LDT().load(path).set(**items).write(output)
+
+
+def _validate(path, output):
+    _load(path)
+
+
+def _isolated(func, jobs):
+    """Run func for chunk of jobs, errors are isolated per file.
+
+    Args:
+        func (callable): function called with input and output path
+        jobs (list): list of tuples (input path, output path)
+
+    Returns --
+        (list): list of tuples (input path, error message or None)
+    """
+    results = []
+    for path, output in jobs:
+        try:
+            func(path, output)
+        except Exception as e:
+            results.append((path, '%s: %s' % (type(e).__name__, e)))
+        else:
+            results.append((path, None))
+    return results
+
+
+def run(func, jobs, processes=1, chunksize=1):
+    """Run func for every job, optionally across process pool.
+
+    Args:
+        func (callable): picklable function called with input and output
+            path
+        jobs (list): list of tuples (input path, output path)
+        processes (int, optional): number of worker processes, 0 means
+            number of CPUs
+        chunksize (int, optional): number of files sent to worker at once
+
+    Returns --
+        (list): list of tuples (input path, error message or None)
+    """
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    worker = functools.partial(_isolated, func)
+    if processes == 1 or len(chunks) < 2:
+        results = map(worker, chunks)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(processes or None)
+        with executor:
+            results = list(executor.map(worker, chunks))
+    return [result for chunk in results for result in chunk]
+
+
+def _items(pairs):
+    """Parse item=value pairs given in command line.
+
+    Values of items handled by LDT before validation (number_of_lamps)
+    are converted, schema items are coerced on validation.
+    """
+    items = {}
+    for pair in pairs:
+        item, sep, value = pair.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError('expected item=value, got %s'
+                                             % pair)
+        if item in _HANDLED:
+            try:
+                value = _HANDLED[item](value)
+            except ValueError:
+                raise argparse.ArgumentTypeError('incorrect value of %s: %s'
+                                                 % (item, value))
+        items[item] = value
+    return items
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='phfile',
+        description='Batch processing of photometric files.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('paths', nargs='+',
+                        help='files, directories or glob patterns')
+    common.add_argument('-j', '--jobs', default=1, type=int,
+                        help='number of worker processes, 0 for number'
+                        + ' of CPUs (default: 1)')
+    common.add_argument('--chunksize', default=16, type=int,
+                        help='number of files sent to worker at once'
+                        + ' (default: 16)')
+    common.add_argument('--pattern', default='*.ldt',
+                        help='pattern of file names searched in directories'
+                        + ' (default: *.ldt)')
+    common.add_argument('-q', '--quiet', action='store_true',
+                        help='report failures only')
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('-o', '--output-dir', default='',
+                        help='output directory, by default files are'
+                        + ' written next to input ones')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    convert_parser = subparsers.add_parser(
+        'convert', parents=[common, output],
+        help='convert files to other format or rewrite them')
+    convert_parser.add_argument('--to', choices=['ies', 'ldt'],
+                                default='ldt',
+                                help='output format (default: ldt)')
+    subparsers.add_parser('plot', parents=[common, output],
+                          help='plot light distribution (svg)')
+    set_parser = subparsers.add_parser('set', parents=[common, output],
+                                       help='set items and rewrite files')
+    set_parser.add_argument('-s', '--set', action='append', default=[],
+                            dest='items', metavar='ITEM=VALUE',
+                            required=True,
+                            help='item name or index and its new value')
+    subparsers.add_parser('validate', parents=[common],
+                          help='validate files')
+    return parser
+
+
+def main(argv=None):
+    """Run command line interface.
+
+    Args:
+        argv (list, optional): command line arguments
+
+    Returns --
+        (int): exit status, 1 if any file failed
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    output_dir = getattr(args, 'output_dir', '')
+    extension = None
+    func, ext = {
+        'convert': (_convert, ''),
+        'plot': (_plot, '.svg'),
+        'set': (None, ''),
+        'validate': (_validate, ''),
+    }[args.command]
+    if args.command == 'convert':
+        extension = '.' + args.to
+        if args.to == 'ies':
+            func = _convert_ies
+    if args.command == 'set':
+        try:
+            func = functools.partial(_set, items=_items(args.items))
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    jobs = [(path, _output_path(path, base, output_dir, ext, extension))
+            for path, base in _job_paths(args.paths, args.pattern)]
+    # files which would overwrite each other's output are not processed
+    outputs = collections.Counter(os.path.normcase(os.path.abspath(output))
+                                  for _, output in jobs)
+    shared = [(path, output) for path, output in jobs
+              if args.command != 'validate'
+              and outputs[os.path.normcase(os.path.abspath(output))] > 1]
+    errors = dict(run(func, [job for job in jobs if job not in shared],
+                      args.jobs, max(args.chunksize, 1)))
+    errors.update((path, 'output %s is shared with other files' % output)
+                  for path, output in shared)
+    results = [(path, errors[path]) for path, _ in jobs]
+    failed = 0
+    for path, error in results:
+        if error:
+            failed += 1
+            print('%s: %s' % (path, error), file=sys.stderr)
+        elif not args.quiet:
+            print('%s: ok' % path)
+    print('%s: %d files, %d ok, %d failed'
+          % (args.command, len(results), len(results) - failed, failed),
+          file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Deduplication of light distributions.
+
+Many luminaires share the same optics, so catalogues hold far fewer
+distinct distributions than files. Distribution hash covers angles and
+intensities scaled by conversion factor only (header items and lamps are
+ignored), symmetry is normalised: intensities of all C-planes are
+compacted to the most compact exact symmetry, so the same distribution
+stored with different symmetry indicators has the same hash.
+
+"""
+
+
+import hashlib
+
+import numpy as np
+
+from . import symmetry
+
+
+def distribution_hash(ldt, tolerance=None):
+    """Return canonical hash of light distribution.
+
+    Args:
+        ldt (obj): LDT object
+        tolerance (float, optional): intensities scaled by conversion
+            factor are quantised to multiples of tolerance [cd/klm] before
+            hashing, by default they are compared exactly
+
+    Returns --
+        (str): hexadecimal digest
+    """
+    document = ldt.document
+    # flux and other results follow scaled intensities
+    full = ldt.full_intensities() * document['conversion_factor']
+    angles_c = np.asarray(document['angles_c'],
+                          dtype=np.float64)[:document['number_mc']]
+    angles_g = np.asarray(document['angles_g'], dtype=np.float64)
+    if tolerance:
+        full = np.round(full / tolerance).astype(np.int64)
+    else:
+        # -0.0 is the same as 0.0
+        full = np.asarray(full, dtype=np.float64) + 0.
+    indicator = symmetry.detect_symmetry(full, 0) if len(full) else 0
+    stored = symmetry.stored_index(indicator, len(full))
+    # number of C-planes does not matter for rotational symmetry
+    number_mc = 1 if indicator == 1 else len(full)
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (np.array([indicator, number_mc, len(angles_g)]),
+                  np.round(angles_c[stored], 6) + 0.,
+                  np.round(angles_g, 6) + 0.,
+                  np.ascontiguousarray(full[stored])):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class DistributionIndex(object):
+    """Files grouped by distribution hash.
+
+    Only the first LDT object of each distribution is kept, results
+    computed for it are fanned out to all files sharing the
+    distribution.
+    """
+
+    __slots__ = (
+        '_groups',
+        '_keys',
+        '_representatives',
+        'tolerance',
+    )
+
+    def __init__(self, tolerance=None):
+        """Class constructor.
+
+        Args:
+            tolerance (float, optional): see distribution_hash
+        """
+        self._groups = {}
+        self._keys = {}
+        self._representatives = {}
+        self.tolerance = tolerance
+
+    def __contains__(self, key):
+        """Return True if file is indexed."""
+        return key in self._keys
+
+    def __len__(self):
+        """Return number of distinct distributions."""
+        return len(self._groups)
+
+    def add(self, key, ldt):
+        """Index file.
+
+        Args:
+            key (obj): hashable identifier of file, eg. path
+            ldt (obj): LDT object
+
+        Returns --
+            (str): distribution hash
+        """
+        digest = distribution_hash(ldt, self.tolerance)
+        if key in self._keys:
+            self.remove(key)
+        self._keys[key] = digest
+        self._groups.setdefault(digest, []).append(key)
+        self._representatives.setdefault(digest, ldt)
+        return digest
+
+    def update(self, items):
+        """Index many files.
+
+        Args:
+            items (iterable): pairs of key and LDT object
+
+        Returns --
+            (obj): self
+        """
+        for key, ldt in items:
+            self.add(key, ldt)
+        return self
+
+    def remove(self, key):
+        """Remove file from index.
+
+        Args:
+            key (obj): identifier of file
+
+        Raises --
+            KeyError: file is not indexed
+        """
+        digest = self._keys.pop(key)
+        group = self._groups[digest]
+        group.remove(key)
+        if not group:
+            del self._groups[digest]
+            del self._representatives[digest]
+
+    def hash_of(self, key):
+        """Return distribution hash of file.
+
+        Args:
+            key (obj): identifier of file
+
+        Returns --
+            (str): distribution hash
+        """
+        return self._keys[key]
+
+    def groups(self):
+        """Return files grouped by distribution.
+
+        Returns --
+            (dict): lists of keys by distribution hash
+        """
+        return {digest: list(keys) for digest, keys in self._groups.items()}
+
+    def representative(self, digest):
+        """Return LDT object of distribution.
+
+        Args:
+            digest (str): distribution hash
+
+        Returns --
+            (obj): the first indexed LDT object with the distribution
+        """
+        return self._representatives[digest]
+
+    def map(self, function):
+        """Compute result once per distribution.
+
+        Args:
+            function (callable): called with LDT object
+
+        Returns --
+            (dict): results by key of each indexed file
+        """
+        results = {digest: function(ldt)
+                   for digest, ldt in self._representatives.items()}
+        return {key: results[digest] for key, digest in self._keys.items()}
@@ -0,0 +1,356 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Luminous flux of light distribution.
+
+Intensities are integrated over solid angle on (C, gamma) grid. Each
+gamma angle represents zone bounded by midpoints to its neighbours
+(first and last zones end at the first and last gamma, so zones of
+poles are half as wide), each C-plane represents sector bounded by
+midpoints to neighbouring C-planes. Sectors of C-planes which are
+not stored due to symmetry are added to their stored counterparts.
+
+"""
+
+
+import numpy as np
+
+from .interpolation import _locate, _uniform_step
+from .symmetry import plane_index
+
+
+# room indices of direct ratios in ldt files
+ROOM_INDICES = (.6, .8, 1., 1.25, 1.5, 2., 2.5, 3., 4., 5.)
+
+# half-angles of cones of CIE 52 zonal method
+CONES = (41.4, 60., 75.5, 90.)
+
+# CIE 52 coefficients (per mille) of flux fractions in CONES for
+# ROOM_INDICES, by spacing to height ratio of luminaires
+DIRECT_COEFFICIENTS = {
+    1.: ((943, -317, 481, -107), (752, -33, 372, -91),
+         (636, 121, 310, -67), (510, 238, 282, -30),
+         (429, 275, 309, -13), (354, 248, 363, 35),
+         (286, 190, 416, 108), (258, 118, 463, 161),
+         (236, -6, 512, 258), (231, -99, 518, 350)),
+    1.25: ((967, -336, 451, -82), (808, -82, 339, -65),
+           (695, 73, 280, -48), (565, 200, 255, -20),
+           (476, 249, 278, -3), (386, 243, 331, 40),
+           (307, 201, 384, 108), (273, 137, 432, 158),
+           (243, 18, 485, 254), (234, -73, 497, 342)),
+    1.5: ((983, -348, 430, -65), (851, -122, 315, -44),
+          (744, 31, 256, -31), (614, 163, 233, -10),
+          (521, 220, 253, 6), (418, 231, 304, 47),
+          (329, 203, 356, 112), (289, 149, 404, 158),
+          (252, 39, 460, 249), (239, -48, 476, 333)),
+}
+
+
+def zone_bounds(angles_g):
+    """Return bounds of gamma zones.
+
+    Args:
+        angles_g (ndarray): gamma angles
+
+    Returns --
+        (ndarray): len(angles_g) + 1 bounds in degrees
+    """
+    angles_g = np.asarray(angles_g, dtype=np.float64)
+    return np.concatenate((angles_g[:1],
+                           (angles_g[1:] + angles_g[:-1]) / 2,
+                           angles_g[-1:]))
+
+
+def zone_weights(angles_g):
+    """Return solid angle of gamma zones per radian of C.
+
+    Args:
+        angles_g (ndarray): gamma angles
+
+    Returns --
+        (ndarray): weights, sum to 2 for gammas 0 ... 180
+    """
+    return -np.diff(np.cos(np.radians(zone_bounds(angles_g))))
+
+
+def plane_weights(angles_c, symmetry, number_mc):
+    """Return angular width of sectors of stored C-planes.
+
+    Args:
+        angles_c (ndarray): angles of all C-planes
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (ndarray): widths in radians, sum to 2 pi
+    """
+    angles_c = np.asarray(angles_c, dtype=np.float64)[:number_mc]
+    if symmetry == 1 or not len(angles_c):
+        return np.array([2 * np.pi])
+    following = np.append(angles_c[1:], angles_c[0] + 360)
+    preceding = np.append(angles_c[-1] - 360, angles_c[:-1])
+    widths = np.radians(following - preceding) / 2
+    planes = plane_index(symmetry, number_mc)
+    return np.bincount(planes, widths, minlength=planes.max() + 1)
+
+
+class FluxTable(object):
+    """Zonal flux of light distribution.
+
+    Cumulative flux is tabulated at zone bounds, flux of cone around
+    nadir is found without searching for evenly spaced gammas. Units
+    follow intensities, for cd/klm flux is given in lm per 1000 lm of
+    lamps flux.
+    """
+
+    __slots__ = (
+        '_step',
+        'angles_g',
+        'bounds',
+        'cumulative',
+        'zonal',
+    )
+
+    def __init__(self, angles_g, zonal, grid=None):
+        """Class constructor.
+
+        Args:
+            angles_g (ndarray): gamma angles
+            zonal (ndarray): flux of gamma zones
+            grid (tuple, optional): zone bounds and step of gammas
+                shared with other tables of the same gamma angles
+        """
+        self.angles_g = np.asarray(angles_g, dtype=np.float64)
+        if grid is None:
+            grid = zone_bounds(self.angles_g), _uniform_step(self.angles_g)
+        self.bounds, self._step = grid
+        self.zonal = zonal
+        self.cumulative = np.concatenate(([0], np.cumsum(zonal)))
+
+    @property
+    def total(self):
+        """Return total flux.
+
+        Returns --
+            (float): flux
+        """
+        return float(self.cumulative[-1])
+
+    @property
+    def downward(self):
+        """Return downward flux fraction.
+
+        Returns --
+            (float): fraction of flux below horizontal plane (0..1)
+        """
+        return float(self.cone(90)) / self.total if self.total else 0.
+
+    @property
+    def upward(self):
+        """Return upward flux fraction.
+
+        Returns --
+            (float): fraction of flux above horizontal plane (0..1)
+        """
+        return 1 - self.downward if self.total else 0.
+
+    def _zones(self, theta):
+        """Return zones of cone bounds and their covered fractions."""
+        theta = np.clip(np.asarray(theta, dtype=np.float64),
+                        self.bounds[0], self.bounds[-1])
+        if len(self.angles_g) > 1:
+            # zone of theta belongs to the nearest gamma
+            cell, position = _locate(theta.ravel(), self.angles_g,
+                                     self._step)
+            zone = (cell + (position > .5)).reshape(theta.shape)
+        else:
+            zone = np.zeros(theta.shape, dtype=np.intp)
+        lower, upper = np.cos(np.radians(self.bounds[zone])),\
+            np.cos(np.radians(self.bounds[zone + 1]))
+        covered = np.divide(lower - np.cos(np.radians(theta)),
+                            lower - upper,
+                            out=np.zeros(theta.shape),
+                            where=lower != upper)
+        return zone, covered
+
+    def cone(self, theta):
+        """Return flux within cone around nadir.
+
+        Flux of partially covered zone is proportional to covered
+        solid angle.
+
+        Args:
+            theta (obj): half-angle of cone in degrees, array-like
+
+        Returns --
+            (ndarray): flux
+        """
+        zone, covered = self._zones(theta)
+        return self.cumulative[zone] + covered * self.zonal[zone]
+
+
+def zonal_flux(intensities, angles_c, angles_g, symmetry, number_mc):
+    """Return flux of gamma zones.
+
+    Args:
+        intensities (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas) or stack of such matrices
+        angles_c (ndarray): angles of all C-planes
+        angles_g (ndarray): gamma angles
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (ndarray): flux of zones, shape of intensities without C-planes
+            axis
+    """
+    widths = plane_weights(angles_c, symmetry, number_mc)
+    return np.einsum('c,...cg->...g', widths, intensities)\
+        * zone_weights(angles_g)
+
+
+def integrate(intensities, angles_c, angles_g, symmetry, number_mc):
+    """Integrate intensities over solid angle.
+
+    Args:
+        intensities (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas)
+        angles_c (ndarray): angles of all C-planes
+        angles_g (ndarray): gamma angles
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (obj): FluxTable
+    """
+    return FluxTable(angles_g, zonal_flux(intensities, angles_c, angles_g,
+                                          symmetry, number_mc))
+
+
+def _grouped(ldts):
+    """Group ldt objects sharing the same angle grid and symmetry.
+
+    Args:
+        ldts (list): LDT objects
+
+    Yields --
+        (tuple): document of the first object, indexes of objects,
+            stack of their intensities with conversion factor applied
+    """
+    groups = {}
+    for i, ldt in enumerate(ldts):
+        document = ldt.document
+        key = (document['symmetry_indicator'], document['number_mc'],
+               document['angles_c'].tobytes(),
+               document['angles_g'].tobytes(),
+               document['luminous_intensities'].shape)
+        groups.setdefault(key, []).append(i)
+    for indexes in groups.values():
+        yield ldts[indexes[0]].document, indexes, np.stack([
+            ldts[i].document['luminous_intensities']
+            * ldts[i].document['conversion_factor']
+            for i in indexes])
+
+
+def integrate_batch(ldts):
+    """Integrate intensities of many ldt objects.
+
+    Objects sharing the same angle grid and symmetry are integrated
+    together with single matrix product.
+
+    Args:
+        ldts (iterable): LDT objects
+
+    Returns --
+        (list): FluxTable for each object
+    """
+    ldts = list(ldts)
+    results = [None] * len(ldts)
+    for document, indexes, intensities in _grouped(ldts):
+        zonal = zonal_flux(intensities, document['angles_c'],
+                           document['angles_g'],
+                           document['symmetry_indicator'],
+                           document['number_mc'])
+        grid = (zone_bounds(document['angles_g']),
+                _uniform_step(document['angles_g']))
+        for i, row in zip(indexes, zonal):
+            results[i] = FluxTable(document['angles_g'], row, grid)
+    return results
+
+
+def cone_weights(angles_g, theta):
+    """Return weights of gamma zones in flux of cones around nadir.
+
+    Flux of partially covered zone is proportional to covered solid
+    angle, see FluxTable.cone.
+
+    Args:
+        angles_g (ndarray): gamma angles
+        theta (ndarray): half-angles of cones in degrees
+
+    Returns --
+        (ndarray): weights of shape (cones, gammas)
+    """
+    table = FluxTable(angles_g, np.zeros(len(angles_g)))
+    zone, covered = table._zones(theta)
+    gammas = np.arange(len(angles_g))
+    return (gammas < zone[:, None])\
+        + covered[:, None] * (gammas == zone[:, None])
+
+
+def direct_ratios(intensities, angles_c, angles_g, symmetry, number_mc,
+                  spacing=1.25):
+    """Compute direct ratios for room indices 0.60 ... 5.00.
+
+    Direct ratio is part of downward flux of luminaire reaching work
+    plane directly. It is computed with CIE 52 zonal method: fractions
+    of downward flux in cones of half-angles 41.4, 60, 75.5 and 90
+    degrees are multiplied by tabulated coefficients of room index and
+    spacing to height ratio of luminaires.
+
+    Args:
+        intensities (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas) or stack of such matrices
+        angles_c (ndarray): angles of all C-planes
+        angles_g (ndarray): gamma angles
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+        spacing (float, optional): spacing to height ratio, one of
+            DIRECT_COEFFICIENTS
+
+    Returns --
+        (ndarray): 10 direct ratios (0..1) for each matrix, see
+            ROOM_INDICES
+
+    Raises --
+        ValueError: in case of unsupported spacing to height ratio
+    """
+    if spacing not in DIRECT_COEFFICIENTS:
+        raise ValueError('unsupported spacing to height ratio %s'
+                         % spacing)
+    zonal = zonal_flux(intensities, angles_c, angles_g, symmetry,
+                       number_mc)
+    cones = zonal @ cone_weights(angles_g, np.array(CONES)).T
+    downward = cones[..., -1:]
+    fractions = np.divide(cones, downward, out=np.zeros(cones.shape),
+                          where=downward > 0)
+    return fractions @ np.array(DIRECT_COEFFICIENTS[spacing]).T / 1000
+
+
+def direct_ratios_batch(ldts, spacing=1.25):
+    """Compute direct ratios of many ldt objects.
+
+    Args:
+        ldts (iterable): LDT objects
+        spacing (float, optional): spacing to height ratio
+
+    Returns --
+        (ndarray): matrix of shape (objects, 10)
+    """
+    ldts = list(ldts)
+    results = np.zeros((len(ldts), len(ROOM_INDICES)))
+    for document, indexes, intensities in _grouped(ldts):
+        results[indexes] = direct_ratios(
+            intensities, document['angles_c'], document['angles_g'],
+            document['symmetry_indicator'], document['number_mc'],
+            spacing)
+    return results
@@ -7,8 +7,16 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 """
 
 
+import pathlib
+import re
+
+import numpy as np
+
+from . import ldt
 from .phbase import PHBase
-from .schemas import ies_schema
+from .schemas import _parse_array, ies_schema
+from .symmetry import detect_symmetry, stored_index
+from .utils import decode, safe_filename
 
 
 class IES (PHBase, object):
@@ -17,7 +25,7 @@ class IES (PHBase, object):
     Raises --
         TypeError: in case of wrong number of arguments passed to set() method
         ValueError: in case of wrong number of candela values
-            or vertical / horizontal angles
+            or vertical / horizontal angles, or TILT other than NONE
 
     """
 
@@ -25,9 +33,14 @@ class IES (PHBase, object):
         '_template',
     )
 
-    def __init__(self):
-        """Class constructor."""
-        super().__init__()
+    def __init__(self, strict=False):
+        """Class constructor.
+
+        Args:
+            strict (bool, optional): validate with cerberus (reference,
+                slow) instead of compiled validator
+        """
+        super().__init__(strict, ies_schema)
         # TILT other than NONE is not supported
         self._template = (
             '{header}\n'
@@ -48,7 +61,6 @@ class IES (PHBase, object):
             '{horizontal_angles}\n'
             '{candela_values}'
         )
-        self.schema = ies_schema
 
     @property
     def text(self):
@@ -57,11 +69,22 @@ class IES (PHBase, object):
         Returns --
             (str): ies document
         """
+        def wrap(values):
+            # LM-63 limits length of lines, 10 values fit in any case
+            values = list(map(str, values))
+            return '\n'.join(' '.join(values[i:i + 10])
+                             for i in range(0, len(values), 10))
+
         def to_str(value):
+            if isinstance(value, np.ndarray) and value.ndim > 1:
+                # candela values of each horizontal angle start new line
+                return '\n'.join(wrap(row.tolist()) for row in value)
+            if isinstance(value, np.ndarray):
+                value = value.tolist()
             return str(value) if not isinstance(value, list)\
-                else ' '.join(map(str, value))
+                else wrap(value)
 
-        self.validate(self.document)
+        self._check()
         result = self._template
         for item in self.document.keys():
             result = result.replace('{'+item+'}',
@@ -81,6 +104,92 @@ class IES (PHBase, object):
         """
         return super().item(*args)
 
+    def load(self, ies_path, encoding=None):
+        """Load ies file.
+
+        Args:
+            ies_path (obj): path to ies file or file-like object
+            encoding (str, optional): encoding of text items, by default
+                utf-8, cp1252 and latin-1 are tried
+
+        Returns --
+            (obj): self
+        """
+        if hasattr(ies_path, 'read'):
+            return self.loads(ies_path.read(), encoding)
+        with open(ies_path, 'rb') as f:
+            return self.loads(f.read(), encoding)
+
+    def loads(self, data, encoding=None):
+        """Load ies (LM-63-1995, LM-63-2002, LM-63-2019) document.
+
+        Keywords are read up to TILT line, numeric section (which is
+        free-form) is tokenized at once, straight from buffer.
+
+        Args:
+            data (obj): bytes, bytearray, memoryview or str
+            encoding (str, optional): encoding of text items, by default
+                utf-8, cp1252 and latin-1 are tried
+
+        Returns --
+            (obj): self
+        """
+        if isinstance(data, str):
+            data, encoding = data.encode('utf-8'), 'utf-8'
+        buffer = memoryview(data).cast('B')
+        start = 0
+        for end in np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8)
+                                  == ord('\n')).tolist() + [len(buffer)]:
+            if bytes(buffer[start:end]).lstrip().startswith(b'TILT'):
+                break
+            start = end + 1
+        else:
+            raise ValueError('ies file has no TILT line')
+        lines = decode(bytes(buffer[:end]), encoding).splitlines()
+        # keywords which are not present in file are left empty
+        document = {item: '' for item in list(self.schema.keys())[1:9]}
+        if lines[0].strip().upper().startswith('IES'):
+            document['header'] = lines[0].strip()
+        keyword = None
+        for line in lines[:-1]:
+            match = re.match(r'^\s*\[(\w+)\]\s*(.*?)\s*$', line)
+            if not match:
+                continue
+            if match[1].upper() == 'MORE' and keyword:
+                document[keyword] += ' ' + match[2]
+            elif match[1].lower() in document:
+                keyword = match[1].lower()
+                document[keyword] = match[2]
+            else:
+                keyword = None
+        tilt = lines[-1].strip()[5:].strip()
+        if tilt.upper() != 'NONE':
+            raise ValueError('TILT=%s is not supported' % tilt)
+        # values can be separated by commas as well
+        values = _parse_array(bytes(buffer[end:]).replace(b',', b' '))
+        keys = list(self.schema.keys())[9:22]
+        if values.size < len(keys):
+            raise ValueError('ies file has wrong number of values')
+        number_v, number_h = int(values[3]), int(values[4])
+        # parameters, vertical angles, horizontal angles, candela values
+        sections = np.cumsum([len(keys), number_v, number_h,
+                              number_v * number_h])
+        if values.size != sections[-1]:
+            raise ValueError(('ies file has wrong number of values'
+                              + ' (got %s expected %s)')
+                             % (values.size, sections[-1]))
+        parameters, vertical_angles, horizontal_angles, candela_values\
+            = np.split(values, sections[:-1])
+        document.update(zip(keys, parameters.tolist()))
+        # candela values are kept as (horizontal x vertical) matrix
+        document.update({
+            'vertical_angles': vertical_angles,
+            'horizontal_angles': horizontal_angles,
+            'candela_values': candela_values.reshape(number_h, number_v),
+        })
+        self.validate(document)
+        return self
+
     def set(self, *args, **kwargs):
         """Set value of items.
 
@@ -95,4 +204,189 @@ class IES (PHBase, object):
             **kwargs: arbitrary keyword arguments
         """
         super().set(*args, **kwargs)
+        # flat candela values are reshaped to (horizontal x vertical)
+        # matrix as soon as number of vertical angles is known
+        candela_values = self.document.get('candela_values')
+        number_v = self.document.get('number_of_vertical_angles')
+        if candela_values is not None and number_v\
+                and candela_values.shape[1:] != (number_v, )\
+                and candela_values.size % number_v == 0:
+            self._document['candela_values'] = candela_values\
+                .reshape(-1, number_v)
+            if self._validated.get('candela_values') is candela_values:
+                # reshaped values are valid as well
+                self._validated['candela_values'] = \
+                    self._document['candela_values']
+        return self
+
+    def _consistency(self, document):
+        """Return errors of items inconsistent with other items.
+
+        Numbers of angles and shape of candela values have to follow
+        numbers of horizontal and vertical angles.
+
+        Args:
+            document (dict): document
+
+        Returns --
+            (dict): errors by item
+        """
+        errors = {}
+        number_h = document.get('number_of_horizontal_angles')
+        number_v = document.get('number_of_vertical_angles')
+        for item, number, name in (
+                ('horizontal_angles', number_h,
+                 'number_of_horizontal_angles'),
+                ('vertical_angles', number_v, 'number_of_vertical_angles')):
+            if document.get(item) is not None and number is not None\
+                    and len(document[item]) != number:
+                errors[item] = ['length must be %s (%s)' % (name, number)]
+        candela_values = document.get('candela_values')
+        if candela_values is not None and number_h is not None\
+                and number_v is not None\
+                and np.shape(candela_values) != (number_h, number_v):
+            errors['candela_values'] = ['shape must be %s'
+                                        % ((number_h, number_v), )]
+        return errors
+
+    def to_ldt(self, tolerance=.01):
+        """Convert to ldt.
+
+        Only type C photometry is supported, horizontal angles have to
+        be evenly distributed. Symmetry is detected within tolerance and
+        only unique C-planes are stored. Candela values are converted to
+        cd/klm with flux of lamps, for absolute photometry (lumens per
+        lamp -1) lamp flux of 1000 lm is assumed, so intensities stay in
+        cd. DFF, LORL (100 for absolute photometry) and direct ratios
+        (CIE 52 zonal method, spacing to height ratio 1.25) are computed
+        from intensities. Dimensions given in feet or meters are
+        converted to millimeters.
+
+        Args:
+            tolerance (float, optional): allowed difference of mirrored
+                C-planes relative to maximum intensity
+
+        Returns --
+            (obj): LDT object
+
+        Raises --
+            ValueError: in case of type A or B photometry or unevenly
+                distributed horizontal angles
+        """
+        self._check()
+        if self.document['photometric_type'] != 1:
+            raise ValueError('unsupported photometric type %s (only type C'
+                             ' can be converted)'
+                             % self.document['photometric_type'])
+        angles_h = self.document['horizontal_angles']
+        candela_values = self.document['candela_values']\
+            .reshape(len(angles_h), -1)\
+            * self.document['candela_multiplier']\
+            * self.document['ballast_factor']
+        first, last = angles_h[0], angles_h[-1]
+        distance_dc = angles_h[1] - first if len(angles_h) > 1 else 360
+        number_mc = int(round(360 / distance_dc))
+        if not np.allclose(np.diff(angles_h), distance_dc)\
+                or not np.isclose(number_mc * distance_dc, 360):
+            raise ValueError('horizontal angles are not evenly distributed')
+        angles_c = np.arange(number_mc) * distance_dc
+        # folds full set of C-planes to horizontal angles present in file
+        if len(angles_h) == 1:
+            folded = np.zeros(number_mc)
+        elif first == 0 and last == 90:
+            folded = angles_c % 180
+            folded = np.minimum(folded, 180 - folded)
+        elif first == 0 and last == 180:
+            folded = np.minimum(angles_c, 360 - angles_c)
+        elif first == 90 and last == 270:
+            folded = np.where((angles_c >= 90) & (angles_c <= 270),
+                              angles_c, (180 - angles_c) % 360)
+        elif first == 0 and last == 360:
+            folded = angles_c
+        else:
+            raise ValueError('unsupported horizontal angles %s-%s'
+                             % (first, last))
+        intensities = candela_values[np.rint((folded - first) / distance_dc)
+                                     .astype(int)]
+        symmetry = detect_symmetry(intensities, tolerance)
+        if symmetry == 1:
+            number_mc, distance_dc, angles_c = 1, 0, angles_c[:1]
+        flux = self.document['lumens_per_lamp']\
+            * self.document['number_of_lamps']
+        absolute = flux <= 0
+        if absolute:
+            flux = 1000
+        angles_g = self.document['vertical_angles']
+        distance_dg = np.diff(angles_g)
+        distance_dg = distance_dg[0] if len(distance_dg)\
+            and np.allclose(distance_dg, distance_dg[0]) else 0
+        # dimensions in millimeters (units type 1 is feet, 2 meters),
+        # negative width and length stand for circular luminous area
+        scale = 304.8 if self.document['units_type'] == 1 else 1000
+        width, length, height = (abs(self.document[item]) * scale
+                                 for item in ('width', 'length', 'height'))
+        if self.document['width'] < 0:
+            width = 0
+        result = ldt.LDT().set(**{
+            'company': self.document['manufac'],
+            'type_indicator': 1 if symmetry == 1 else 3,
+            'symmetry_indicator': symmetry,
+            'number_mc': number_mc,
+            'distance_dc': distance_dc,
+            'number_ng': len(angles_g),
+            'distance_dg': distance_dg,
+            'report_no': self.document['test'],
+            'luminaire_name': self.document['luminaire'],
+            'luminaire_no': self.document['lumcat'],
+            'file_name': '',
+            'date_user': self.document['issuedate'],
+            'luminaire_length': length,
+            'luminaire_width': width,
+            'luminaire_height': height,
+            'luminous_length': length,
+            'luminous_width': width,
+            'luminous_height_c0': height,
+            'luminous_height_c90': height,
+            'luminaire_height_c180': height,
+            'luminaire_height_c270': height,
+            'dff': 100,
+            'lorl': 100,
+            'conversion_factor': 1,
+            'tilt': 0,
+            'number_n': 1,
+            'lamps': [{
+                'number_of': self.document['number_of_lamps'],
+                'type_of': self.document['lamp']
+                or self.document['lampcat'],
+                'total_flux': flux,
+                'total_power': self.document['input_watts'],
+            }],
+            'direct_ratios': np.zeros(10),
+            'angles_c': angles_c,
+            'angles_g': angles_g,
+            'luminous_intensities': np.round(
+                intensities[stored_index(symmetry, number_mc)]
+                * (1000 / flux), 3),
+        })
+        table = result.flux()
+        return result.set(
+            direct_ratios=np.round(result.compute_direct_ratios(), 3),
+            dff=round(table.downward * 100, 1),
+            lorl=100 if absolute else round(min(table.total / 10, 100), 1))
+
+    def write(self, save_path=''):
+        """Write ies file.
+
+        Args:
+            save_path (obj, optional): path to output ies file
+
+        Returns --
+            str: path to output ies file
+        """
+        if not save_path:
+            save_path = safe_filename(self.document.get('luminaire', 'none'),
+                                      'ies')
+        ies_file = open(pathlib.Path(save_path), 'w')
+        ies_file.write(self.text)
+        ies_file.close()
         return self
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Point by point illuminance.
+
+Luminaires are placed in right-handed coordinate system with z axis
+pointing up, lengths are in meters. Without rotation and tilt C0 plane
+of luminaire points along x axis, C90 plane along y axis and gamma 0
+down. Illuminance follows inverse square and cosine laws, points are
+processed in chunks to bound size of temporary arrays.
+
+"""
+
+
+import numpy as np
+
+
+KINDS = ('horizontal', 'vertical', 'cylindrical')
+
+
+def grid_points(width, length, nx, ny, origin=(0., 0.)):
+    """Return points of calculation grid.
+
+    Points lie in centres of nx x ny cells covering rectangle.
+
+    Args:
+        width (float): size of grid along x axis
+        length (float): size of grid along y axis
+        nx (int): number of points along x axis
+        ny (int): number of points along y axis
+        origin (tuple, optional): corner of grid (x, y)
+
+    Returns --
+        (tuple): x and y coordinates, matrices of shape (ny, nx)
+    """
+    x = origin[0] + (np.arange(nx) + .5) * width / nx
+    y = origin[1] + (np.arange(ny) + .5) * length / ny
+    return tuple(np.meshgrid(x, y))
+
+
+def rotation_matrix(rotation=0., tilt=0.):
+    """Return orientation of luminaire.
+
+    Args:
+        rotation (float, optional): rotation about vertical axis in
+            degrees, counterclockwise seen from above
+        tilt (float, optional): rotation about C0 axis of luminaire in
+            degrees, positive tilt turns nadir towards C90 plane
+
+    Returns --
+        (ndarray): matrix transforming luminaire coordinates to global
+    """
+    rotation, tilt = np.radians(rotation), np.radians(tilt)
+    about_z = np.array([[np.cos(rotation), -np.sin(rotation), 0],
+                        [np.sin(rotation), np.cos(rotation), 0],
+                        [0, 0, 1]])
+    about_x = np.array([[1, 0, 0],
+                        [0, np.cos(tilt), -np.sin(tilt)],
+                        [0, np.sin(tilt), np.cos(tilt)]])
+    return about_z @ about_x
+
+
+def directions(vectors, matrix):
+    """Return photometric angles of directions.
+
+    Args:
+        vectors (ndarray): directions in global coordinates, shape
+            (..., 3)
+        matrix (ndarray): orientation of luminaire, see rotation_matrix,
+            or orientations of shape (..., 3, 3) for each vector
+
+    Returns --
+        (tuple): C and gamma angles in degrees
+    """
+    # transposed matrix times vector
+    local = np.einsum('...i,...ij->...j', vectors, matrix)
+    c = np.degrees(np.arctan2(local[..., 1], local[..., 0])) % 360
+    gamma = np.degrees(np.arctan2(np.hypot(local[..., 0], local[..., 1]),
+                                  -local[..., 2]))
+    return c, gamma
+
+
+def _illuminance(intensities, vectors, distance, kind, normal):
+    """Return illuminance of points from luminous intensities.
+
+    Args:
+        intensities (ndarray): intensities towards points [cd]
+        vectors (ndarray): vectors from points to luminaire
+        distance (ndarray): lengths of vectors
+        kind (str): one of KINDS
+        normal (ndarray): normal of vertical plane
+
+    Returns --
+        (ndarray): illuminance [lx]
+    """
+    if kind == 'horizontal':
+        cosine = vectors[..., 2] / distance
+    elif kind == 'vertical':
+        cosine = vectors[..., :2] @ normal / distance
+    else:
+        # mean of vertical illuminance around small cylinder
+        cosine = np.hypot(vectors[..., 0], vectors[..., 1])\
+            / distance / np.pi
+    return intensities * np.maximum(cosine, 0) / distance ** 2
+
+
+class Luminaire(object):
+    """Luminaire placed in space.
+
+    Intensities of ldt object (cd/klm) are scaled to candelas with flux
+    of the first set of lamps and conversion factor.
+    """
+
+    __slots__ = (
+        'ldt',
+        'matrix',
+        'position',
+        'scale',
+    )
+
+    def __init__(self, ldt, position=(0., 0., 3.), rotation=0., tilt=0.,
+                 flux=None):
+        """Class constructor.
+
+        Args:
+            ldt (obj): LDT object
+            position (tuple, optional): position of luminaire (x, y, z)
+            rotation (float, optional): rotation about vertical axis in
+                degrees
+            tilt (float, optional): tilt about C0 axis in degrees
+            flux (float, optional): flux of lamps [lm], by default total
+                flux of the first set of lamps
+        """
+        if flux is None:
+            flux = ldt.document['lamps'][0]['total_flux']
+        self.ldt = ldt
+        self.matrix = rotation_matrix(rotation, tilt)
+        self.position = np.asarray(position, dtype=np.float64)
+        self.scale = flux / 1000 * ldt.document['conversion_factor']
+
+    def illuminance(self, x, y, z=0., kind='horizontal', azimuth=0.,
+                    chunk_size=65536):
+        """Return illuminance of points.
+
+        Args:
+            x (obj): x coordinates of points, array-like of any shape
+            y (obj): y coordinates, broadcastable with x
+            z (obj, optional): z coordinates, broadcastable with x
+            kind (str, optional): 'horizontal', 'vertical' or
+                'cylindrical' illuminance
+            azimuth (float, optional): direction the vertical plane faces
+                in degrees, counterclockwise from x axis
+            chunk_size (int, optional): number of points processed at once
+
+        Returns --
+            (ndarray): illuminance [lx], shape of broadcast coordinates
+        """
+        if kind not in KINDS:
+            raise ValueError('unknown illuminance %s' % kind)
+        x, y, z = np.broadcast_arrays(*(np.asarray(i, dtype=np.float64)
+                                        for i in (x, y, z)))
+        points = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=-1)
+        normal = np.array([np.cos(np.radians(azimuth)),
+                           np.sin(np.radians(azimuth))])
+        result = np.empty(len(points))
+        for start in range(0, len(points), max(chunk_size, 1)):
+            chunk = slice(start, start + chunk_size)
+            vectors = self.position - points[chunk]
+            distance = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+            c, gamma = directions(-vectors, self.matrix)
+            intensities = self.ldt.intensity_at(c, gamma) * self.scale
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = _illuminance(intensities, vectors, distance, kind,
+                                      normal)
+            result[chunk] = np.where(distance > 0, values, 0)
+        return result.reshape(x.shape)
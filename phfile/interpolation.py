@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Interpolation of luminous intensities.
+
+Intensities are interpolated between stored C-planes, symmetry is
+resolved with cached index maps (see symmetry.plane_index), so stored
+intensities are never expanded. Directions are given in photometric
+(C, gamma) coordinates in degrees, gamma 0 pointing down (nadir).
+
+"""
+
+
+import functools
+
+import numpy as np
+
+from .symmetry import plane_index, stored_index
+
+
+def _uniform_step(angles):
+    """Return step of evenly spaced angles or None."""
+    if len(angles) < 2:
+        return None
+    step = angles[1] - angles[0]
+    if np.allclose(np.diff(angles), step):
+        return step
+    return None
+
+
+def _locate(values, angles, step):
+    """Find grid cells of values.
+
+    Cells are computed directly for evenly spaced angles, otherwise
+    with binary search. Values outside of the grid are assigned to
+    the first or last cell.
+
+    Args:
+        values (ndarray): flat array of angles
+        angles (ndarray): grid angles, at least two
+        step (float): step of evenly spaced angles or None
+
+    Returns --
+        (tuple): index of lower grid angle, position within cell (0..1)
+    """
+    last = len(angles) - 2
+    if step is not None:
+        position = (values - angles[0]) / step
+        index = np.clip(np.floor(position), 0, last).astype(np.intp)
+        return index, np.clip(position - index, 0, 1)
+    index = np.clip(np.searchsorted(angles, values, side='right') - 1,
+                    0, last)
+    lower = angles[index]
+    return index, np.clip((values - lower) / (angles[index + 1] - lower),
+                          0, 1)
+
+
+def _cubic(p0, p1, p2, p3, t):
+    """Return Catmull-Rom spline between p1 and p2."""
+    return p1 + .5 * t * (p2 - p0 + t * (2 * p0 - 5 * p1 + 4 * p2 - p3
+                                         + t * (3 * (p1 - p2) + p3 - p0)))
+
+
+class Interpolator(object):
+    """Precomputed interpolation state of light distribution.
+
+    Interpolation is linear in gamma and linear or periodic cubic
+    (Catmull-Rom) in C. Intensities outside of measured gamma range
+    are 0.
+    """
+
+    __slots__ = (
+        '_angles_c',
+        '_angles_g',
+        '_intensities',
+        '_planes',
+        '_step_c',
+        '_step_g',
+    )
+
+    def __init__(self, angles_c, angles_g, intensities, symmetry,
+                 number_mc):
+        """Class constructor.
+
+        Args:
+            angles_c (ndarray): angles of all C-planes
+            angles_g (ndarray): gamma angles
+            intensities (ndarray): stored intensities, matrix of shape
+                (stored C-planes, gammas)
+            symmetry (int): symmetry indicator
+            number_mc (int): number of C-planes
+        """
+        angles_c = np.asarray(angles_c, dtype=np.float64)[:number_mc]
+        if symmetry == 1 or not len(angles_c):
+            angles_c = angles_c[:1] if len(angles_c) else np.zeros(1)
+            number_mc = 1
+        if len(angles_g) < 2:
+            raise ValueError('at least two gamma angles are required')
+        # C-planes are closed periodically with first plane + 360
+        self._angles_c = np.append(angles_c, angles_c[0] + 360)
+        self._angles_g = np.asarray(angles_g, dtype=np.float64)
+        self._intensities = intensities
+        self._planes = plane_index(symmetry, number_mc)
+        self._step_c = _uniform_step(self._angles_c)
+        self._step_g = _uniform_step(self._angles_g)
+
+    def __call__(self, c, gamma, method='linear'):
+        """Return intensities in given directions.
+
+        Args:
+            c (obj): C angles, array-like of any shape
+            gamma (obj): gamma angles, broadcastable with c
+            method (str, optional): interpolation in C, 'linear'
+                or 'cubic'
+
+        Returns --
+            (ndarray): intensities, shape of broadcast c and gamma
+        """
+        if method not in ('linear', 'cubic'):
+            raise ValueError('unknown interpolation method %s' % method)
+        c, gamma = np.broadcast_arrays(np.asarray(c, dtype=np.float64),
+                                       np.asarray(gamma, dtype=np.float64))
+        shape = c.shape
+        c, gamma = c.ravel(), gamma.ravel() % 360
+        # gamma over 180 lies in opposite C-plane
+        opposite = gamma > 180
+        gamma = np.where(opposite, 360 - gamma, gamma)
+        c = np.where(opposite, c + 180, c)
+        first_c = self._angles_c[0]
+        c = (c - first_c) % 360 + first_c
+        number_mc = len(self._planes)
+        cell_c, t_c = _locate(c, self._angles_c, self._step_c)
+        cell_g, t_g = _locate(gamma, self._angles_g, self._step_g)
+        planes = self._planes
+        intensities = self._intensities
+        if method == 'linear':
+            rows = (planes[cell_c], planes[(cell_c + 1) % number_mc])
+            weights = (1 - t_c, t_c)
+        else:
+            rows = tuple(planes[(cell_c + i) % number_mc]
+                         for i in (-1, 0, 1, 2))
+        values = []
+        for column in (cell_g, cell_g + 1):
+            points = [intensities[row, column] for row in rows]
+            if method == 'linear':
+                values.append(weights[0] * points[0]
+                              + weights[1] * points[1])
+            else:
+                values.append(np.maximum(_cubic(*points, t_c), 0))
+        result = (1 - t_g) * values[0] + t_g * values[1]
+        tolerance = 1e-9
+        outside = (gamma < self._angles_g[0] - tolerance)\
+            | (gamma > self._angles_g[-1] + tolerance)
+        result[outside] = 0
+        return result.reshape(shape)
+
+
+def _weights(values, angles, step, periodic, method='linear'):
+    """Return matrix of interpolation weights.
+
+    Args:
+        values (ndarray): angles to interpolate at
+        angles (ndarray): grid angles, closed with first angle + 360 when
+            periodic
+        step (float): step of evenly spaced angles or None
+        periodic (bool): wrap neighbours of the last angle to the first
+        method (str, optional): 'linear' or 'cubic' (periodic only)
+
+    Returns --
+        (ndarray): weights of shape (values, grid angles without closing
+            one when periodic)
+    """
+    size = len(angles) - 1 if periodic else len(angles)
+    cell, t = _locate(values, angles, step)
+    if method == 'linear':
+        columns = (cell, cell + 1)
+        weights = (1 - t, t)
+    else:
+        columns = tuple(cell + i for i in (-1, 0, 1, 2))
+        weights = (.5 * (-t + 2 * t ** 2 - t ** 3),
+                   .5 * (2 - 5 * t ** 2 + 3 * t ** 3),
+                   .5 * (t + 4 * t ** 2 - 3 * t ** 3),
+                   .5 * (t ** 3 - t ** 2))
+    result = np.zeros((len(values), size))
+    rows = np.arange(len(values))
+    for column, weight in zip(columns, weights):
+        np.add.at(result, (rows, column % size if periodic else column),
+                  weight)
+    return result
+
+
+@functools.lru_cache(maxsize=64)
+def _resample_weights(angles_c, angles_g, symmetry, number_mc, dc, dg,
+                      method):
+    """Return target grid and interpolation weights.
+
+    Arguments are hashable: angles are passed as bytes of float64
+    arrays.
+
+    Returns --
+        (tuple): read-only angles C, angles gamma, weights of stored
+            C-planes and weights of gammas
+    """
+    angles_c = np.frombuffer(angles_c)[:number_mc]
+    angles_g = np.frombuffer(angles_g)
+    if 360 % dc or not dc > 0:
+        raise ValueError('distance %s does not divide 360 degrees' % dc)
+    target_mc = round(360 / dc)
+    if symmetry in (3, 4) and target_mc % 4\
+            or symmetry == 2 and target_mc % 2:
+        raise ValueError('%s C-planes do not fit symmetry %s'
+                         % (target_mc, symmetry))
+    span = (angles_g[-1] - angles_g[0]) / dg if dg > 0 else np.nan
+    if not np.isclose(span, round(span)):
+        raise ValueError('distance %s does not divide gamma range' % dg)
+    target_c = np.arange(target_mc) * dc
+    target_g = angles_g[0] + np.arange(round(span) + 1) * dg
+    if symmetry == 1 or not len(angles_c):
+        weights_c = np.ones((1, 1))
+    else:
+        # C-planes are mapped to stored planes as in Interpolator
+        closed = np.append(angles_c, angles_c[0] + 360)
+        values = target_c[stored_index(symmetry, target_mc)]
+        values = (values - angles_c[0]) % 360 + angles_c[0]
+        weights = _weights(values, closed, _uniform_step(closed), True,
+                           method)
+        planes = plane_index(symmetry, number_mc)
+        weights_c = np.stack([np.bincount(planes, row, planes.max() + 1)
+                              for row in weights])
+    weights_g = _weights(target_g, angles_g, _uniform_step(angles_g), False)
+    for array in (target_c, target_g, weights_c, weights_g):
+        array.flags.writeable = False
+    return target_c, target_g, weights_c, weights_g
+
+
+def resample(intensities, angles_c, angles_g, symmetry, number_mc, dc, dg,
+             method='linear'):
+    """Resample intensities to evenly spaced grid.
+
+    Target C-planes start at 0, gammas span the measured range, symmetry
+    is kept. Interpolation is the same as of Interpolator, separable
+    weights (one matrix for C-planes, one for gammas) are cached per
+    source and target grid, so intensities of many files sharing grid
+    are resampled with two matrix products.
+
+    Args:
+        intensities (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas) or stack of such matrices
+        angles_c (ndarray): angles of all C-planes
+        angles_g (ndarray): gamma angles
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+        dc (float): distance between target C-planes, divides 360
+        dg (float): distance between target gammas, divides gamma range
+        method (str, optional): interpolation in C, 'linear' or 'cubic'
+
+    Returns --
+        (tuple): angles C, angles gamma and intensities
+    """
+    if method not in ('linear', 'cubic'):
+        raise ValueError('unknown interpolation method %s' % method)
+    target_c, target_g, weights_c, weights_g = _resample_weights(
+        np.asarray(angles_c, dtype=np.float64).tobytes(),
+        np.asarray(angles_g, dtype=np.float64).tobytes(),
+        symmetry, number_mc, dc, dg, method)
+    result = weights_c @ intensities
+    if method == 'cubic':
+        result = np.maximum(result, 0)
+    return target_c.copy(), target_g.copy(), result @ weights_g.T
@@ -7,16 +7,87 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 """
 
 
-import matplotlib.pyplot as plt
+import copy
 import math
 import numpy as np
 import pathlib
 import re
 
+from . import dedupe, flux, ies, symmetry
+from .interpolation import Interpolator, resample
 from .defaults import DEFAULT_CHART_PARAMS, DEFAULT_TEXT
 from .phbase import PHBase
-from .schemas import ldt_schema
-from .utils import safe_filename
+from .schemas import _parse_array, ldt_schema
+from .utils import decode, detect_encoding, safe_filename
+
+
+# items of numeric block
+_ARRAYS = ('direct_ratios', 'angles_c', 'angles_g', 'luminous_intensities')
+
+
+def _header_end(buffer):
+    """Find end of header and lamps lines.
+
+    Args:
+        buffer (obj): beginning of ldt file, bytes-like
+
+    Returns --
+        (tuple): offset of numeric block or None if buffer is too short,
+            number of lines in buffer
+    """
+    newlines = np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8)
+                              == ord('\n'))
+    if len(newlines) < 26:
+        return None, len(newlines) + 1
+    number_n = int(bytes(buffer[newlines[24] + 1:newlines[25]]))
+    # 26 header lines and 6 lines per each set of lamps
+    if len(newlines) <= 25 + 6 * number_n:
+        return None, len(newlines) + 1
+    return int(newlines[25 + 6 * number_n]) + 1, len(newlines) + 1
+
+
+def _ending(block):
+    """Return whitespace ending numeric block with normalised newlines."""
+    return block[len(block.rstrip()):].replace(b'\r\n', b'\n')\
+        .decode('ascii')
+
+
+def _parse_block(block, symmetry_indicator, number_mc, number_ng):
+    """Parse numeric block.
+
+    Args:
+        block (bytes): direct ratios, angles and intensities
+        symmetry_indicator (int): symmetry indicator
+        number_mc (int): number of C-planes
+        number_ng (int): number of gammas
+
+    Returns --
+        (tuple): arrays by item, cumulative numbers of values of sections
+
+    Raises --
+        ValueError: in case of wrong number of values
+    """
+    mc1, mc2 = symmetry.stored_planes(symmetry_indicator, number_mc)
+    if b',' in block:
+        block = block.replace(b',', b'.')
+    values = _parse_array(block)
+    # direct ratios, C angles, gamma angles, intensities
+    sections = np.cumsum([10, number_mc, number_ng,
+                          (mc2 - mc1 + 1) * number_ng])
+    if values.size != sections[-1]:
+        raise ValueError(('ldt file has wrong number of values'
+                          + ' (got %s expected %s)')
+                         % (values.size, sections[-1]))
+    direct_ratios, angles_c, angles_g, intensities = np.split(
+        values, sections[:-1])
+    # intensities are kept as (C-planes x gammas) matrix
+    return {
+        'direct_ratios': direct_ratios,
+        'angles_c': angles_c,
+        'angles_g': angles_g,
+        'luminous_intensities': intensities
+                                .reshape(mc2 - mc1 + 1, number_ng),
+    }, sections
 
 
 class LDT(PHBase, object):
@@ -30,18 +101,85 @@ class LDT(PHBase, object):
 
     """
 
-    def __init__(self):
-        """Class constructor."""
+    __slots__ = (
+        '_flux',
+        '_full_intensities',
+        '_interpolator',
+        '_layout',
+        '_pending',
+        '_source',
+        '_text_block',
+        'auto_direct_ratios',
+    )
+
+    def __init__(self, strict=False, auto_direct_ratios=False):
+        """Class constructor.
+
+        Args:
+            strict (bool, optional): validate with cerberus (reference,
+                slow) instead of compiled validator
+            auto_direct_ratios (bool, optional): recompute direct ratios
+                in set() whenever intensities, angles or symmetry change
+        """
         def to_int(val):
             result = re.search('[0-9]{2,4}', val)
             return int(result[0]) if result else 0
 
-        super().__init__()
-        self.schema = ldt_schema
+        super().__init__(strict, ldt_schema)
+        self.auto_direct_ratios = auto_direct_ratios
+        # stored intensities, symmetry, number_mc and expanded intensities
+        self._full_intensities = (None, None, None, None)
+        # document items cached objects were built from and the objects
+        self._flux = (None, None)
+        self._interpolator = (None, None)
+        self._text_block = (None, None)
+        # loaded items and their original text
+        self._source = {}
+        # numeric block of file loaded with header_only
+        self._pending = None
+        # encoding, line ending and end of loaded file
+        self._layout = None
+
+    def _consistency(self, document):
+        """Return errors of items inconsistent with other items.
+
+        Numbers of angles and shape of intensities have to follow
+        numbers of C-planes and gammas and symmetry, number of lamps
+        sets has to follow number_n.
+
+        Args:
+            document (dict): document
+
+        Returns --
+            (dict): errors by item
+        """
+        errors = {}
+        sizes = {'angles_c': 'number_mc', 'angles_g': 'number_ng',
+                 'lamps': 'number_n'}
+        for item, number in sizes.items():
+            if document.get(item) is not None\
+                    and document.get(number) is not None\
+                    and len(document[item]) != document[number]:
+                errors[item] = ['length must be %s (%s)'
+                                % (number, document[number])]
+        intensities = document.get('luminous_intensities')
+        if intensities is not None\
+                and all(document.get(item) is not None for item
+                        in ('symmetry_indicator', 'number_mc', 'number_ng')):
+            try:
+                mc1, mc2 = symmetry.stored_planes(
+                    document['symmetry_indicator'], document['number_mc'])
+            except ValueError:
+                return errors
+            shape = (mc2 - mc1 + 1, document['number_ng'])
+            if np.shape(intensities) != shape:
+                errors['luminous_intensities'] = ['shape must be %s'
+                                                  % (shape, )]
+        return errors
 
     def _handle_number_of_lamps(self, num):
         lamps = []
-        for lamp in self.document.get('lamps', []):
+        for lamp in self._document.get('lamps', []):
             lamp.update({'number_of': num,
                          'total_flux': lamp['total_flux'] * num,
                          'total_power': lamp['total_power'] * num, })
@@ -55,18 +193,256 @@ class LDT(PHBase, object):
         Returns --
             (str): ies document
         """
-        def to_str(item):
-            try:
-                return '\n'.join([to_str(i.values()) for i in item])
-            except AttributeError:
-                return ('\n'.join(map(str, item)))
+        self._check()
+        return '\n'.join([self._render(item)
+                          for item in list(self.schema.keys())[:-4]]
+                         + [self._block()])
+
+    def _block(self):
+        """Return text of numeric block.
+
+        Direct ratios, angles and intensities are rendered once, text is
+        cached until any of them is replaced and shared with variants.
+
+        Returns --
+            (str): numeric block
+        """
+        items = ('direct_ratios', 'angles_c', 'angles_g',
+                 'luminous_intensities')
+        return self._cached(
+            '_text_block',
+            lambda *values: '\n'.join(map(self._render, items, values)),
+            *items)
+
+    def _render(self, item, value=None):
+        """Return text of item.
+
+        Items which did not change since load are copied from original
+        file, so formatting of numbers is kept.
+
+        Args:
+            item (str): name of item
+            value (obj, optional): value of item, by default taken from
+                document
+
+        Returns --
+            (str): lines of item
+        """
+        if value is None:
+            value = self.document[item]
+        source = self._source.get(item)
+        if source is not None:
+            original, text = source
+            if original is value or not isinstance(value, np.ndarray)\
+                    and original == value:
+                return text
+        if isinstance(value, np.ndarray):
+            return '\n'.join(map(str, value.ravel().tolist()))
+        if isinstance(value, list):
+            return '\n'.join('\n'.join(map(str, lamp.values()))
+                             for lamp in value)
+        if item == 'distance_dc' and value.is_integer():
+            # whole distances are written as integers
+            return str(int(value))
+        return str(value)
+
+    def _cached(self, attribute, factory, *items):
+        """Return object built from document items.
+
+        Object is cached in attribute until any of items is replaced.
+
+        Args:
+            attribute (str): name of attribute holding cached object
+            factory (callable): function called with values of items
+            *items: names of document items
+
+        Returns --
+            (obj): cached object
+        """
+        values = tuple(self.document[item] for item in items)
+        cached, result = getattr(self, attribute)
+        if cached is None\
+                or any(a is not b for a, b in zip(cached, values)):
+            result = factory(*values)
+            setattr(self, attribute, (values, result))
+        return result
+
+    def c_plane(self, angle):
+        """Return intensities of C-plane.
+
+        Args:
+            angle (float): C-plane angle
+
+        Returns --
+            (ndarray): read-only view of intensities of C-plane
+        """
+        full = self.full_intensities()
+        if self.document['symmetry_indicator'] == 1:
+            return full[0]
+        index = np.flatnonzero(np.isclose(self.document['angles_c'],
+                                          angle % 360))
+        if not index.size:
+            raise ValueError('there is no C-plane %s' % angle)
+        return full[index[0]]
+
+    def check_flux(self, tolerance=1.):
+        """Compare LORL and DFF with the ones computed from intensities.
+
+        Args:
+            tolerance (float, optional): allowed difference in percent
+                points
+
+        Returns --
+            (dict): stored and computed values of items exceeding
+                tolerance, empty if both items agree
+        """
+        table = self.flux()
+        computed = {'dff': table.downward * 100, 'lorl': table.total / 10}
+        return {item: (self.document[item], value)
+                for item, value in computed.items()
+                if abs(self.document[item] - value) > tolerance}
+
+    def compact(self, symmetry_indicator=None, tolerance=.01):
+        """Store intensities with given or detected symmetry.
+
+        Args:
+            symmetry_indicator (int, optional): new symmetry, detected
+                within tolerance when not given
+            tolerance (float, optional): allowed difference of mirrored
+                C-planes relative to maximum intensity
+
+        Returns --
+            (obj): self
+        """
+        full = self.full_intensities()
+        if symmetry_indicator is None:
+            symmetry_indicator = symmetry.detect_symmetry(full, tolerance)
+        return self.set(symmetry_indicator=symmetry_indicator,
+                        luminous_intensities=symmetry.compact(
+                            full, symmetry_indicator))
+
+    def content_hash(self, tolerance=None):
+        """Return canonical hash of light distribution.
 
-        self.validate(self.document)
-        results = [self.document[item]
-                   if not isinstance(self.document[item], list)
-                   else to_str(self.document[item])
-                   for item in self.schema.keys()]
-        return '\n'.join(map(str, results))
+        See dedupe.distribution_hash.
+
+        Args:
+            tolerance (float, optional): quantisation step of
+                intensities [cd/klm]
+
+        Returns --
+            (str): hexadecimal digest
+        """
+        return dedupe.distribution_hash(self, tolerance)
+
+    def flux(self):
+        """Return zonal flux computed from intensities.
+
+        Flux is given in lm per 1000 lm of lamps flux, so total flux
+        divided by 10 is LORL in percent. Result is cached until
+        intensities or angles change.
+
+        Returns --
+            (obj): flux.FluxTable with total, downward, upward, zonal
+                and cone() flux
+        """
+        self._check_consistency()
+        return self._cached(
+            '_flux',
+            lambda intensities, factor, *args: flux.integrate(
+                intensities * factor, *args),
+            'luminous_intensities', 'conversion_factor', 'angles_c',
+            'angles_g', 'symmetry_indicator', 'number_mc')
+
+    def compute_direct_ratios(self, spacing=1.25):
+        """Compute direct ratios from intensities.
+
+        See flux.direct_ratios for the CIE 52 zonal method.
+
+        Args:
+            spacing (float, optional): spacing to height ratio of
+                luminaires, 1, 1.25 or 1.5
+
+        Returns --
+            (ndarray): direct ratios for room indices 0.60 ... 5.00
+        """
+        return flux.direct_ratios(
+            self.document['luminous_intensities'],
+            self.document['angles_c'], self.document['angles_g'],
+            self.document['symmetry_indicator'], self.document['number_mc'],
+            spacing)
+
+    def full_intensities(self):
+        """Return intensities of all C-planes.
+
+        Symmetry is expanded with cached index maps, result is cached
+        until intensities or symmetry change.
+
+        Returns --
+            (ndarray): read-only matrix of shape (number_mc, number_ng)
+        """
+        self._check_consistency()
+        intensities, symmetry_indicator, number_mc = (
+            self.document['luminous_intensities'],
+            self.document['symmetry_indicator'],
+            self.document['number_mc'])
+        cached = self._full_intensities
+        if cached[0] is not intensities\
+                or cached[1:3] != (symmetry_indicator, number_mc):
+            self._full_intensities = (intensities,
+                                      symmetry_indicator,
+                                      number_mc,
+                                      symmetry.expand(intensities,
+                                                      symmetry_indicator,
+                                                      number_mc))
+        return self._full_intensities[3]
+
+    def intensity_at(self, c, gamma, method='linear'):
+        """Return luminous intensities in given directions.
+
+        Intensities are interpolated linearly in gamma and linearly or
+        with periodic cubic spline in C, symmetry is resolved without
+        expanding intensities. Interpolation state is cached, see
+        interpolator().
+
+        Args:
+            c (obj): C angles in degrees, array-like of any shape
+            gamma (obj): gamma angles in degrees, broadcastable with c
+            method (str, optional): interpolation in C, 'linear'
+                or 'cubic'
+
+        Returns --
+            (ndarray): intensities [cd/klm], shape of broadcast c and gamma
+        """
+        return self.interpolator()(c, gamma, method)
+
+    def interpolator(self):
+        """Return interpolation state of intensities.
+
+        Result is cached until intensities or angles change.
+
+        Returns --
+            (obj): interpolation.Interpolator, picklable callable
+                returning intensities [cd/klm] for C and gamma angles
+        """
+        self._check_consistency()
+        return self._cached('_interpolator', Interpolator,
+                            'angles_c', 'angles_g', 'luminous_intensities',
+                            'symmetry_indicator', 'number_mc')
+
+    @property
+    def document(self):
+        """Return document.
+
+        Numeric block of file loaded with header_only is parsed on first
+        access.
+
+        Returns --
+            (dict): document
+        """
+        if self._pending is not None:
+            self._complete()
+        return self._document
 
     def item(self, *args):
         """Return items.
@@ -79,82 +455,254 @@ class LDT(PHBase, object):
             as dictionary, single item is returned as value, in case of
             not finding the item False is returned
         """
+        if self._pending is not None and set(args) & set(_ARRAYS):
+            self._complete()
         return super().item(*args)
 
-    def load(self, ldt_path):
+    def load(self, ldt_path, encoding=None, cache=None, header_only=False):
         """Load ldt file.
 
         Args:
-            ldt_path (str): path to ldt file
+            ldt_path (obj): path to ldt file or file-like object
+            encoding (str, optional): encoding of text items, by default
+                utf-8, cp1252 and latin-1 are tried
+            cache (obj, optional): cache.ParseCache, used for paths only
+            header_only (bool, optional): read only header and lamps,
+                numeric block is read and parsed on first access to
+                document or its arrays, used for paths only
+
+        Returns --
+            (obj): self
+        """
+        if cache is not None and not hasattr(ldt_path, 'read'):
+            return cache.load(self, ldt_path, encoding)
+        if hasattr(ldt_path, 'read'):
+            return self.loads(ldt_path.read(), encoding)
+        if header_only:
+            return self._load_header(ldt_path, encoding)
+        with open(ldt_path, 'rb') as f:
+            return self.loads(f.read(), encoding)
+
+    def _load_header(self, ldt_path, encoding=None):
+        """Load header and lamps of ldt file, see load().
 
         Returns --
             (obj): self
         """
-        class _Index(object):
-            __slots__ = (
-                '_index',
-            )
+        data = b''
+        with open(ldt_path, 'rb') as f:
+            while True:
+                chunk = f.read(4096)
+                data += chunk
+                header_end, lines = _header_end(data)
+                if header_end is not None or not chunk:
+                    break
+        if header_end is None:
+            raise ValueError('ldt file has wrong number of lines'
+                             + ' (got %s)' % lines)
+        items, document, layout = self._header(data[:header_end], encoding)
+        self._document, self._validated = {}, {}
+        self.validate(document, update=True)
+        self._source = self._sources(items)
+        self._layout = layout + ('\n', )
+        self._pending = (ldt_path, header_end, int(items[2]), int(items[3]),
+                         int(items[5]))
+        return self
 
-            def __init__(self, index):
-                self._index = index
+    def _complete(self):
+        """Read and parse numeric block of file loaded with header_only.
 
-            @property
-            def i(self):
-                return self._index
+        Items set since loading are kept.
+        """
+        ldt_path, header_end, symmetry_indicator, number_mc, number_ng\
+            = self._pending
+        with open(ldt_path, 'rb') as f:
+            f.seek(header_end)
+            raw = f.read()
+        arrays, sections = _parse_block(raw, symmetry_indicator, number_mc,
+                                        number_ng)
+        self.validate({item: value for item, value in arrays.items()
+                       if item not in self._document}, update=True)
+        self._source = {**self._source,
+                        **self._block_sources(raw, sections)}
+        self._layout = self._layout[:2] + (_ending(raw), )
+        self._pending = None
+
+    def loads(self, data, encoding=None):
+        """Load ldt document from buffer.
+
+        Header lines are decoded separately, numeric block (direct
+        ratios, angles and intensities) is parsed straight from buffer.
 
-            def add(self, val):
-                self._index += val
-                return self._index
+        Args:
+            data (obj): bytes, bytearray, memoryview or str
+            encoding (str, optional): encoding of text items, by default
+                utf-8, cp1252 and latin-1 are tried
 
-        keys = list(self.schema.keys())[:26]
-        with open(ldt_path) as f:
-            items = f.read().splitlines()
-            document = {keys[i]: items[i]
-                        for i in range(0, 26)}
-            # auxiliary variables for storing keys of lamp data dict
-            keys = list(self.schema
-                        ['lamps']
-                        ['schema']
-                        ['schema'].keys())
-            i = _Index(26)
-            # generates list od dicts with lamps data
-            document.update({
-                'lamps': [{keys[j]: item
-                           for j, item
-                           in enumerate(items[i.i:i.add(6)])}
-                          for k in range(0, int(items[25]))],
-            })
-            document.update({
-                'direct_ratios': items[i.i:i.add(10)],
-            })
-            number_mc = int(items[3])
-            document.update({
-                'angles_c': items[i.i:i.add(number_mc)],
-            })
-            number_ng = int(items[5])
-            document.update({
-                'angles_g': items[i.i:i.add(number_ng)],
-            })
-            # calculates mc1, mc2 according to Note 2 from
-            # http://www.helios32.com/Eulumdat.htm
-            mc1, mc2 = {
-                0: (1, number_mc),
-                1: (1, 1),
-                2: (1, number_mc // 2 + 1),
-                3: (3 * number_mc // 4 + 1, 5 * number_mc // 4 + 1),
-                4: (1, number_mc // 4 + 1),
-            }.get(int(items[2]))
-            document.update({
-                'luminous_intensities': items[i.i:i.add((mc2 - mc1 + 1)
-                                              * number_ng)],
-            })
-        if i.i != len(items):
-            raise ValueError(('ldt file has wrong number of lines'
-                              + ' (got %s expected %s)')
-                             % (len(items), i.i))
+        Returns --
+            (obj): self
+        """
+        if isinstance(data, str):
+            data, encoding = data.encode('utf-8'), 'utf-8'
+        buffer = memoryview(data).cast('B')
+        header_end, lines = _header_end(buffer)
+        if header_end is None:
+            raise ValueError('ldt file has wrong number of lines'
+                             + ' (got %s)' % lines)
+        items, document, layout = self._header(bytes(buffer[:header_end]),
+                                               encoding)
+        raw = bytes(buffer[header_end:])
+        arrays, sections = _parse_block(raw, int(items[2]), int(items[3]),
+                                        int(items[5]))
+        document.update(arrays)
         self.validate(document)
+        self._pending = None
+        self._source = {}
+        self._source = {**self._sources(items),
+                        **self._block_sources(raw, sections)}
+        self._layout = layout + (_ending(raw), )
         return self
 
+    def _header(self, data, encoding=None):
+        """Decode header and lamps.
+
+        Args:
+            data (bytes): header lines and lamps lines
+            encoding (str, optional): encoding of text items
+
+        Returns --
+            (tuple): lines, document with header items and lamps,
+                encoding and line ending
+        """
+        encoding = encoding or detect_encoding(data)
+        items = [item.rstrip('\r') for item
+                 in decode(data, encoding).split('\n')[:-1]]
+        keys = list(self.schema.keys())[:26]
+        document = {keys[i]: items[i]
+                    for i in range(0, 26)}
+        # auxiliary variables for storing keys of lamp data dict
+        keys = list(self.schema
+                    ['lamps']
+                    ['schema']
+                    ['schema'].keys())
+        # generates list od dicts with lamps data
+        document.update({
+            'lamps': [{keys[j]: item
+                       for j, item
+                       in enumerate(items[26 + 6 * k:32 + 6 * k])}
+                      for k in range(0, (len(items) - 26) // 6)],
+        })
+        return items, document,\
+            (encoding, '\r\n' if b'\r\n' in data else '\n')
+
+    def _state(self):
+        """Return loaded state shared with cache.
+
+        Arrays become read-only, see variant(), lamps are copied as they
+        are changed in place.
+
+        Returns --
+            (tuple): document, original text of items and layout of file
+        """
+        for value in self._document.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        document = dict(self._document)
+        if 'lamps' in document:
+            document['lamps'] = [dict(lamp) for lamp in document['lamps']]
+        return document, self._source, self._layout
+
+    def _restore(self, document, source, layout):
+        """Restore loaded state without parsing and validation.
+
+        Args:
+            document (dict): validated document, see _state()
+            source (dict): original text of items
+            layout (tuple): encoding, line ending and end of file
+
+        Returns --
+            (obj): self
+        """
+        self._document = dict(document)
+        if 'lamps' in document:
+            self._document['lamps'] = [dict(lamp) for lamp
+                                       in document['lamps']]
+        self._validated = dict(self._document)
+        self._source = source
+        self._layout = layout
+        self._pending = None
+        return self
+
+    def _sources(self, items):
+        """Return loaded header items and their original text.
+
+        Items rendered the same way as they were written are skipped.
+
+        Args:
+            items (list): decoded header and lamps lines
+
+        Returns --
+            (dict): pairs of value and text by item
+        """
+        keys = list(self.schema.keys())
+        texts = dict(zip(keys[:26], items))
+        texts['lamps'] = '\n'.join(items[26:])
+        document = self._document
+        return {item: (copy.deepcopy(document[item]) if item == 'lamps'
+                       else document[item], text)
+                for item, text in texts.items()
+                if self._render(item, document[item]) != text}
+
+    def _block_sources(self, block, sections):
+        """Return loaded arrays and their original text.
+
+        Numeric sections are sliced from block only when each value is
+        in its own line, otherwise they are rendered on write.
+
+        Args:
+            block (bytes): numeric block
+            sections (ndarray): cumulative numbers of values of sections
+
+        Returns --
+            (dict): pairs of value and text by item
+        """
+        block = block.replace(b'\r\n', b'\n').rstrip()
+        newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8)
+                                  == ord('\n'))
+        if len(newlines) + 1 != sections[-1]:
+            return {}
+        bounds = np.concatenate(([-1], newlines, [len(block)]))
+        return {item: (self._document[item],
+                       block[bounds[start] + 1:bounds[end]].decode('ascii'))
+                for item, start, end in zip(
+                    _ARRAYS, np.concatenate(([0], sections[:-1])), sections)}
+
+    def resample(self, dc, dg, method='linear'):
+        """Resample intensities to evenly spaced grid.
+
+        Angles, numbers and distances of C-planes and gammas are
+        rebuilt together with intensities, symmetry is kept. See
+        interpolation.resample for the method.
+
+        Args:
+            dc (float): distance between C-planes, divides 360
+            dg (float): distance between gammas, divides gamma range
+            method (str, optional): interpolation in C, 'linear'
+                or 'cubic'
+
+        Returns --
+            (obj): self
+        """
+        angles_c, angles_g, intensities = resample(
+            self.document['luminous_intensities'],
+            self.document['angles_c'], self.document['angles_g'],
+            self.document['symmetry_indicator'], self.document['number_mc'],
+            dc, dg, method)
+        return self.set(number_mc=len(angles_c), distance_dc=dc,
+                        number_ng=len(angles_g), distance_dg=dg,
+                        angles_c=angles_c, angles_g=angles_g,
+                        luminous_intensities=intensities)
+
     def set(self, *args, **kwargs):
         """Set value of items.
 
@@ -188,6 +736,32 @@ class LDT(PHBase, object):
         args = _args(*args)
         kwargs = _kwargs(**kwargs)
         super().set(*args, **kwargs)
+        self._flux = self._interpolator = (None, None)
+        # flat intensities are reshaped to (C-planes x gammas) matrix
+        # as soon as number of gammas is known
+        intensities = self._document.get('luminous_intensities')
+        number_ng = self._document.get('number_ng')
+        if intensities is not None and number_ng\
+                and intensities.shape[1:] != (number_ng, )\
+                and intensities.size % number_ng == 0:
+            self._document['luminous_intensities'] = intensities\
+                .reshape(-1, number_ng)
+            if self._validated.get('luminous_intensities') is intensities:
+                # reshaped values are valid as well
+                self._validated['luminous_intensities'] = \
+                    self._document['luminous_intensities']
+        distribution = {'angles_c', 'angles_g', 'luminous_intensities',
+                        'number_mc', 'symmetry_indicator'}
+        if self.auto_direct_ratios\
+                and distribution & set(args[::2] + list(kwargs)):
+            try:
+                direct_ratios = self.compute_direct_ratios()
+            except (KeyError, ValueError):
+                # distribution is not complete yet
+                pass
+            else:
+                self.validate({'direct_ratios': np.round(direct_ratios, 3)},
+                              update=True)
         return self
 
     def plot(self, save_path='', **kwargs):
@@ -200,18 +774,6 @@ class LDT(PHBase, object):
         Returns ---
             str: path to output svg file
         """
-        def c_plane_intensities(*args):
-            try:
-                start, end = (args[0] // self.document['distance_dc']
-                              * self.document['number_ng'],
-                              (args[0] // self.document['distance_dc'] + 1)
-                              * self.document['number_ng'])
-            except ZeroDivisionError:
-                start, end = (0, self.document['number_ng'])
-            return self.document['luminous_intensities'][start:end]\
-                if self.document['luminous_intensities'][start:end]\
-                else c_plane_intensities(*args[1:])
-
         def round_up(num, oom=1):
             digits = list(reversed([int((num // 10 ** i) % 10)
                                     for i
@@ -223,10 +785,15 @@ class LDT(PHBase, object):
                         for i in range(oom, len(digits))])\
                 if num > 10 ** oom else 10 ** oom
 
-        self.validate(self.document)
+        # matplotlib is imported on first plot only, Figure is used instead
+        # of pyplot to avoid initializing GUI backend
+        import matplotlib
+        from matplotlib.figure import Figure
+
+        self._check()
         # overwrite default rcParams
-        plt.rcParams.update(kwargs.get('rc', {}))
-        fig = plt.figure()
+        matplotlib.rcParams.update(kwargs.get('rc', {}))
+        fig = Figure()
         ax = fig.add_axes([0, .15, 1, .75],
                           projection='polar',
                           rlabel_position=22.5,
@@ -242,8 +809,8 @@ class LDT(PHBase, object):
         if self.document['symmetry_indicator'] != 1:
             c_planes.extend([(90, 270)])
         for i, (c_pf, c_ps) in enumerate(c_planes):
-            values = c_plane_intensities(c_pf)\
-                     + list(reversed(c_plane_intensities(c_ps, c_pf)))
+            values = np.concatenate((self.c_plane(c_pf),
+                                     self.c_plane(c_ps)[::-1]))
             chart_params = kwargs.get({
                 0: 'C0C180',
                 1: 'C90C270',
@@ -273,13 +840,108 @@ class LDT(PHBase, object):
             save_path = safe_filename(self.document.get('luminaire_name',
                                                         'none'),
                                       'svg')
-        plt.savefig(save_path)
-        plt.close(fig)
+        fig.savefig(save_path)
         return self
 
+    def to_ies(self):
+        """Convert to ies.
+
+        Symmetry is expanded to full set of horizontal angles (C0-C360),
+        intensities are converted from cd/klm to cd with flux of the first
+        set of lamps, conversion factor is kept as candela multiplier.
+
+        Returns --
+            (obj): IES object
+        """
+        self._check()
+        lamp = self.document['lamps'][0]
+        intensities = self.full_intensities()
+        angles_c = self.document['angles_c']
+        if angles_c[-1] < 360:
+            # full set of horizontal angles is closed by C360 = C0
+            intensities = np.concatenate((intensities, intensities[:1]))
+            angles_c = np.append(angles_c, 360)
+        candela_values = intensities * (lamp['total_flux'] / 1000)
+        # dimensions in meters, circular luminous area has negative
+        # width and length equal to diameter
+        if self.document['luminous_width']:
+            width, length = (self.document['luminous_width'] / 1000,
+                             self.document['luminous_length'] / 1000)
+        else:
+            width = length = -self.document['luminous_length'] / 1000
+        return ies.IES().set(**{
+            'header': 'IESNA:LM-63-2002',
+            'test': self.document['report_no'],
+            'testlab': '',
+            'issuedate': self.document['date_user'],
+            'manufac': self.document['company'],
+            'lumcat': self.document['luminaire_no'],
+            'luminaire': self.document['luminaire_name'],
+            'lampcat': '',
+            'lamp': lamp['type_of'],
+            'number_of_lamps': lamp['number_of'],
+            'lumens_per_lamp': lamp['total_flux'] // max(lamp['number_of'],
+                                                         1),
+            'candela_multiplier': self.document['conversion_factor'],
+            'number_of_vertical_angles': self.document['number_ng'],
+            'number_of_horizontal_angles': len(angles_c),
+            'photometric_type': 1,
+            'units_type': 2,
+            'width': width,
+            'length': length,
+            'height': self.document['luminous_height_c0'] / 1000,
+            'ballast_factor': 1,
+            'future_use': 1,
+            'input_watts': lamp['total_power'],
+            'vertical_angles': self.document['angles_g'],
+            'horizontal_angles': angles_c,
+            'candela_values': np.round(candela_values, 3),
+        })
+
+    def variant(self, **kwargs):
+        """Return copy of object with changed items.
+
+        Arrays (direct ratios, angles and intensities) are shared, not
+        copied, and become read-only: set() replaces arrays instead of
+        modifying them, so changes of either object do not affect the
+        other. Only given items are validated, cached flux,
+        interpolation state and rendered numeric block are shared.
+
+        Args:
+            **kwargs: items to change, see set()
+
+        Returns --
+            (obj): LDT object
+        """
+        for value in self.document.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        try:
+            # numeric block is rendered once for all variants
+            self._block()
+        except KeyError:
+            # numeric items are not set yet
+            pass
+        result = copy.copy(self)
+        result._validated = dict(self._validated)
+        result._document = dict(self._document)
+        if 'lamps' in self._document:
+            result._document['lamps'] = [dict(lamp) for lamp
+                                         in self._document['lamps']]
+        if kwargs:
+            result.set(**kwargs)
+            # caches are bound to identity of items they were built from
+            result._flux, result._interpolator = self._flux,\
+                self._interpolator
+        return result
+
     def write(self, save_path=''):
         """Write ldt file.
 
+        Loaded file is written with its encoding (utf-8 if changed items
+        cannot be encoded with it) and line endings, so unchanged file is
+        written byte for byte.
+
         Args:
             save_path (obj, optional): path to output ldt file
 
@@ -290,7 +952,18 @@ class LDT(PHBase, object):
             save_path = safe_filename(self.document.get('luminaire_name',
                                                         'none'),
                                       'ldt')
-        ldt_file = open(pathlib.Path(save_path), 'w')
-        ldt_file.write(self.text)
-        ldt_file.close()
+        text = self.text
+        if self._layout is None:
+            ldt_file = open(pathlib.Path(save_path), 'w')
+            ldt_file.write(text)
+            ldt_file.close()
+            return self
+        encoding, newline, ending = self._layout
+        text = (text + ending).replace('\n', newline)
+        try:
+            data = text.encode(encoding)
+        except UnicodeEncodeError:
+            data = text.encode('utf-8')
+        with open(pathlib.Path(save_path), 'wb') as ldt_file:
+            ldt_file.write(data)
         return self
@@ -10,8 +10,7 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 import abc
 import warnings
 
-import cerberus
-
+from . import validator
 from .exceptions import PhotometryValidationError
 
 
@@ -20,13 +19,27 @@ class PHBase(abc.ABC, object):
 
     __slots__ = (
         '_document',
+        '_errors',
+        '_validated',
         '_validator',
     )
 
-    def __init__(self):
-        """Class constructor."""
+    def __init__(self, strict=False, schema=None):
+        """Class constructor.
+
+        Validator is shared by all objects using the same schema.
+
+        Args:
+            strict (bool, optional): validate with cerberus (reference,
+                slow) instead of compiled validator
+            schema (dict, optional): validation schema
+        """
         self._document = {}
-        self._validator = cerberus.Validator()
+        self._errors = {}
+        # values of items as they were last validated
+        self._validated = {}
+        self._validator = validator.shared_validator(
+            {} if schema is None else schema, strict)
 
     @property
     def document(self):
@@ -44,7 +57,7 @@ class PHBase(abc.ABC, object):
         Returns --
             (list): validation errors
         """
-        return self._validator.errors
+        return self._errors
 
     @property
     def schema(self):
@@ -58,7 +71,8 @@ class PHBase(abc.ABC, object):
     @schema.setter
     def schema(self, schema):
         """."""
-        self._validator.schema = schema
+        self._validator = validator.shared_validator(schema,
+                                                     self._validator.strict)
 
     @property
     @abc.abstractmethod
@@ -82,7 +96,7 @@ class PHBase(abc.ABC, object):
             as dictionary, single item is returned as value, in case of
             not finding the item False is returned
         """
-        results = {arg: self.document.get(arg, None)
+        results = {arg: self._document.get(arg, None)
                    for arg in args
                    if arg in self.schema}
         for item in set(args).difference(list(results.keys())):
@@ -133,16 +147,72 @@ class PHBase(abc.ABC, object):
                   if item in handlers})
         self.validate(kwargs, update=True)
 
+    def _check(self):
+        """Validate document before use.
+
+        Only items replaced since they were last validated are
+        validated, unchanged document is not validated at all. Items
+        are compared by identity, so arrays modified in place are not
+        detected.
+
+        Raises --
+            PhotometryValidationError: in case of incorrect, incomplete
+                or inconsistent document
+        """
+        validated = self._validated
+        dirty = {item: value for item, value in self.document.items()
+                 if item not in validated or validated[item] is not value}
+        complete = all(item in validated or item in dirty
+                       for item, rules in self.schema.items()
+                       if rules.get('required'))
+        if not complete:
+            self.validate(self.document)
+        elif dirty:
+            self.validate(dirty, update=True)
+        self._check_consistency()
+
+    def _check_consistency(self):
+        """Check that items of document are consistent with each other.
+
+        Raises --
+            PhotometryValidationError: in case of inconsistent items
+        """
+        errors = self._consistency(self.document)
+        if errors:
+            self._errors = errors
+            raise PhotometryValidationError('items are inconsistent: %s'
+                                            % ', '.join(sorted(errors)))
+
+    def _consistency(self, document):
+        """Return errors of items inconsistent with other items.
+
+        Items can be set one by one, so consistency is checked for
+        whole document only and before use, see _check().
+
+        Args:
+            document (dict): document
+
+        Returns --
+            (dict): errors by item
+        """
+        return {}
+
     def validate(self, document, update=False):
         """Validate document.
 
+        Whole document (not update) is checked for consistency of items
+        as well.
+
         Args:
             document (dict): document for validation
         """
-        self._validator.validate({item: value
-                                  for item, value in document.items()
-                                  if item in self.schema},
-                                 update=update)
+        normalized, self._errors = self._validator.validate(
+            {item: value
+             for item, value in document.items()
+             if item in self.schema},
+            update=update)
+        if not self._errors and not update:
+            self._errors = self._consistency(normalized)
         if not self.errors:
             # condition 'item in kwargs' is neccessary due to some items
             # to have default values defined in validation schema,
@@ -150,9 +220,12 @@ class PHBase(abc.ABC, object):
             # can overwrite correct values set or loaded earlier
             self._document.update({
                 item: value
-                for item, value in self._validator.document.items()
+                for item, value in normalized.items()
                 if item in document
             })
+            self._validated.update({item: self._document[item]
+                                    for item in document
+                                    if item in self._document})
         else:
             if update:
                 raise PhotometryValidationError('input data seems to be'
@@ -0,0 +1,521 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Road lighting.
+
+Calculations follow EN 13201-3: road runs along x axis with the first
+kerb on y = 0, calculation field lies between two consecutive
+luminaires of a row, observers stand 1.5 m above road in centres of
+lanes, 60 m before the field for luminance and 2.75 (h - 1.5) m before
+it for threshold increment (h is mounting height). Luminaires on near
+side face road with C90 plane (rotation 0), on far side they are
+rotated by 180 degrees, installation tilt turns nadir towards road.
+
+Luminance is computed with reduced luminance coefficients of road
+surface (r-table), see RTable. Standard r-tables (CIE 144) are not
+shipped, r-table of road has to be supplied as arrays.
+
+"""
+
+
+import concurrent.futures
+import itertools
+
+import numpy as np
+
+from .illuminance import directions, rotation_matrix
+from .interpolation import _locate, _uniform_step
+
+
+# EN 13201-2 motorised traffic classes: average luminance [cd/m2],
+# overall uniformity, longitudinal uniformity, threshold increment [%]
+M_CLASSES = {
+    'M1': (2., .4, .7, 10),
+    'M2': (1.5, .4, .7, 10),
+    'M3': (1., .4, .6, 15),
+    'M4': (.75, .4, .6, 15),
+    'M5': (.5, .35, .4, 15),
+    'M6': (.3, .35, .4, 20),
+}
+
+# EN 13201-2 luminous intensity classes, maximum intensities [cd/klm]
+# at 70, 80, 90 degrees from downward vertical and above 95 degrees
+G_CLASSES = (
+    ('G*6', (350, 100, 0, 0)),
+    ('G*5', (350, 100, 10, 0)),
+    ('G*4', (500, 100, 10, 0)),
+    ('G*3', (None, 100, 20, None)),
+    ('G*2', (None, 150, 30, None)),
+    ('G*1', (None, 200, 50, None)),
+)
+
+# EN 13201-2 glare index classes, maximum glare index
+D_CLASSES = (
+    ('D6', 500),
+    ('D5', 1000),
+    ('D4', 2000),
+    ('D3', 4000),
+    ('D2', 5500),
+    ('D1', 7000),
+)
+
+
+class RTable(object):
+    """Reduced luminance coefficients of road surface.
+
+    Luminance of road is r(beta, tan(gamma)) * I / h ** 2, beta is angle
+    between vertical planes of observation and of incidence, gamma angle
+    of incidence. Coefficients are interpolated bilinearly, beyond last
+    tan(gamma) they are 0.
+
+    Standard r-tables (CIE 144 R1 ... R4, C1, C2) are not shipped, table
+    of road surface has to be created from published values, so results
+    of EN 13201 class checks hold only for surface given by the caller.
+    RTable.lambertian is no road surface, it serves for checks only.
+    """
+
+    __slots__ = (
+        '_step_beta',
+        '_step_tan',
+        'beta',
+        'tan_gamma',
+        'values',
+    )
+
+    def __init__(self, beta, tan_gamma, values, scale=1.):
+        """Class constructor.
+
+        Args:
+            beta (ndarray): angles beta in degrees (0 ... 180)
+            tan_gamma (ndarray): tangents of angles of incidence
+            values (ndarray): coefficients, matrix of shape
+                (len(tan_gamma), len(beta))
+            scale (float, optional): multiplier of values, 1e-4 for
+                tables published as 10000 r
+        """
+        self.beta = np.asarray(beta, dtype=np.float64)
+        self.tan_gamma = np.asarray(tan_gamma, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64) * scale
+        if self.values.shape != (len(self.tan_gamma), len(self.beta)):
+            raise ValueError('r-table has wrong shape %s'
+                             % (self.values.shape, ))
+        self._step_beta = _uniform_step(self.beta)
+        self._step_tan = _uniform_step(self.tan_gamma)
+
+    @classmethod
+    def lambertian(cls, q0=.07):
+        """Return r-table of perfectly diffuse surface.
+
+        Diffuse surface is no road surface class, it serves for checks
+        of illuminance based results.
+
+        Args:
+            q0 (float, optional): average luminance coefficient
+
+        Returns --
+            (obj): RTable with r = q0 cos(gamma) ** 3
+        """
+        beta = np.arange(0, 181, 15.)
+        tan_gamma = np.arange(0, 12.001, .05)
+        values = q0 / (1 + tan_gamma ** 2) ** 1.5
+        return cls(beta, tan_gamma, np.repeat(values[:, None], len(beta), 1))
+
+    def __call__(self, beta, tan_gamma):
+        """Return coefficients.
+
+        Args:
+            beta (ndarray): angles beta in degrees
+            tan_gamma (ndarray): tangents of angles of incidence, same
+                shape as beta
+
+        Returns --
+            (ndarray): coefficients r
+        """
+        beta = np.abs(beta)
+        shape = beta.shape
+        beta, tan_gamma = beta.ravel(), tan_gamma.ravel()
+        i, t = _locate(tan_gamma, self.tan_gamma, self._step_tan)
+        j, u = _locate(beta, self.beta, self._step_beta)
+        values = self.values
+        result = (1 - t) * ((1 - u) * values[i, j] + u * values[i, j + 1])\
+            + t * ((1 - u) * values[i + 1, j] + u * values[i + 1, j + 1])
+        result[tan_gamma > self.tan_gamma[-1]] = 0
+        return result.reshape(shape)
+
+
+class Road(object):
+    """Road and its surface."""
+
+    __slots__ = (
+        'lane_width',
+        'lanes',
+        'maintenance_factor',
+        'r_table',
+    )
+
+    def __init__(self, r_table, lanes=2, lane_width=3.5,
+                 maintenance_factor=1.):
+        """Class constructor.
+
+        Args:
+            r_table (obj): RTable of surface
+            lanes (int, optional): number of lanes
+            lane_width (float, optional): width of lane [m]
+            maintenance_factor (float, optional): maintenance factor
+        """
+        self.lanes = lanes
+        self.lane_width = lane_width
+        self.r_table = r_table
+        self.maintenance_factor = maintenance_factor
+
+    @property
+    def width(self):
+        """Return width of road.
+
+        Returns --
+            (float): width [m]
+        """
+        return self.lanes * self.lane_width
+
+
+def _photometry(ldt, flux=None):
+    """Return picklable photometry used in calculations.
+
+    Returns --
+        (tuple): interpolator, scale of intensities to cd, tilt during
+            measurement
+    """
+    if flux is None:
+        flux = ldt.document['lamps'][0]['total_flux']
+    return (ldt.interpolator(),
+            flux / 1000 * ldt.document['conversion_factor'],
+            ldt.document['tilt'])
+
+
+def _field(road, spacing):
+    """Return calculation points along and across road."""
+    number = 10 if spacing <= 30 else int(np.ceil(spacing / 3))
+    x = (np.arange(number) + .5) * spacing / number
+    y = (np.arange(3 * road.lanes) + .5) * road.lane_width / 3
+    return x, y
+
+
+def _luminaires(road, spacing, height, overhang, arrangement, first, last):
+    """Return positions and rotations of luminaires between x limits."""
+    rows = [(0., overhang, 0.)]
+    if arrangement == 'opposite':
+        rows.append((0., road.width - overhang, 180.))
+    elif arrangement == 'staggered':
+        rows.append((spacing / 2, road.width - overhang, 180.))
+    elif arrangement != 'single':
+        raise ValueError('unknown arrangement %s' % arrangement)
+    positions, rotations = [], []
+    for shift, y, rotation in rows:
+        x = np.arange(np.floor((first - shift) / spacing),
+                      np.ceil((last - shift) / spacing) + 1) * spacing + shift
+        positions.append(np.column_stack((x, np.full(len(x), y),
+                                          np.full(len(x), height))))
+        rotations.append(np.full(len(x), rotation))
+    return np.concatenate(positions), np.concatenate(rotations)
+
+
+def _intensities(photometry, vectors, rotations, tilt):
+    """Return intensities [cd] from luminaires in directions vectors."""
+    interpolator, scale, measured = photometry
+    matrices = np.stack([rotation_matrix(rotation, tilt - measured)
+                         for rotation in (0., 180.)])
+    c, gamma = directions(vectors, matrices[(rotations == 180).astype(int)])
+    return interpolator(c, gamma) * scale
+
+
+def evaluate(ldt, road, spacing, height, overhang=0., tilt=0.,
+             arrangement='single', flux=None):
+    """Compute lighting of road with given installation.
+
+    Args:
+        ldt (obj): LDT object
+        road (obj): Road
+        spacing (float): distance of luminaires in a row [m]
+        height (float): mounting height [m]
+        overhang (float, optional): distance of luminaire from kerb
+            towards road [m]
+        tilt (float, optional): installation tilt in degrees
+        arrangement (str, optional): 'single', 'opposite' or
+            'staggered'
+        flux (float, optional): flux of lamps [lm], by default total
+            flux of the first set of lamps
+
+    Returns --
+        (dict): average luminance (lowest of observers), uniformities uo
+            and ul (lowest of observers), threshold increment ti (highest
+            of observers), average and minimum illuminance
+    """
+    return _lighting(_photometry(ldt, flux), road, spacing, height,
+                     overhang, tilt, arrangement)
+
+
+def _lighting(photometry, road, spacing, height, overhang, tilt,
+              arrangement):
+    """Compute lighting of road, see evaluate.
+
+    Args:
+        photometry (tuple): see _photometry
+        road (obj): Road
+        spacing (float): distance of luminaires in a row [m]
+        height (float): mounting height [m]
+        overhang (float, optional): distance of luminaire from kerb
+            towards road [m]
+        tilt (float, optional): installation tilt in degrees
+        arrangement (str, optional): 'single', 'opposite' or
+            'staggered'
+
+    Returns --
+        (dict): average luminance, uniformities uo and ul, threshold
+            increment ti, average and minimum illuminance
+    """
+    x, y = _field(road, spacing)
+    positions, rotations = _luminaires(road, spacing, height, overhang,
+                                       arrangement, -12 * height,
+                                       spacing + 500)
+    mf = road.maintenance_factor
+    px, py = (i.ravel() for i in np.meshgrid(x, y, indexing='ij'))
+    # points x luminaires
+    dx = positions[:, 0] - px[:, None]
+    dy = positions[:, 1] - py[:, None]
+    vectors = np.stack((-dx, -dy, -np.broadcast_to(positions[:, 2],
+                                                   dx.shape)), axis=-1)
+    intensities = _intensities(photometry, vectors,
+                               np.broadcast_to(rotations, dx.shape),
+                               tilt) * mf
+    heights = positions[:, 2]
+    horizontal = np.hypot(dx, dy)
+    # illuminance from luminaires within 5 mounting heights
+    distance = np.sqrt(horizontal ** 2 + heights ** 2)
+    illuminance = np.where(horizontal <= 5 * heights,
+                           intensities * heights / distance ** 3, 0)\
+        .sum(axis=1).reshape(len(x), len(y))
+    # luminance for observers in centres of lanes, luminaires from 5
+    # mounting heights before to 12 after the point
+    observers = (np.arange(road.lanes) + .5) * road.lane_width
+    view = np.stack(np.broadcast_arrays(px[None, :] + 60,
+                                        py[None, :] - observers[:, None]),
+                    axis=-1)
+    incidence = np.stack((dx, dy), axis=-1)
+    cosine = np.einsum('opk,plk->opl', view, incidence)\
+        / np.hypot(*np.moveaxis(view, -1, 0))[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.degrees(np.arccos(np.clip(cosine / horizontal, -1, 1)))
+    beta = np.where(horizontal > 0, beta, 0)
+    coefficients = road.r_table(beta, np.broadcast_to(horizontal / heights,
+                                                      beta.shape))
+    window = (dx >= -5 * heights) & (dx <= 12 * heights)
+    luminance = (coefficients * np.where(window, intensities / heights ** 2,
+                                         0)).sum(axis=-1)\
+        .reshape(len(observers), len(x), len(y))
+    averages = luminance.mean(axis=(1, 2))
+    centres = luminance[np.arange(road.lanes), :, 3 * np.arange(road.lanes)
+                        + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uo = np.nan_to_num(luminance.min(axis=(1, 2)) / averages)
+        ul = np.nan_to_num(centres.min(axis=1) / centres.max(axis=1))
+    ti = _threshold_increment(photometry, positions, rotations, tilt,
+                             observers, averages, height, mf)
+    return {
+        'average_luminance': float(averages.min()),
+        'uo': float(uo.min()),
+        'ul': float(ul.min()),
+        'ti': float(ti.max()),
+        'average_illuminance': float(illuminance.mean()),
+        'minimum_illuminance': float(illuminance.min()),
+    }
+
+
+def _threshold_increment(photometry, positions, rotations, tilt, observers,
+                        averages, height, maintenance_factor=1.):
+    """Compute threshold increment for observers.
+
+    Observers stand 2.75 (h - 1.5) m before the field, so luminaire
+    at start of the field is just below roof of vehicle. Veiling
+    luminance is summed over luminaires ahead of observer up to 500 m,
+    between 1.5 and 60 degrees from line of sight and screened by roof
+    of vehicle above 20 degrees.
+
+    Args:
+        photometry (tuple): see _photometry
+        positions (ndarray): positions of luminaires, shape (n, 3)
+        rotations (ndarray): rotations of luminaires in degrees
+        tilt (float): installation tilt in degrees
+        observers (ndarray): y of observers
+        averages (ndarray): average luminance for each observer
+        height (float): mounting height [m]
+        maintenance_factor (float, optional): maintenance factor
+
+    Returns --
+        (ndarray): threshold increment [%] for each observer
+    """
+    eyes = np.column_stack((np.full(len(observers),
+                                    -2.75 * (height - 1.5)),
+                            observers, np.full(len(observers), 1.5)))
+    vectors = positions[None, :, :] - eyes[:, None, :]
+    distance = np.sqrt(np.einsum('olk,olk->ol', vectors, vectors))
+    theta = np.degrees(np.arccos(vectors[..., 0] / distance))
+    elevation = np.degrees(np.arctan2(vectors[..., 2],
+                                      np.hypot(vectors[..., 0],
+                                               vectors[..., 1])))
+    seen = (vectors[..., 0] > 0) & (vectors[..., 0] <= 500)\
+        & (theta >= 1.5) & (theta <= 60) & (elevation <= 20)
+    intensities = _intensities(photometry, -vectors,
+                               np.broadcast_to(rotations, theta.shape),
+                               tilt) * maintenance_factor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eye = np.where(seen, intensities * np.cos(np.radians(theta))
+                       / distance ** 2 / theta ** 2, 0)
+    veiling = 9.86 * eye.sum(axis=1)
+    averages = np.maximum(averages, 1e-9)
+    return np.where(averages <= 5, 65 * veiling / averages ** .8,
+                    95 * veiling / averages ** 1.05)
+
+
+def _installed(ldt, tilt, theta, azimuths=np.arange(0, 360, 5.)):
+    """Return intensities of installed luminaire at angles from nadir.
+
+    Returns --
+        (ndarray): intensities [cd/klm], shape (len(theta), azimuths)
+    """
+    theta, azimuth = np.meshgrid(np.radians(theta), np.radians(azimuths),
+                                 indexing='ij')
+    vectors = np.stack((np.sin(theta) * np.cos(azimuth),
+                        np.sin(theta) * np.sin(azimuth),
+                        -np.cos(theta)), axis=-1)
+    c, gamma = directions(vectors,
+                          rotation_matrix(0, tilt - ldt.document['tilt']))
+    return ldt.intensity_at(c, gamma)
+
+
+def intensity_class(ldt, tilt=0.):
+    """Return luminous intensity class of installed luminaire.
+
+    Args:
+        ldt (obj): LDT object
+        tilt (float, optional): installation tilt in degrees
+
+    Returns --
+        (str): the most stringent of classes G*1 ... G*6 met, None if
+            none is met
+    """
+    intensities = _installed(ldt, tilt, [70, 80, 90]).max(axis=1)
+    above = _installed(ldt, tilt, np.arange(95.5, 180.1, 2.5)).max()
+    maxima = (*intensities, above)
+    for name, limits in G_CLASSES:
+        if all(limit is None or value <= limit
+               for value, limit in zip(maxima, limits)):
+            return name
+    return None
+
+
+def glare_index(ldt, tilt=0., flux=None):
+    """Return glare index of installed luminaire.
+
+    Glare index is maximum intensity at 85 degrees from nadir [cd]
+    divided by square root of apparent luminous area seen at 76 degrees
+    [m2]. Luminous area is taken from luminous dimensions.
+
+    Args:
+        ldt (obj): LDT object
+        tilt (float, optional): installation tilt in degrees
+        flux (float, optional): flux of lamps [lm]
+
+    Returns --
+        (float): glare index
+    """
+    document = ldt.document
+    length, width = (document[item] / 1000 for item
+                     in ('luminous_length', 'luminous_width'))
+    height = max(document[item] for item in (
+        'luminous_height_c0', 'luminous_height_c90',
+        'luminaire_height_c180', 'luminaire_height_c270')) / 1000
+    # circular luminous area for width 0
+    bottom = length * width if width else np.pi * length ** 2 / 4
+    area = bottom * np.cos(np.radians(76))\
+        + height * max(length, width) * np.sin(np.radians(76))
+    if area <= 0:
+        raise ValueError('luminous area is not given')
+    _, scale, _ = _photometry(ldt, flux)
+    return float(_installed(ldt, tilt, [85]).max() * scale / np.sqrt(area))
+
+
+def glare_index_class(ldt, tilt=0., flux=None):
+    """Return glare index class of installed luminaire.
+
+    Args:
+        ldt (obj): LDT object
+        tilt (float, optional): installation tilt in degrees
+        flux (float, optional): flux of lamps [lm]
+
+    Returns --
+        (str): the most stringent of classes D1 ... D6 met, D0 otherwise
+    """
+    index = glare_index(ldt, tilt, flux)
+    for name, limit in D_CLASSES:
+        if index <= limit:
+            return name
+    return 'D0'
+
+
+def _evaluate(arguments):
+    """Evaluate single configuration of sweep."""
+    photometry, road, configuration, arrangement = arguments
+    result = _lighting(photometry, road, *configuration, arrangement)
+    result.update(zip(('spacing', 'height', 'overhang', 'tilt'),
+                      configuration))
+    return result
+
+
+def sweep(ldt, road, spacings, heights, overhangs=(0., ), tilts=(0., ),
+          arrangement='single', lighting_class='M3', best=10, flux=None,
+          processes=1, chunksize=16):
+    """Evaluate installations and return the best ones.
+
+    All combinations of spacings, heights, overhangs and tilts are
+    evaluated. Installations meeting lighting class come first, sorted
+    by spacing (fewer poles), then by overall uniformity.
+
+    Args:
+        ldt (obj): LDT object
+        road (obj): Road
+        spacings (iterable): distances of luminaires [m]
+        heights (iterable): mounting heights [m]
+        overhangs (iterable, optional): overhangs [m]
+        tilts (iterable, optional): installation tilts in degrees
+        arrangement (str, optional): 'single', 'opposite' or
+            'staggered'
+        lighting_class (str, optional): one of M_CLASSES
+        best (int, optional): number of returned installations
+        flux (float, optional): flux of lamps [lm]
+        processes (int, optional): number of worker processes, 0 means
+            number of CPUs
+        chunksize (int, optional): number of installations sent to
+            worker at once
+
+    Returns --
+        (list): dicts with results (see evaluate), installation
+            parameters and 'compliant' flag
+    """
+    luminance, uo, ul, ti = M_CLASSES[lighting_class]
+    photometry = _photometry(ldt, flux)
+    tasks = [(photometry, road, configuration, arrangement)
+             for configuration in itertools.product(spacings, heights,
+                                                    overhangs, tilts)]
+    if processes == 1 or len(tasks) < 2:
+        results = list(map(_evaluate, tasks))
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(processes or None)
+        with executor:
+            results = list(executor.map(_evaluate, tasks,
+                                        chunksize=chunksize))
+    for result in results:
+        result['compliant'] = result['average_luminance'] >= luminance\
+            and result['uo'] >= uo and result['ul'] >= ul\
+            and result['ti'] <= ti
+    results.sort(key=lambda result: (not result['compliant'],
+                                     -result['spacing'], -result['uo']))
+    return results[:best]
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Illuminance of many luminaires.
+
+Scene holds thousands of placed luminaires sharing few light
+distributions. Luminaires are grouped by distribution, so intensities
+of a group are interpolated with single call. Each luminaire lights only
+points within its reach - distance at which its maximum intensity gives
+cutoff illuminance; pairs of points and luminaires are found with
+uniform cell index (cell size is the largest reach in group), points
+are sorted by cell so each cell is a contiguous range.
+
+"""
+
+
+import concurrent.futures
+
+import numpy as np
+
+from .illuminance import KINDS, _illuminance, directions, rotation_matrix
+
+
+class _Group(object):
+    """Placed luminaires sharing single distribution."""
+
+    __slots__ = (
+        'ldt',
+        'matrices',
+        'positions',
+        'scales',
+    )
+
+    def __init__(self, ldt):
+        """Class constructor.
+
+        Args:
+            ldt (obj): LDT object
+        """
+        self.ldt = ldt
+        self.matrices = []
+        self.positions = []
+        self.scales = []
+
+    def state(self, cutoff):
+        """Return picklable state used by _group_illuminance.
+
+        Args:
+            cutoff (float): illuminance at the end of reach [lx]
+
+        Returns --
+            (tuple): interpolator, positions, matrices, scales, reaches
+        """
+        scales = np.array(self.scales)
+        intensities = self.ldt.document['luminous_intensities']
+        reaches = np.sqrt(intensities.max(initial=0) * scales / cutoff)
+        return (self.ldt.interpolator(), np.array(self.positions),
+                np.array(self.matrices), scales, reaches)
+
+
+def _cells(points, positions, size):
+    """Find ranges of points in cells neighbouring luminaires.
+
+    Args:
+        points (ndarray): points, shape (n, 3)
+        positions (ndarray): luminaires, shape (m, 3)
+        size (float): size of cells
+
+    Returns --
+        (tuple): order of points sorted by cell, starts and lengths of
+            ranges in sorted points, matrices of shape (m, 9)
+    """
+    cells = np.floor(np.concatenate((points[:, :2], positions[:, :2]))
+                     / size).astype(np.int64)
+    # cells shifted so neighbours of any cell have nonnegative coordinates
+    cells -= cells.min(axis=0) - 1
+    rows = cells[:, 1].max() + 2
+    keys = cells[:, 0] * rows + cells[:, 1]
+    point_keys, luminaire_keys = keys[:len(points)], keys[len(points):]
+    order = np.argsort(point_keys, kind='stable')
+    sorted_keys = point_keys[order]
+    neighbours = (np.array([-1, 0, 1])[:, None] * rows
+                  + np.array([-1, 0, 1])).ravel()
+    wanted = luminaire_keys[:, None] + neighbours
+    starts = np.searchsorted(sorted_keys, wanted, side='left')
+    return order, starts,\
+        np.searchsorted(sorted_keys, wanted, side='right') - starts
+
+
+def _pairs(order, starts, lengths):
+    """Expand ranges of points to pairs of points and luminaires.
+
+    Args:
+        order (ndarray): order of points sorted by cell
+        starts (ndarray): starts of ranges, shape (luminaires, 9)
+        lengths (ndarray): lengths of ranges, shape (luminaires, 9)
+
+    Returns --
+        (tuple): indexes of points and luminaires
+    """
+    starts, lengths = starts.ravel(), lengths.ravel()
+    luminaires = np.repeat(np.arange(len(starts)) // 9, lengths)
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return order[np.arange(lengths.sum()) + shifts], luminaires
+
+
+def _group_illuminance(state, points, kind, normal, pairs_size):
+    """Return illuminance of points from group of luminaires.
+
+    Args:
+        state (tuple): see _Group.state
+        points (ndarray): points, shape (n, 3)
+        kind (str): one of illuminance.KINDS
+        normal (ndarray): normal of vertical plane
+        pairs_size (int): number of candidate point-luminaire pairs
+            evaluated at once
+
+    Returns --
+        (ndarray): illuminance [lx]
+    """
+    interpolator, positions, matrices, scales, reaches = state
+    result = np.zeros(len(points))
+    if not len(positions) or not len(points)\
+            or not reaches.max(initial=0):
+        return result
+    order, starts, lengths = _cells(points, positions, reaches.max())
+    # luminaires are split to batches of about pairs_size candidates
+    batches = np.cumsum(lengths.sum(axis=1)) // max(pairs_size, 1)
+    bounds = np.flatnonzero(np.diff(batches)) + 1
+    for luminaires in np.split(np.arange(len(positions)), bounds):
+        where, which = _pairs(order, starts[luminaires],
+                              lengths[luminaires])
+        which = luminaires[which]
+        vectors = positions[which] - points[where]
+        distance = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+        near = distance <= reaches[which]
+        where, which, vectors, distance = (where[near], which[near],
+                                           vectors[near], distance[near])
+        c, gamma = directions(-vectors, matrices[which])
+        intensities = interpolator(c, gamma) * scales[which]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = _illuminance(intensities, vectors, distance, kind,
+                                  normal)
+        result += np.bincount(where, np.where(distance > 0, values, 0),
+                              minlength=len(points))
+    return result
+
+
+def _task(arguments):
+    """Run _group_illuminance in worker process."""
+    return _group_illuminance(*arguments)
+
+
+class Scene(object):
+    """Luminaires placed in space.
+
+    Illuminance of points is the sum over luminaires closer than their
+    reach, contributions below cutoff illuminance are neglected.
+    """
+
+    __slots__ = (
+        '_groups',
+        'cutoff',
+    )
+
+    def __init__(self, cutoff=.1):
+        """Class constructor.
+
+        Args:
+            cutoff (float, optional): illuminance [lx] below which
+                contribution of luminaire is neglected
+        """
+        self._groups = {}
+        self.cutoff = cutoff
+
+    def __len__(self):
+        """Return number of luminaires."""
+        return sum(len(group.positions) for group in self._groups.values())
+
+    def add(self, ldt, position, rotation=0., tilt=0., flux=None):
+        """Place luminaire.
+
+        Luminaires placed with the same LDT object share distribution.
+
+        Args:
+            ldt (obj): LDT object
+            position (tuple): position of luminaire (x, y, z)
+            rotation (float, optional): rotation about vertical axis in
+                degrees
+            tilt (float, optional): tilt about C0 axis in degrees
+            flux (float, optional): flux of lamps [lm], by default total
+                flux of the first set of lamps
+
+        Returns --
+            (obj): self
+        """
+        group = self._groups.get(id(ldt))
+        if group is None:
+            group = self._groups[id(ldt)] = _Group(ldt)
+        if flux is None:
+            flux = ldt.document['lamps'][0]['total_flux']
+        group.positions.append(np.asarray(position, dtype=np.float64))
+        group.matrices.append(rotation_matrix(rotation, tilt))
+        group.scales.append(flux / 1000 * ldt.document['conversion_factor'])
+        return self
+
+    def illuminance(self, x, y, z=0., kind='horizontal', azimuth=0.,
+                    chunk_size=65536, processes=1):
+        """Return illuminance of points.
+
+        Args:
+            x (obj): x coordinates of points, array-like of any shape
+            y (obj): y coordinates, broadcastable with x
+            z (obj, optional): z coordinates, broadcastable with x
+            kind (str, optional): 'horizontal', 'vertical' or
+                'cylindrical' illuminance
+            azimuth (float, optional): direction the vertical plane faces
+                in degrees, counterclockwise from x axis
+            chunk_size (int, optional): number of points processed at once
+                and number of point-luminaire pairs evaluated at once
+            processes (int, optional): number of worker processes, 0
+                means number of CPUs
+
+        Returns --
+            (ndarray): illuminance [lx], shape of broadcast coordinates
+        """
+        if kind not in KINDS:
+            raise ValueError('unknown illuminance %s' % kind)
+        x, y, z = np.broadcast_arrays(*(np.asarray(i, dtype=np.float64)
+                                        for i in (x, y, z)))
+        points = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=-1)
+        normal = np.array([np.cos(np.radians(azimuth)),
+                           np.sin(np.radians(azimuth))])
+        chunk_size = max(chunk_size, 1)
+        chunks = [slice(i, i + chunk_size)
+                  for i in range(0, len(points), chunk_size)]
+        states = [group.state(self.cutoff)
+                  for group in self._groups.values()]
+        tasks = [(state, points[chunk], kind, normal, chunk_size)
+                 for state in states for chunk in chunks]
+        if processes == 1 or len(tasks) < 2:
+            results = map(_task, tasks)
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                processes or None)
+            with executor:
+                results = list(executor.map(_task, tasks))
+        result = np.zeros(len(points))
+        for chunk, values in zip(chunks * len(states), results):
+            result[chunk] += values
+        return result.reshape(x.shape)
@@ -9,6 +9,8 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 
 import re
 
+import numpy as np
+
 
 def _to_int(val):
     result = re.search('[0-9]{2,4}', val)
@@ -20,6 +22,61 @@ def _to_float(val):
     return float(val.replace(',', '.'))
 
 
+def _to_array(val):
+    """Coerce sequence of numbers or numeric strings to float64 array.
+
+    Whole sequence is converted at once, decimal commas are accepted.
+    """
+    try:
+        return np.asarray(val, dtype=np.float64)
+    except ValueError:
+        return np.char.replace(np.asarray(val, dtype=str), ',', '.')\
+            .astype(np.float64)
+
+
+# bytes separating numbers (ASCII whitespace)
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[list(b' \t\n\v\f\r')] = True
+
+
+def _count_tokens(data):
+    """Return number of whitespace separated tokens in buffer."""
+    space = _SPACE[np.frombuffer(data, dtype=np.uint8)]
+    if not len(space):
+        return 0
+    return int(not space[0]) + int(np.count_nonzero(space[:-1] > space[1:]))
+
+
+def _parse_array(data):
+    """Parse whitespace separated numbers straight from buffer.
+
+    Numpy 2.3 and newer raise ValueError for unparsable token, older
+    versions stop at it with DeprecationWarning, so parsed values are
+    counted against tokens. Warning filters are left alone, they are
+    global to the process.
+
+    Args:
+        data (bytes): numeric data
+
+    Returns --
+        (ndarray): parsed values
+
+    Raises --
+        ValueError: in case of data which are not numbers
+    """
+    try:
+        values = np.fromstring(data, dtype=np.float64, sep=' ')
+    except (ValueError, DeprecationWarning) as e:
+        # ValueError from numpy >= 2.3, DeprecationWarning from older
+        # numpy if the caller turns warnings into errors
+        raise ValueError('incorrect numeric data (%s)' % e)
+    tokens = _count_tokens(data)
+    if len(values) != tokens:
+        raise ValueError('incorrect numeric data (%s of %s tokens parsed)'
+                         % (len(values), tokens))
+    return values
+
+
 _ldt_lamp_schema = {
     'number_of': {
         'coerce': int,
@@ -83,9 +140,9 @@ ldt_schema = {
         'type': 'integer',
     },
     'distance_dc': {  # 5
-        'coerce': (str, _to_int),
+        'coerce': (str, _to_float),
         'required': True,
-        'type': 'integer',
+        'type': 'float',
     },
     'number_ng': {  # 6
         'coerce': int,
@@ -208,40 +265,39 @@ ldt_schema = {
         },
         'type': 'list',
     },
-    'direct_ratios': {
+    'direct_ratios': {  # 27
+        'coerce': _to_array,
+        'finite': True,
+        'maxlength': 10,
+        'min': 0,
+        'minlength': 10,
         'required': True,
-        'schema': {  # 27
-            'coerce': float,
-            'required': True,
-            'type': 'float',
-        },
-        'type': 'list',
+        'type': 'ndarray',
     },
     'angles_c': {  # 28
+        'coerce': _to_array,
+        'finite': True,
+        'max': 360,
+        'min': 0,
+        'monotonic': True,
         'required': True,
-        'schema': {
-            'coerce': (str, _to_float),
-            'required': True,
-            'type': 'float',
-        },
-        'type': 'list',
+        'type': 'ndarray',
     },
     'angles_g': {  # 29
+        'coerce': _to_array,
+        'finite': True,
+        'max': 180,
+        'min': 0,
+        'monotonic': True,
         'required': True,
-        'schema': {
-            'coerce': (str, _to_float),
-            'required': True,
-            'type': 'float',
-        },
-        'type': 'list', },
+        'type': 'ndarray',
+    },
     'luminous_intensities': {  # 30
+        'coerce': _to_array,
+        'finite': True,
+        'min': 0,
         'required': True,
-        'schema': {
-            'coerce': (str, _to_float),
-            'required': True,
-            'type': 'float',
-        },
-        'type': 'list',
+        'type': 'ndarray',
     },
 }
 
@@ -359,30 +415,28 @@ ies_schema = {
         'type': 'float',
     },
     'vertical_angles': {
+        'coerce': _to_array,
+        'finite': True,
+        'max': 180,
+        'min': -90,
+        'monotonic': True,
         'required': True,
-        'type': 'list',
-        'schema': {
-            'coerce': float,
-            'required': True,
-            'type': 'float',
-        },
+        'type': 'ndarray',
     },
     'horizontal_angles': {
+        'coerce': _to_array,
+        'finite': True,
+        'max': 360,
+        'min': -90,
+        'monotonic': True,
         'required': True,
-        'type': 'list',
-        'schema': {
-            'coerce': float,
-            'required': True,
-            'type': 'float',
-        },
+        'type': 'ndarray',
     },
     'candela_values': {
+        'coerce': _to_array,
+        'finite': True,
+        'min': 0,
         'required': True,
-        'type': 'list',
-        'schema': {
-            'coerce': float,
-            'required': True,
-            'type': 'float',
-        },
+        'type': 'ndarray',
     },
 }
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Symmetry of light distribution.
+
+Symmetry indicators are the ones used by EULUMDAT format:
+
+    0 - no symmetry
+    1 - symmetry about vertical axis
+    2 - symmetry to plane C0-C180
+    3 - symmetry to plane C90-C270
+    4 - symmetry to planes C0-C180 and C90-C270
+
+"""
+
+
+import functools
+
+import numpy as np
+
+
+def stored_planes(symmetry, number_mc):
+    """Return range of stored C-planes.
+
+    Calculates mc1, mc2 according to Note 2 from
+    http://www.helios32.com/Eulumdat.htm
+
+    Args:
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (tuple): mc1, mc2 (1-based, mc2 may exceed number_mc)
+    """
+    try:
+        return {
+            0: (1, number_mc),
+            1: (1, 1),
+            2: (1, number_mc // 2 + 1),
+            3: (3 * number_mc // 4 + 1, 5 * number_mc // 4 + 1),
+            4: (1, number_mc // 4 + 1),
+        }[symmetry]
+    except KeyError:
+        raise ValueError('unknown symmetry indicator %s' % symmetry)
+
+
+@functools.lru_cache(maxsize=None)
+def plane_index(symmetry, number_mc):
+    """Return index of stored C-plane for each of number_mc C-planes.
+
+    C-planes are assumed to be evenly distributed. Index maps are cached,
+    returned arrays are read-only.
+
+    Args:
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (ndarray): indexes of rows of stored intensities matrix
+    """
+    planes = np.arange(number_mc)
+    if symmetry == 0:
+        pass
+    elif symmetry == 1:
+        planes = np.zeros(number_mc, dtype=planes.dtype)
+    elif symmetry == 2:
+        # C -> 360 - C
+        planes = np.minimum(planes, number_mc - planes)
+    elif symmetry == 3:
+        # stored are planes C270 ... C90, others are mirrored C -> 180 - C
+        first = 3 * number_mc // 4
+        stored = (planes - first) % number_mc <= number_mc // 2
+        planes = np.where(stored, planes,
+                          (number_mc // 2 - planes) % number_mc)
+        planes = (planes - first) % number_mc
+    elif symmetry == 4:
+        planes = planes % (number_mc // 2)
+        planes = np.minimum(planes, number_mc // 2 - planes)
+    else:
+        raise ValueError('unknown symmetry indicator %s' % symmetry)
+    planes.flags.writeable = False
+    return planes
+
+
+@functools.lru_cache(maxsize=None)
+def stored_index(symmetry, number_mc):
+    """Return index of C-plane for each of stored C-planes.
+
+    Index maps are cached, returned arrays are read-only.
+
+    Args:
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (ndarray): indexes of C-planes
+    """
+    mc1, mc2 = stored_planes(symmetry, number_mc)
+    planes = np.arange(mc1 - 1, mc2) % number_mc
+    planes.flags.writeable = False
+    return planes
+
+
+def expand(intensities, symmetry, number_mc):
+    """Expand stored intensities to all C-planes.
+
+    Without symmetry and for rotational symmetry views of stored
+    intensities are returned, otherwise stored C-planes are gathered
+    with cached index map.
+
+    Args:
+        intensities (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas)
+        symmetry (int): symmetry indicator
+        number_mc (int): number of C-planes
+
+    Returns --
+        (ndarray): read-only matrix of shape (C-planes, gammas)
+    """
+    if symmetry == 0:
+        full = intensities.view()
+    elif symmetry == 1:
+        full = np.broadcast_to(intensities[0],
+                               (number_mc, intensities.shape[-1]))
+    else:
+        full = intensities[plane_index(symmetry, number_mc)]
+    full.flags.writeable = False
+    return full
+
+
+def compact(intensities, symmetry):
+    """Compact intensities of all C-planes to given symmetry.
+
+    Args:
+        intensities (ndarray): intensities of all C-planes, matrix of
+            shape (C-planes, gammas)
+        symmetry (int): symmetry indicator
+
+    Returns --
+        (ndarray): stored intensities, matrix of shape
+            (stored C-planes, gammas)
+    """
+    return intensities[stored_index(symmetry, len(intensities))]
+
+
+def detect_symmetry(intensities, tolerance=.01):
+    """Detect symmetry of full set of C-planes.
+
+    Each symmetry is checked by comparing intensities with ones
+    restored from stored C-planes, most compact symmetry is returned.
+    C-planes are assumed to be evenly distributed.
+
+    Args:
+        intensities (ndarray): intensities of all C-planes, matrix of
+            shape (C-planes, gammas)
+        tolerance (float, optional): allowed difference relative to
+            maximum intensity
+
+    Returns --
+        (int): symmetry indicator
+    """
+    number_mc = len(intensities)
+    atol = tolerance * np.abs(intensities).max(initial=0)
+    for symmetry, divisor in ((1, 1), (4, 4), (2, 2), (3, 4)):
+        if number_mc % divisor:
+            continue
+        restored = expand(compact(intensities, symmetry), symmetry,
+                          number_mc)
+        if (np.abs(restored - intensities) <= atol).all():
+            return symmetry
+    return 0
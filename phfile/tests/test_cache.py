@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for parse cache of ldt files.
+
+"""
+
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp_dir.name, 'cache')
+        self.paths = []
+        for i in range(3):
+            self.paths.append(os.path.join(self._tmp_dir.name,
+                                           '%s.ldt' % i))
+            with open(self.paths[-1], 'w') as f:
+                f.write(ldt_set_input_valid.replace(
+                    'dioda LENS LINE 15st 3000K 250mA\n', 'name %s\n' % i,
+                    1))
+
+    def tearDown(self):
+        """."""
+        self._tmp_dir.cleanup()
+
+    def assertSameLDT(self, first, second):
+        """."""
+        self.assertEqual(first.text, second.text)
+        for item, value in first.document.items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(value, second.document[item])
+            else:
+                self.assertEqual(value, second.document[item])
+
+    def test_levels(self):
+        """."""
+        cache = ParseCache(directory=self.directory)
+        reference = LDT().load(self.paths[0])
+        cold = LDT().load(self.paths[0], cache=cache)
+        warm = LDT().load(self.paths[0], cache=cache)
+        self.assertSameLDT(reference, cold)
+        self.assertSameLDT(reference, warm)
+        self.assertEqual(cache.stats['misses'], 1)
+        self.assertEqual(cache.stats['hits'], 1)
+        # other process finds sidecar
+        cache = ParseCache(directory=self.directory)
+        disk = LDT().load(self.paths[0], cache=cache)
+        self.assertSameLDT(reference, disk)
+        self.assertEqual(cache.stats['disk_hits'], 1)
+        self.assertEqual(cache.stats['misses'], 0)
+        self.assertEqual(disk.item('lamps'), reference.item('lamps'))
+        # loaded objects do not share changes
+        warm.set(luminaire_name='changed', number_of_lamps=2,
+                 luminous_intensities=warm.item('luminous_intensities') * 2)
+        self.assertSameLDT(reference, LDT().load(self.paths[0],
+                                                 cache=cache))
+
+    def test_write_unchanged(self):
+        """."""
+        data = ldt_set_input_valid.replace('\n', '\r\n').encode('cp1252')
+        with open(self.paths[0], 'wb') as f:
+            f.write(data)
+        output = os.path.join(self._tmp_dir.name, 'output.ldt')
+        for i in range(3):
+            cache = ParseCache(directory=self.directory)
+            LDT().load(self.paths[0], cache=cache).write(output)
+            with open(output, 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_changed_after_miss(self):
+        """."""
+        cache = ParseCache()
+        reference = LDT().load(self.paths[0])
+        cold = LDT().load(self.paths[0], cache=cache)
+        cold.set(number_of_lamps=3)
+        warm = LDT().load(self.paths[0], cache=cache)
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertEqual(warm.item('lamps'), reference.item('lamps'))
+        self.assertSameLDT(reference, warm)
+
+    def test_invalidate(self):
+        """."""
+        cache = ParseCache(directory=self.directory)
+        for path in self.paths:
+            LDT().load(path, cache=cache)
+        with open(self.paths[0], 'a') as f:
+            f.write('\n')
+        os.utime(self.paths[0], ns=(0, 0))
+        LDT().load(self.paths[0], cache=cache)
+        self.assertEqual(cache.stats['misses'], 4)
+        cache.invalidate(self.paths[1])
+        self.assertEqual(cache.stats['entries'], 2)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        LDT().load(self.paths[1], cache=cache)
+        self.assertEqual(cache.stats['misses'], 5)
+        cache.invalidate()
+        self.assertEqual(cache.stats['entries'], 0)
+        self.assertEqual(cache.stats['bytes'], 0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_eviction(self):
+        """."""
+        cache = ParseCache(max_bytes=4000)
+        for path in self.paths:
+            LDT().load(path, cache=cache)
+        self.assertEqual(cache.stats['entries'], 1)
+        self.assertEqual(cache.stats['evictions'], 2)
+        self.assertLessEqual(cache.stats['bytes'], 4000)
+        cache = ParseCache(directory=self.directory)
+        LDT().load(self.paths[0], cache=cache)
+        size = os.path.getsize(os.path.join(self.directory,
+                                            os.listdir(self.directory)[0]))
+        # the least recently used sidecar is removed
+        cache = ParseCache(directory=self.directory,
+                           max_disk_bytes=2 * size)
+        for path in self.paths[1:]:
+            LDT().load(path, cache=cache)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertNotIn(os.path.basename(
+            cache._sidecar(os.path.realpath(self.paths[0]))),
+            os.listdir(self.directory))
+
+    def test_verify(self):
+        """."""
+        cache = ParseCache(directory=self.directory, verify=True)
+        LDT().load(self.paths[0], cache=cache)
+        stat = os.stat(self.paths[0])
+        with open(self.paths[0], 'r+') as f:
+            f.write('B')
+        os.utime(self.paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        cache = ParseCache(directory=self.directory, verify=True)
+        self.assertEqual(LDT().load(self.paths[0], cache=cache)
+                         .item('company'), 'Bquaform INC')
+        self.assertEqual(cache.stats['misses'], 1)
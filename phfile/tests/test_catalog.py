@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for catalogue index of photometric files.
+
+"""
+
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..catalog import Catalog, beam_angle
+
+
+class TestCatalog(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp_dir.name, 'files')
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        self.paths = []
+        for i in range(4):
+            self.paths.append(os.path.join(
+                self.directory, 'sub' if i % 2 else '', '%s.ldt' % i))
+            self.write(i, 'name %s' % i, 3000 + 1000 * (i // 2))
+        with open(os.path.join(self.directory, 'bad.ldt'), 'w') as f:
+            f.write('incorrect')
+        with open(os.path.join(self.directory, 'notes.txt'), 'w') as f:
+            f.write('skipped')
+        self.database = os.path.join(self._tmp_dir.name, 'catalog.db')
+
+    def tearDown(self):
+        """."""
+        self._tmp_dir.cleanup()
+
+    def write(self, i, name, color_temp):
+        """."""
+        with open(self.paths[i], 'w') as f:
+            f.write(ldt_set_input_valid
+                    .replace('dioda LENS LINE 15st 3000K 250mA\n',
+                             name + '\n', 1)
+                    .replace('\n3000K\n', '\n%sK\n' % color_temp, 1))
+
+    def test_scan(self):
+        """."""
+        with Catalog(self.database) as catalog:
+            self.assertEqual(catalog.scan(self.directory),
+                             {'added': 5, 'updated': 0, 'unchanged': 0,
+                              'removed': 0, 'failed': 1})
+            self.assertEqual(len(catalog), 4)
+            self.assertEqual(list(catalog.errors()),
+                             [os.path.join(os.path.realpath(self.directory),
+                                           'bad.ldt')])
+        # index is kept in database
+        with Catalog(self.database) as catalog:
+            self.assertEqual(catalog.scan(self.directory)['unchanged'], 5)
+            self.write(0, 'renamed', 3000)
+            os.utime(self.paths[1], ns=(0, 0))
+            os.remove(self.paths[2])
+            self.assertEqual(catalog.scan(self.directory),
+                             {'added': 0, 'updated': 1, 'unchanged': 3,
+                              'removed': 1, 'failed': 0})
+            self.assertEqual(len(catalog), 3)
+            self.assertEqual(len(catalog.paths(luminaire_name='renamed')), 1)
+
+    def test_scan_processes(self):
+        """."""
+        with Catalog() as catalog:
+            stats = catalog.scan(self.directory, processes=2, chunksize=1)
+            self.assertEqual((stats['added'], stats['failed']), (5, 1))
+            self.assertEqual(len(catalog), 4)
+
+    def test_paths(self):
+        """."""
+        with Catalog() as catalog:
+            catalog.scan(self.directory)
+            names = [os.path.realpath(path) for path in self.paths]
+            self.assertEqual(catalog.paths(luminaire_name='name 1'),
+                             [names[1]])
+            self.assertEqual(catalog.paths(color_temp=4000),
+                             sorted(names[2:]))
+            self.assertEqual(catalog.paths(color_temp=[3000, 4000]),
+                             sorted(names))
+            self.assertEqual(catalog.paths(symmetry_indicator=1,
+                                           flux=(90, None)),
+                             sorted(names))
+            self.assertEqual(catalog.paths(flux=(None, 90)), [])
+            self.assertEqual(len(catalog.paths(limit=2)), 2)
+            self.assertRaises(ValueError,
+                              lambda: catalog.paths(unknown_item=1))
+
+    def test_query(self):
+        """."""
+        with Catalog() as catalog:
+            catalog.scan(self.directory)
+            ldts = list(catalog.query(luminaire_name='name 3'))
+            self.assertEqual(len(ldts), 1)
+            self.assertIsNotNone(ldts[0]._pending)
+            loaded = LDT().load(self.paths[3])
+            np.testing.assert_array_equal(
+                ldts[0].item('luminous_intensities'),
+                loaded.item('luminous_intensities'))
+            self.assertEqual(ldts[0].text, loaded.text)
+
+    def test_beam_angle(self):
+        """."""
+        ldt = LDT().set(number_mc=1, distance_dc=0, symmetry_indicator=1,
+                        number_ng=19, distance_dg=5,
+                        angles_c=np.zeros(1),
+                        angles_g=np.arange(19) * 5.,
+                        luminous_intensities=np.maximum(
+                            100 - np.arange(19) * 5., 0))
+        # intensity falls to half at 50 degrees
+        self.assertAlmostEqual(beam_angle(ldt), 100)
@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for command line interface.
+
+"""
+
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from .test_data import ies_text, ldt_set_input_faulty, ldt_set_input_valid
+from .. import LDT
+from ..cli import _glob_base, main
+
+
+class TestCLI(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._input_dir = os.path.join(self._tmp_dir.name, 'in')
+        self._output_dir = os.path.join(self._tmp_dir.name, 'out')
+        os.makedirs(os.path.join(self._input_dir, 'sub'))
+        for name, data in (('a.ldt', ldt_set_input_valid),
+                           ('sub/b.LDT', ldt_set_input_valid),
+                           ('sub/faulty.ldt', ldt_set_input_faulty),
+                           ('sub/other.txt', '')):
+            with open(os.path.join(self._input_dir, name), 'w') as f:
+                f.write(data)
+
+    def tearDown(self):
+        """."""
+        self._tmp_dir.cleanup()
+
+    def main(self, *argv):
+        """."""
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr),\
+                contextlib.redirect_stdout(io.StringIO()):
+            status = main(list(argv))
+        return status, stderr.getvalue()
+
+    def test_validate(self):
+        """."""
+        status, report = self.main('validate', self._input_dir)
+        self.assertEqual(status, 1)
+        self.assertIn('faulty.ldt: ValueError', report)
+        self.assertIn('validate: 3 files, 2 ok, 1 failed', report)
+
+    def test_set_parallel(self):
+        """."""
+        status, report = self.main('set', '-j', '2', '--chunksize', '1',
+                                   '-s', 'luminaire_name=New name',
+                                   '-s', '10=12345',
+                                   '-o', self._output_dir,
+                                   os.path.join(self._input_dir, '*.ldt'),
+                                   os.path.join(self._input_dir, 'sub',
+                                                'b.LDT'))
+        self.assertEqual(status, 0)
+        for name in ('a.ldt', 'b.LDT'):
+            ldt_obj = LDT().load(os.path.join(self._output_dir, name))
+            self.assertEqual(ldt_obj.item('luminaire_name', 'luminaire_no'),
+                             {'luminaire_name': 'New name',
+                              'luminaire_no': '12345'})
+
+    def test_convert_tree(self):
+        """."""
+        status, _ = self.main('convert', '-o', self._output_dir,
+                              self._input_dir)
+        self.assertEqual(status, 1)
+        self.assertTrue(os.path.isfile(os.path.join(self._output_dir,
+                                                    'sub', 'b.LDT')))
+        self.assertFalse(os.path.exists(os.path.join(self._output_dir,
+                                                     'sub', 'faulty.ldt')))
+
+    def test_convert_ies(self):
+        """."""
+        status, _ = self.main('convert', '--to', 'ies', '-j', '2',
+                              os.path.join(self._input_dir, '*.ldt'))
+        self.assertEqual(status, 0)
+        self.assertTrue(os.path.isfile(os.path.join(self._input_dir,
+                                                    'a.ies')))
+        status, _ = self.main('convert', '--pattern', '*.ies',
+                              '-o', self._output_dir, self._input_dir)
+        self.assertEqual(status, 0)
+        self.assertTrue(os.path.isfile(os.path.join(self._output_dir,
+                                                    'a.ldt')))
+
+    def test_glob_tree(self):
+        """."""
+        self.assertEqual(_glob_base(os.path.join('cat', '**', '*.ldt')),
+                         'cat')
+        self.assertEqual(_glob_base('*.ldt'), os.curdir)
+        os.makedirs(os.path.join(self._input_dir, 'other'))
+        with open(os.path.join(self._input_dir, 'other', 'b.LDT'), 'w') as f:
+            f.write(ldt_set_input_valid)
+        pattern = os.path.join(self._input_dir, '**', 'b.LDT')
+        status, _ = self.main('set', '-s', 'luminaire_no=1',
+                              '-o', self._output_dir, pattern)
+        self.assertEqual(status, 0)
+        for name in ('sub', 'other'):
+            self.assertTrue(os.path.isfile(os.path.join(
+                self._output_dir, name, 'b.LDT')))
+        # files with the same output are not written
+        status, report = self.main(
+            'set', '-s', 'luminaire_no=1', '-o', self._output_dir,
+            os.path.join(self._input_dir, 'sub', 'b.LDT'),
+            os.path.join(self._input_dir, 'other', 'b.LDT'))
+        self.assertEqual(status, 1)
+        self.assertEqual(report.count('is shared with other files'), 2)
+
+    def test_ies_pattern(self):
+        """."""
+        with open(os.path.join(self._input_dir, 'sub', 'c.ies'), 'w') as f:
+            f.write(ies_text)
+        with open(os.path.join(self._input_dir, 'd.ies'), 'w') as f:
+            f.write(ies_text.replace('TILT=NONE', ''))
+        status, report = self.main('validate', '--pattern', '*.ies',
+                                   self._input_dir)
+        self.assertEqual(status, 1)
+        self.assertIn('d.ies: ValueError', report)
+        self.assertIn('validate: 2 files, 1 ok, 1 failed', report)
+
+    def test_set_number_of_lamps(self):
+        """."""
+        status, _ = self.main('set', '-s', 'number_of_lamps=2',
+                              '-o', self._output_dir,
+                              os.path.join(self._input_dir, 'a.ldt'))
+        self.assertEqual(status, 0)
+        lamps = LDT().load(os.path.join(self._output_dir, 'a.ldt'))\
+            .item('lamps')
+        self.assertEqual([(lamp['number_of'], lamp['total_flux'],
+                           lamp['total_power']) for lamp in lamps],
+                         [(2, 196, 1.4)])
+        with self.assertRaises(SystemExit),\
+                contextlib.redirect_stderr(io.StringIO()):
+            main(['set', '-s', 'number_of_lamps=two', self._input_dir])
+
+    def test_set_wrong_item(self):
+        """."""
+        with self.assertRaises(SystemExit),\
+                contextlib.redirect_stderr(io.StringIO()):
+            main(['set', '-s', 'luminaire_name', self._input_dir])
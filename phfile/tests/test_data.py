@@ -697,3 +697,23 @@ LED 250mA
 0.0
 0.0
 0.0'''
+
+ies_text = '''IESNA:LM-63-1995\r
+[TEST] 2016-09-28 /JW\r
+[TESTLAB] AQLAB\r
+[MANUFAC] AQForm - Aquaform Inc.,\r
+[LUMCAT] 10312-L927-S1\r
+[LUMINAIRE] 2000 P20 LED\r
+[MORE] L927 15D track\r
+[LAMP] L927\r
+[_USER] ignored\r
+TILT=NONE\r
+1 1053 1.0 5 3 1 2 -0.07 -0.07 0.0\r
+1.0 1 12.5\r
+0 22.5 45 67.5 90\r
+0 45 90\r
+1000 800 400, 100 0\r
+1000 700 300 50 0\r
+1000 600 200\r
+10 0\r
+'''
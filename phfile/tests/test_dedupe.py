@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for deduplication of light distributions.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..dedupe import DistributionIndex
+
+
+class TestDedupe(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.ldt = LDT().loads(ldt_set_input_valid)
+
+    def test_content_hash(self):
+        """."""
+        digest = self.ldt.content_hash()
+        # header items are not part of distribution
+        other = LDT().loads(ldt_set_input_valid)\
+            .set(luminaire_name='other name')
+        self.assertEqual(other.content_hash(), digest)
+        # the same distribution stored without symmetry
+        full = np.repeat(self.ldt.full_intensities(), 24, axis=0)
+        other.set(symmetry_indicator=0, number_mc=24, distance_dc=15,
+                  angles_c=np.arange(0, 360, 15.),
+                  luminous_intensities=full)
+        self.assertFalse(other.errors)
+        self.assertEqual(other.content_hash(), digest)
+        other.set(luminous_intensities=full + 1e-3)
+        self.assertNotEqual(other.content_hash(), digest)
+        # small differences vanish after quantisation
+        self.ldt.set(luminous_intensities=np.round(full[:1], 1))
+        other.set(luminous_intensities=np.round(full, 1) + 1e-3)
+        self.assertEqual(other.content_hash(tolerance=.1),
+                         self.ldt.content_hash(tolerance=.1))
+
+    def test_index(self):
+        """."""
+        intensities = self.ldt.item('luminous_intensities')
+        index = DistributionIndex()
+        index.update(('file %s' % i, LDT().loads(ldt_set_input_valid))
+                     for i in range(3))
+        index.add('other', LDT().loads(ldt_set_input_valid)
+                  .set(luminous_intensities=intensities * 2))
+        self.assertEqual(len(index), 2)
+        self.assertIn('file 1', index)
+        groups = index.groups()
+        self.assertEqual(sorted(map(len, groups.values())), [1, 3])
+        self.assertEqual(index.hash_of('file 0'), self.ldt.content_hash())
+        calls = []
+
+        def maximum(ldt):
+            calls.append(ldt)
+            return ldt.item('luminous_intensities').max()
+
+        results = index.map(maximum)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(results['file 2'], intensities.max())
+        self.assertEqual(results['other'], 2 * intensities.max())
+        # conversion factor scales intensities
+        index.add('scaled', LDT().loads(ldt_set_input_valid)
+                  .set(conversion_factor=.5))
+        self.assertEqual(len(index), 3)
+        index.add('halved', LDT().loads(ldt_set_input_valid)
+                  .set(luminous_intensities=intensities / 2))
+        self.assertEqual(index.hash_of('halved'), index.hash_of('scaled'))
+        flux = index.map(lambda ldt: ldt.flux().total)
+        self.assertAlmostEqual(flux['scaled'], flux['file 0'] / 2)
+        index.remove('scaled')
+        index.remove('halved')
+        index.remove('other')
+        self.assertEqual(len(index), 1)
+        self.assertRaises(KeyError, lambda: index.remove('other'))
+        self.assertIs(index.representative(index.hash_of('file 0')),
+                      index.representative(index.hash_of('file 2')))
+        np.testing.assert_array_equal(
+            index.representative(index.hash_of('file 1'))
+            .item('luminous_intensities'), intensities)
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for luminous flux of light distribution.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..flux import (direct_ratios, direct_ratios_batch, integrate,
+                    integrate_batch, plane_weights, zone_weights)
+from ..symmetry import compact
+
+
+class TestFlux(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.angles_c = np.arange(0, 360, 15.)
+        self.angles_g = np.arange(0, 181, 2.5)
+
+    def test_weights(self):
+        """."""
+        self.assertAlmostEqual(zone_weights(self.angles_g).sum(), 2)
+        # pole zone is a cap of half gamma step
+        self.assertAlmostEqual(zone_weights(self.angles_g)[0],
+                               1 - np.cos(np.radians(1.25)))
+        for symmetry in range(0, 5):
+            with self.subTest(symmetry=symmetry):
+                weights = plane_weights(self.angles_c, symmetry, 24)
+                self.assertAlmostEqual(weights.sum(), 2 * np.pi)
+                self.assertEqual(len(weights),
+                                 len(compact(np.zeros((24, 1)), symmetry)))
+
+    def test_isotropic(self):
+        """."""
+        table = integrate(np.ones((24, 73)), self.angles_c, self.angles_g,
+                          0, 24)
+        self.assertAlmostEqual(table.total, 4 * np.pi)
+        self.assertAlmostEqual(table.downward, .5)
+        self.assertAlmostEqual(table.upward, .5)
+        np.testing.assert_allclose(
+            table.cone([0, 1, 60, 90, 180]),
+            2 * np.pi * (1 - np.cos(np.radians([0, 1, 60, 90, 180]))))
+        self.assertEqual(len(table.zonal), 73)
+
+    def test_symmetry(self):
+        """."""
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        full = np.maximum(np.cos(np.radians(g)), 0)\
+            * (2 + np.cos(np.radians(2 * c)))
+        reference = integrate(full, self.angles_c, self.angles_g, 0, 24)
+        # analytic flux of 2 cos(gamma) is 2 pi
+        self.assertAlmostEqual(reference.total, 2 * np.pi, 2)
+        for symmetry in range(2, 5):
+            with self.subTest(symmetry=symmetry):
+                table = integrate(compact(full, symmetry), self.angles_c,
+                                  self.angles_g, symmetry, 24)
+                self.assertAlmostEqual(table.total, reference.total)
+                self.assertEqual(table.downward, 1)
+
+    def test_ldt(self):
+        """."""
+        ldt = LDT().loads(ldt_set_input_valid)
+        table = ldt.flux()
+        self.assertIs(ldt.flux(), table)
+        self.assertAlmostEqual(table.total / 10, ldt.item('lorl'), delta=1)
+        self.assertEqual(ldt.check_flux(tolerance=1.), {})
+        ldt.set(dff=50)
+        self.assertEqual(list(ldt.check_flux()), ['dff'])
+        half = LDT().loads(ldt_set_input_valid)
+        half.set(conversion_factor=.5)
+        tables = integrate_batch([ldt, half, ldt])
+        self.assertAlmostEqual(tables[0].total, table.total)
+        self.assertAlmostEqual(tables[1].total, table.total / 2)
+
+    def test_direct_ratios(self):
+        """."""
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        # cosine distribution: fractions 7/16, 12/16, 15/16 and 1 of
+        # downward flux in cones, ratios follow CIE 52 coefficients
+        cosine = np.maximum(np.cos(np.radians(g)), 0)
+        for spacing, expected in (
+                (1., (.519, .562, .593, .636, .671, .716, .766, .796,
+                      .837, .862)),
+                (1.25, (.512, .545, .573, .616, .653, .701, .753, .785,
+                        .828, .856)),
+                (1.5, (.507, .532, .558, .599, .636, .688, .742, .775,
+                       .820, .848))):
+            with self.subTest(spacing=spacing):
+                np.testing.assert_allclose(
+                    direct_ratios(cosine, self.angles_c, self.angles_g,
+                                  0, 24, spacing),
+                    expected, atol=.002)
+        full = cosine * (2 + np.cos(np.radians(2 * c)))
+        ratios = direct_ratios(full, self.angles_c, self.angles_g, 0, 24)
+        self.assertEqual(ratios.shape, (10, ))
+        for symmetry in range(2, 5):
+            with self.subTest(symmetry=symmetry):
+                np.testing.assert_allclose(
+                    direct_ratios(compact(full, symmetry), self.angles_c,
+                                  self.angles_g, symmetry, 24),
+                    ratios)
+        # narrow beam hits work plane in any room
+        narrow = np.where(g <= 5, 1., 0)
+        np.testing.assert_allclose(
+            direct_ratios(narrow, self.angles_c, self.angles_g, 0, 24), 1)
+        np.testing.assert_array_equal(
+            direct_ratios(np.stack([narrow, narrow * 0]), self.angles_c,
+                          self.angles_g, 0, 24)[1], 0)
+        with self.assertRaises(ValueError):
+            direct_ratios(full, self.angles_c, self.angles_g, 0, 24, 2)
+
+    def test_ldt_direct_ratios(self):
+        """."""
+        ldt = LDT(auto_direct_ratios=True).loads(ldt_set_input_valid)
+        stored = ldt.item('direct_ratios')
+        computed = ldt.compute_direct_ratios()
+        # narrow spot, nearly all downward flux reaches work plane
+        self.assertTrue((computed > .95).all())
+        ldt.set(luminaire_name='name')
+        self.assertIs(ldt.item('direct_ratios'), stored)
+        ldt.set(luminous_intensities=ldt.item('luminous_intensities') * 2)
+        np.testing.assert_array_equal(ldt.item('direct_ratios'),
+                                      np.round(computed, 3))
+        other = LDT().loads(ldt_set_input_valid)
+        # stored ratios are kept by default
+        other.set(luminous_intensities=other.item('luminous_intensities') * 2)
+        np.testing.assert_array_equal(other.item('direct_ratios'), stored)
+        np.testing.assert_allclose(direct_ratios_batch([ldt, other]),
+                                   [computed, computed])
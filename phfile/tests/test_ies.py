@@ -7,10 +7,12 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 """
 
 
+import io
 import unittest
 
+import numpy as np
 
-from .test_data import ies_document_dict
+from .test_data import ies_document_dict, ies_text
 from .. import IES
 from .. import PhotometryValidationError
 
@@ -91,26 +93,140 @@ class TestIES(unittest.TestCase):
             'TILT=NONE\n'
             '1 1053 1.0 91 1 1 2 -0.07 -0.07 0.0\n'
             '1.0 1 12.5\n'
-            '0.0 2.0 4.0 6.0 8.0 10.0 12.0 14.0 16.0 18.0 20.0 22.0 24.0 26.0'
-            ' 28.0 30.0 32.0 34.0 36.0 38.0 40.0 42.0 44.0 46.0 48.0 50.0 52.0'
-            ' 54.0 56.0 58.0 60.0 62.0 64.0 66.0 68.0 70.0 72.0 74.0 76.0 78.0'
-            ' 80.0 82.0 84.0 86.0 88.0 90.0 92.0 94.0 96.0 98.0 100.0 102.0'
-            ' 104.0 106.0 108.0 110.0 112.0 114.0 116.0 118.0 120.0 122.0'
-            ' 124.0 126.0 128.0 130.0 132.0 134.0 136.0 138.0 140.0 142.0'
-            ' 144.0 146.0 148.0 150.0 152.0 154.0 156.0 158.0 160.0 162.0'
-            ' 164.0 166.0 168.0 170.0 172.0 174.0 176.0 178.0 180.0\n'
+            '0.0 2.0 4.0 6.0 8.0 10.0 12.0 14.0 16.0 18.0\n'
+            '20.0 22.0 24.0 26.0 28.0 30.0 32.0 34.0 36.0 38.0\n'
+            '40.0 42.0 44.0 46.0 48.0 50.0 52.0 54.0 56.0 58.0\n'
+            '60.0 62.0 64.0 66.0 68.0 70.0 72.0 74.0 76.0 78.0\n'
+            '80.0 82.0 84.0 86.0 88.0 90.0 92.0 94.0 96.0 98.0\n'
+            '100.0 102.0 104.0 106.0 108.0 110.0 112.0 114.0 116.0 118.0\n'
+            '120.0 122.0 124.0 126.0 128.0 130.0 132.0 134.0 136.0 138.0\n'
+            '140.0 142.0 144.0 146.0 148.0 150.0 152.0 154.0 156.0 158.0\n'
+            '160.0 162.0 164.0 166.0 168.0 170.0 172.0 174.0 176.0 178.0\n'
+            '180.0\n'
+            '0.0\n'
+            '6998.27 6685.65 5767.93 4253.29 3083.65'
+            ' 2209.96 1512.62 1042.1 752.032 582.694\n'
+            '490.519 431.74 392.66 366.581 348.293'
+            ' 333.496 317.339 277.741 215.423 136.542\n'
+            '74.2517 20.0355 8.74346 7.26298 6.66608'
+            ' 4.72025 5.07564 5.01085 3.95645 4.14691\n'
+            '3.60695 3.41256 4.32951 2.7862 2.47597'
+            ' 1.80642 3.13178 2.59378 2.55844 2.10487\n'
+            '1.56687 2.33853 2.0008 2.69785 4.02714 2.84118 0.0 0.0 0.0 0.0\n'
+            '0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n'
+            '0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n'
+            '0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n'
+            '0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n'
             '0.0\n'
-            '6998.27 6685.65 5767.93 4253.29 3083.65 2209.96 1512.62 1042.1'
-            ' 752.032 582.694 490.519 431.74 392.66 366.581 348.293 333.496'
-            ' 317.339 277.741 215.423 136.542 74.2517 20.0355 8.74346 7.26298'
-            ' 6.66608 4.72025 5.07564 5.01085 3.95645 4.14691 3.60695 3.41256'
-            ' 4.32951 2.7862 2.47597 1.80642 3.13178 2.59378 2.55844 2.10487'
-            ' 1.56687 2.33853 2.0008 2.69785 4.02714 2.84118 0.0 0.0 0.0 0.0'
-            ' 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0'
-            ' 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0'
-            ' 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n'
         )
         self.assertRaises(PhotometryValidationError,
                           lambda: self._ies_obj.text)
         self._ies_obj.set(**ies_input)
         self.assertEqual(self._ies_obj.text, result.strip())
+
+    def test_loads(self):
+        """."""
+        self._ies_obj.loads(ies_text)
+        self.assertEqual(self._ies_obj.item('header', 'issuedate',
+                                            'luminaire'),
+                         {'header': 'IESNA:LM-63-1995',
+                          'issuedate': '',
+                          'luminaire': '2000 P20 LED L927 15D track'})
+        self.assertEqual(self._ies_obj.item('lumens_per_lamp'), 1053)
+        candela_values = self._ies_obj.item('candela_values')
+        self.assertEqual(candela_values.shape, (3, 5))
+        np.testing.assert_array_equal(candela_values[:, -2], [100, 50, 10])
+        np.testing.assert_array_equal(self._ies_obj.item('vertical_angles'),
+                                      [0, 22.5, 45, 67.5, 90])
+
+    def test_load_text(self):
+        """."""
+        self._ies_obj.load(io.BytesIO(ies_text.encode('cp1252')))
+        text = self._ies_obj.text
+        self.assertEqual(IES().loads(text).text, text)
+
+    def test_loads_failed(self):
+        """."""
+        for data in (ies_text.replace('TILT=NONE', 'TILT=INCLUDE'),
+                     ies_text.replace('TILT=NONE', ''),
+                     ies_text.replace('10 0', '10'),
+                     ies_text.replace('10 0', '10 x')):
+            with self.subTest(data=data):
+                self.assertRaises(ValueError,
+                                  lambda: self._ies_obj.loads(data))
+
+    def test_consistency(self):
+        """."""
+        for items in ({'vertical_angles': [0, 90]},
+                      {'number_of_horizontal_angles': 5},
+                      {'candela_values': [1, 2, 3]}):
+            with self.subTest(items=items):
+                self._ies_obj.loads(ies_text).set(**items)
+                self.assertRaises(PhotometryValidationError,
+                                  lambda: self._ies_obj.text)
+                self.assertRaises(PhotometryValidationError,
+                                  self._ies_obj.to_ldt)
+
+    def test_to_ldt(self):
+        """."""
+        ldt_obj = IES().loads(ies_text).to_ldt()
+        self.assertEqual(ldt_obj.item('symmetry_indicator', 'number_mc',
+                                      'distance_dc', 'luminous_length',
+                                      'luminous_width'),
+                         {'symmetry_indicator': 4,
+                          'number_mc': 8,
+                          'distance_dc': 45,
+                          'luminous_length': 70.0,
+                          'luminous_width': 0.0})
+        intensities = ldt_obj.item('luminous_intensities')
+        self.assertEqual(intensities.shape, (3, 5))
+        self.assertAlmostEqual(intensities[2, 3], 10 * 1000 / 1053, 3)
+        self.assertNotIn('dff', ldt_obj.check_flux(tolerance=.1))
+        self.assertEqual(ldt_obj.to_ies().to_ldt().text, ldt_obj.text)
+        # dimensions in feet
+        ldt_obj = IES().loads(ies_text.replace(' 1 2 -0.07 ', ' 1 1 -0.07 '))\
+            .to_ldt()
+        self.assertAlmostEqual(ldt_obj.item('luminous_length'), 21.336)
+
+    def test_to_ldt_symmetry(self):
+        """."""
+        angles_h = np.arange(0, 361, 15)
+        angles_v = np.array([0, 45, 90])
+        radians = np.radians(angles_h)[:, np.newaxis]
+        functions = {
+            0: np.cos(radians) + .5 * np.sin(radians),
+            1: np.zeros_like(radians),
+            2: np.cos(radians),
+            3: np.sin(radians),
+            4: np.cos(2 * radians),
+        }
+        self._ies_obj.loads(ies_text)
+        for symmetry, function in functions.items():
+            with self.subTest(symmetry=symmetry):
+                candela_values = (100 + 20 * function)\
+                    * np.cos(np.radians(angles_v / 2))
+                self._ies_obj.set(number_of_horizontal_angles=len(angles_h),
+                                  number_of_vertical_angles=len(angles_v),
+                                  horizontal_angles=angles_h,
+                                  vertical_angles=angles_v,
+                                  candela_values=candela_values)
+                ldt_obj = self._ies_obj.to_ldt()
+                self.assertEqual(ldt_obj.item('symmetry_indicator'),
+                                 symmetry)
+                # rotational symmetry is expanded to C0 and C360 only
+                result = ldt_obj.to_ies().item('candela_values')
+                planes = np.linspace(0, len(angles_h) - 1, len(result))
+                np.testing.assert_allclose(result,
+                                           candela_values[planes.astype(int)],
+                                           atol=.01)
+
+    def test_to_ldt_failed(self):
+        """."""
+        self._ies_obj.loads(ies_text)
+        self._ies_obj.set(horizontal_angles=[0, 30, 90])
+        self.assertRaises(ValueError, self._ies_obj.to_ldt)
+        for photometric_type in (2, 3):
+            with self.subTest(photometric_type=photometric_type):
+                self._ies_obj.loads(ies_text)
+                self._ies_obj.set(photometric_type=photometric_type)
+                self.assertRaises(ValueError, self._ies_obj.to_ldt)
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for point by point illuminance.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..illuminance import Luminaire, directions, grid_points, rotation_matrix
+
+
+class TestIlluminance(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.ldt = LDT().loads(ldt_set_input_valid)
+        # intensity at nadir [cd]
+        self.nadir = self.ldt.item('luminous_intensities')[0, 0] * .098
+
+    def test_grid_points(self):
+        """."""
+        x, y = grid_points(10, 4, 5, 2, origin=(1, 2))
+        self.assertEqual(x.shape, (2, 5))
+        np.testing.assert_allclose(x[0], [2, 4, 6, 8, 10])
+        np.testing.assert_allclose(y[:, 0], [3, 5])
+
+    def test_directions(self):
+        """."""
+        c, gamma = directions(np.array([[1., 0, 0], [0, 1, 0], [0, 0, -1],
+                                        [0, 0, 1]]),
+                              rotation_matrix())
+        np.testing.assert_allclose(c[:2], [0, 90])
+        np.testing.assert_allclose(gamma, [90, 90, 0, 180])
+        # rotated luminaire has C0 plane along y axis
+        c, gamma = directions(np.array([0., 1, 0]), rotation_matrix(90))
+        self.assertAlmostEqual(float(c), 0)
+        # tilted nadir points towards C90 plane
+        c, gamma = directions(np.array([0, np.sin(np.radians(20)),
+                                        -np.cos(np.radians(20))]),
+                              rotation_matrix(tilt=20))
+        self.assertAlmostEqual(float(gamma), 0)
+
+    def test_horizontal(self):
+        """."""
+        luminaire = Luminaire(self.ldt, (1, 2, 3))
+        self.assertAlmostEqual(float(luminaire.illuminance(1, 2)),
+                               self.nadir / 9)
+        self.assertAlmostEqual(float(luminaire.illuminance(1, 2, 1)),
+                               self.nadir / 4)
+        # points above luminaire are not lit
+        self.assertEqual(float(luminaire.illuminance(1, 2, 4)), 0)
+        x, y = grid_points(10, 10, 20, 20)
+        np.testing.assert_allclose(luminaire.illuminance(x, y),
+                                   luminaire.illuminance(x, y,
+                                                         chunk_size=7))
+        # rotationally symmetric distribution
+        np.testing.assert_allclose(
+            Luminaire(self.ldt, (1, 2, 3), rotation=30).illuminance(x, y),
+            luminaire.illuminance(x, y))
+
+    def test_vertical_cylindrical(self):
+        """."""
+        luminaire = Luminaire(self.ldt, (0, 0, 3))
+        facing, away = (luminaire.illuminance(2, 0, kind='vertical',
+                                              azimuth=azimuth)
+                        for azimuth in (180, 0))
+        self.assertGreater(facing, 0)
+        self.assertEqual(away, 0)
+        cylindrical = luminaire.illuminance(2, 0, kind='cylindrical')
+        self.assertAlmostEqual(float(cylindrical), float(facing) / np.pi)
+        self.assertEqual(float(luminaire.illuminance(0, 0, 0, 'cylindrical')),
+                         0)
+        self.assertRaises(ValueError,
+                          lambda: luminaire.illuminance(0, 0, kind='normal'))
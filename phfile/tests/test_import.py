@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for lazy imports of package.
+
+"""
+
+
+import subprocess
+import sys
+import unittest
+
+
+def imported_modules(statement, *modules):
+    """Return which of modules are imported after executing statement."""
+    code = ('import sys\n'
+            + statement + '\n'
+            + 'print(" ".join(m for m in %r if m in sys.modules))'
+            % (modules, ))
+    return subprocess.run([sys.executable, '-c', code],
+                          check=True,
+                          stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+
+class TestImport(unittest.TestCase):
+    """."""
+
+    def test_import_package(self):
+        """."""
+        self.assertEqual(imported_modules('import phfile',
+                                          'cerberus', 'matplotlib', 'numpy'),
+                         [])
+
+    def test_import_ldt(self):
+        """."""
+        self.assertEqual(imported_modules('from phfile import IES, LDT\n'
+                                          'LDT().set(company="company")',
+                                          'cerberus', 'matplotlib'),
+                         [])
+
+    def test_import_unknown(self):
+        """."""
+        with self.assertRaises(ImportError):
+            from .. import Unknown  # noqa: F401
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for interpolation of luminous intensities.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from ..interpolation import Interpolator, resample
+from ..symmetry import compact
+
+
+class TestInterpolator(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.angles_c = np.arange(0, 360, 15.)
+        self.angles_g = np.arange(0, 181, 5.)
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        self.full = 100 * np.cos(np.radians(g / 2))\
+            * (2 + np.cos(np.radians(c)))
+        rng = np.random.default_rng(0)
+        self.c = rng.uniform(-360, 720, (50, 40))
+        self.gamma = rng.uniform(0, 180, (50, 40))
+
+    def test_grid_points(self):
+        """."""
+        interpolator = Interpolator(self.angles_c, self.angles_g,
+                                    self.full, 0, 24)
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        for method in ('linear', 'cubic'):
+            with self.subTest(method=method):
+                np.testing.assert_allclose(interpolator(c, g, method),
+                                           self.full)
+
+    def test_linear(self):
+        """."""
+        interpolator = Interpolator(self.angles_c, self.angles_g,
+                                    self.full, 0, 24)
+        self.assertAlmostEqual(
+            float(interpolator(7.5, 2.5)),
+            self.full[:2, :2].mean())
+        # periodic between C345 and C360
+        self.assertAlmostEqual(
+            float(interpolator(352.5, 0)),
+            (self.full[23, 0] + self.full[0, 0]) / 2)
+        self.assertEqual(interpolator(self.c, 10).shape, (50, 40))
+        self.assertRaises(ValueError, lambda: interpolator(0, 0, 'nearest'))
+
+    def test_symmetry(self):
+        """."""
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        # symmetric to planes C0-C180 and C90-C270
+        symmetric = 100 * np.cos(np.radians(g / 2))\
+            * (2 + np.cos(np.radians(2 * c)))
+        rotational = np.broadcast_to(symmetric[0], symmetric.shape)
+        for symmetry in range(1, 5):
+            full = rotational if symmetry == 1 else symmetric
+            reference = Interpolator(self.angles_c, self.angles_g, full,
+                                     0, 24)
+            interpolator = Interpolator(self.angles_c, self.angles_g,
+                                        compact(full, symmetry),
+                                        symmetry, 24)
+            for method in ('linear', 'cubic'):
+                with self.subTest(symmetry=symmetry, method=method):
+                    np.testing.assert_allclose(
+                        interpolator(self.c, self.gamma, method),
+                        reference(self.c, self.gamma, method))
+
+    def test_non_uniform(self):
+        """."""
+        uniform = Interpolator(self.angles_c, self.angles_g, self.full,
+                               0, 24)
+        angles_g = self.angles_g.copy()
+        angles_g[1] += 1e-3
+        non_uniform = Interpolator(self.angles_c, angles_g, self.full,
+                                   0, 24)
+        np.testing.assert_allclose(non_uniform(self.c, self.gamma),
+                                   uniform(self.c, self.gamma),
+                                   atol=1e-2)
+
+    def test_outside(self):
+        """."""
+        interpolator = Interpolator(self.angles_c, self.angles_g[:19],
+                                    self.full[:, :19], 0, 24)
+        self.assertEqual(float(interpolator(0, 135)), 0)
+        # gamma over 180 is gamma in opposite C-plane
+        full = Interpolator(self.angles_c, self.angles_g, self.full, 0, 24)
+        self.assertAlmostEqual(float(full(30, 200)), float(full(210, 160)))
+
+    def test_resample(self):
+        """."""
+        c, g = np.meshgrid(self.angles_c, self.angles_g, indexing='ij')
+        symmetric = 100 * np.cos(np.radians(g / 2))\
+            * (2 + np.cos(np.radians(2 * c)))
+        for symmetry in (0, 2, 3, 4):
+            stored = compact(symmetric, symmetry)
+            reference = Interpolator(self.angles_c, self.angles_g, stored,
+                                     symmetry, 24)
+            for method in ('linear', 'cubic'):
+                with self.subTest(symmetry=symmetry, method=method):
+                    angles_c, angles_g, intensities = resample(
+                        stored, self.angles_c, self.angles_g, symmetry, 24,
+                        5, 2.5, method)
+                    self.assertEqual(len(angles_c), 72)
+                    self.assertEqual(len(angles_g), 73)
+                    resampled = Interpolator(angles_c, angles_g,
+                                             intensities, symmetry, 72)
+                    c, g = np.meshgrid(angles_c, angles_g, indexing='ij')
+                    np.testing.assert_allclose(resampled(c, g),
+                                               reference(c, g, method))
+        # stack of matrices sharing grid
+        intensities = resample(np.stack((self.full, 2 * self.full)),
+                               self.angles_c, self.angles_g, 0, 24, 30,
+                               10)[2]
+        self.assertEqual(intensities.shape, (2, 12, 19))
+        np.testing.assert_allclose(intensities[1], 2 * intensities[0])
+        np.testing.assert_allclose(intensities[0], self.full[::2, ::2])
+        self.assertRaises(ValueError, lambda: resample(
+            self.full, self.angles_c, self.angles_g, 0, 24, 7, 5))
+        self.assertRaises(ValueError, lambda: resample(
+            self.full, self.angles_c, self.angles_g, 0, 24, 5, 7))
+        self.assertRaises(ValueError, lambda: resample(
+            compact(symmetric, 4), self.angles_c, self.angles_g, 4, 24,
+            60, 5))
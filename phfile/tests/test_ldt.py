@@ -11,13 +11,21 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 
 
 from unittest import mock
+import io
+import os
+import tempfile
+import tracemalloc
 import unittest
+import warnings
+
+import numpy as np
 
 from .test_data import (ldt_document_dict,
                         ldt_set_input_faulty,
                         ldt_set_input_valid,
                         ldt_text)
-from .. import LDT
+from .. import IES, LDT, PhotometryValidationError
+from ..validator import CompiledValidator
 
 
 class TestLDT(unittest.TestCase):
@@ -49,6 +57,161 @@ class TestLDT(unittest.TestCase):
         self.assertRaises(ValueError,
                           lambda: self._ldt_obj.load('path/to/ldt/file'))
 
+    @mock.patch('builtins.open',
+                new_callable=mock.mock_open,
+                read_data=ldt_set_input_valid)
+    def test_load_intensities_matrix(self, m):
+        """."""
+        self._ldt_obj.load('path/to/ldt/file')
+        intensities = self._ldt_obj.item('luminous_intensities')
+        self.assertIsInstance(intensities, np.ndarray)
+        self.assertEqual(intensities.dtype, np.float64)
+        self.assertEqual(intensities.shape, (1, 91))
+        self.assertEqual(intensities[0, 0], 6528.92)
+        self.assertEqual(self._ldt_obj.item('angles_g').shape, (91, ))
+
+    @mock.patch('builtins.open',
+                new_callable=mock.mock_open,
+                read_data=ldt_set_input_valid.replace('6528.92', '6528,92'))
+    def test_load_decimal_comma(self, m):
+        """."""
+        self._ldt_obj.load('path/to/ldt/file')
+        self.assertEqual(self._ldt_obj.item('luminous_intensities')[0, 0],
+                         6528.92)
+
+    @mock.patch('builtins.open',
+                new_callable=mock.mock_open,
+                read_data=ldt_set_input_valid)
+    def test_set_intensities_list(self, m):
+        """."""
+        self._ldt_obj.load('path/to/ldt/file')
+        self._ldt_obj.set(luminous_intensities=[str(i) for i in range(91)])
+        intensities = self._ldt_obj.item('luminous_intensities')
+        self.assertEqual(intensities.shape, (1, 91))
+        np.testing.assert_array_equal(intensities[0], np.arange(91))
+
+    def test_loads_buffers(self):
+        """."""
+        data = ldt_set_input_valid.replace('Aquaform INC', 'Äquaform INC')\
+            .replace('\n', '\r\n')
+        for buffer in (data,
+                       data.encode('cp1252'),
+                       bytearray(data.encode('utf-8')),
+                       memoryview(data.encode('utf-8-sig'))):
+            with self.subTest(buffer=type(buffer)):
+                self._ldt_obj.loads(buffer)
+                self.assertEqual(self._ldt_obj.item('company'),
+                                 'Äquaform INC')
+                self.assertEqual(self._ldt_obj.item('luminaire_no'), '')
+                self.assertEqual(self._ldt_obj.text,
+                                 ldt_set_input_valid.replace(
+                                     'Aquaform INC', 'Äquaform INC'))
+
+    def test_load_file_object(self):
+        """."""
+        data = ldt_set_input_valid.replace('Aquaform INC', 'Äquaform INC')
+        self._ldt_obj.load(io.BytesIO(data.encode('latin-1')),
+                           encoding='latin-1')
+        self.assertEqual(self._ldt_obj.item('company'), 'Äquaform INC')
+        self._ldt_obj.load(io.StringIO(data))
+        self.assertEqual(self._ldt_obj.item('company'), 'Äquaform INC')
+
+    def test_load_header_only(self):
+        """."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'file.ldt')
+            with open(path, 'w') as f:
+                f.write(ldt_set_input_valid)
+            loaded = LDT().load(path)
+            ldt = LDT().load(path, header_only=True)
+            self.assertIsNotNone(ldt._pending)
+            self.assertEqual(ldt.item('company'), loaded.item('company'))
+            self.assertEqual(ldt.item('lamps'), loaded.item('lamps'))
+            self.assertIsNotNone(ldt._pending)
+            np.testing.assert_array_equal(ldt.item('luminous_intensities'),
+                                          loaded.item('luminous_intensities'))
+            self.assertIsNone(ldt._pending)
+            self.assertEqual(ldt.text, ldt_set_input_valid)
+            # items set before arrays are parsed are kept
+            ldt = LDT().load(path, header_only=True)
+            ldt.set(company='Other', angles_g=np.arange(19) * 5.)
+            np.testing.assert_array_equal(ldt.document['angles_g'],
+                                          np.arange(19) * 5.)
+            np.testing.assert_array_equal(ldt.document['angles_c'],
+                                          loaded.document['angles_c'])
+            self.assertEqual(ldt.item('company'), 'Other')
+            with open(path, 'w') as f:
+                f.write(ldt_set_input_valid[:100])
+            self.assertRaises(ValueError,
+                              lambda: LDT().load(path, header_only=True))
+
+    def test_write_unchanged(self):
+        """."""
+        data = ldt_set_input_valid.replace('Aquaform INC', 'Äquaform INC')\
+            .replace('\n', '\r\n').encode('cp1252')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'file.ldt')
+            output = os.path.join(tmp_dir, 'output.ldt')
+            with open(path, 'wb') as f:
+                f.write(data)
+            for header_only in (False, True):
+                with self.subTest(header_only=header_only):
+                    LDT().load(path, header_only=header_only).write(output)
+                    with open(output, 'rb') as f:
+                        self.assertEqual(f.read(), data)
+            # items which cannot be encoded as cp1252 are written as utf-8
+            LDT().load(path).set(luminaire_name='Łuk').write(output)
+            with open(output, 'rb') as f:
+                self.assertIn('Łuk\r\n'.encode('utf-8'), f.read())
+
+    def test_consistency(self):
+        """."""
+        for item, items in (
+                ('angles_g', {'angles_g': [0, 10, 20]}),
+                ('angles_c', {'angles_c': [0, 90]}),
+                ('luminous_intensities', {'number_ng': 19}),
+                ('luminous_intensities',
+                 {'luminous_intensities': np.ones((2, 91))}),
+                ('lamps', {'lamps': []})):
+            with self.subTest(items=items):
+                self._ldt_obj.loads(ldt_set_input_valid).set(**items)
+                # items can be set one by one, document is checked before
+                # use
+                self.assertRaises(PhotometryValidationError,
+                                  lambda: self._ldt_obj.text)
+                self.assertIn(item, self._ldt_obj.errors)
+                self.assertRaises(PhotometryValidationError,
+                                  lambda: self._ldt_obj.intensity_at(0, 0))
+        self._ldt_obj.loads(ldt_set_input_valid)
+        self._ldt_obj.set(number_ng=19, distance_dg=5,
+                          angles_g=np.arange(19) * 5.,
+                          luminous_intensities=np.ones(19))
+        self.assertEqual(self._ldt_obj.text.split('\n')[5], '19')
+        # whole document is checked on validation
+        document = {**self._ldt_obj.document, 'angles_g': np.arange(3.)}
+        self.assertRaises(PhotometryValidationError,
+                          lambda: LDT().validate(document))
+
+    def test_loads_incorrect_values(self):
+        """."""
+        self.assertRaises(ValueError,
+                          lambda: self._ldt_obj.loads(
+                              ldt_set_input_valid.replace('6528.92', 'x')))
+        self.assertRaises(ValueError,
+                          lambda: self._ldt_obj.loads(
+                              ldt_set_input_valid[:100]))
+        # bad token is found whatever warning filters are, process-global
+        # filters are not touched while parsing
+        for action in ('ignore', 'error'):
+            with self.subTest(action=action), warnings.catch_warnings():
+                warnings.simplefilter(action)
+                with mock.patch.object(warnings, 'catch_warnings',
+                                       side_effect=AssertionError):
+                    self.assertRaises(ValueError,
+                                      lambda: self._ldt_obj.loads(
+                                          ldt_set_input_valid.replace(
+                                              '6528.92', '6528.92x')))
+
     def test_set_valid_items_list_keys(self):
         """."""
         document_list = list(sum(ldt_document_dict.items(), ()))
@@ -108,5 +271,172 @@ class TestLDT(unittest.TestCase):
         """."""
         self._ldt_obj.load('path/to/ldt/file')
         self.maxDiff = None
+        # items which did not change are copied from loaded file
+        self.assertEqual(ldt_set_input_valid, self._ldt_obj.text)
         self.assertEqual(ldt_text,
-                         self._ldt_obj.text)
+                         LDT().set(**self._ldt_obj.document).text)
+        intensities = self._ldt_obj.item('luminous_intensities')
+        self._ldt_obj.set(distance_dg=2., luminaire_name='changed',
+                          luminous_intensities=intensities + 1)
+        lines = self._ldt_obj.text.split('\n')
+        self.assertEqual(lines[6], '2')
+        self.assertEqual(lines[8], 'changed')
+        self.assertEqual(lines[-91:],
+                         list(map(str, (intensities + 1).ravel().tolist())))
+        self.assertEqual(lines[:-91], ldt_set_input_valid.replace(
+            'dioda LENS LINE 15st 3000K 250mA\n',
+            'changed\n', 1).split('\n')[:-91])
+
+    def test_to_ies(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        ies_obj = self._ldt_obj.to_ies()
+        self.assertEqual(ies_obj.item('lumcat', 'lumens_per_lamp',
+                                      'number_of_horizontal_angles'),
+                         {'lumcat': '',
+                          'lumens_per_lamp': 98,
+                          'number_of_horizontal_angles': 2})
+        np.testing.assert_array_equal(ies_obj.item('horizontal_angles'),
+                                      [0, 360])
+        candela_values = ies_obj.item('candela_values')
+        self.assertEqual(candela_values.shape, (2, 91))
+        self.assertAlmostEqual(candela_values[1, 0], 6528.92 * .098, 3)
+        self.assertEqual(IES().loads(ies_obj.text).text, ies_obj.text)
+        # numeric lines are wrapped, each horizontal angle starts new line
+        lines = ies_obj.text.split('\n')
+        self.assertLessEqual(max(map(len, lines)), 132)
+        self.assertEqual(len(lines), 12 + 10 + 1 + 2 * 10)
+        self.assertEqual(lines[-10].split()[0], lines[-20].split()[0])
+
+    def test_full_intensities(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        full = self._ldt_obj.set(number_mc=4, distance_dc=90,
+                                 angles_c=[0, 90, 180, 270])\
+            .full_intensities()
+        self.assertEqual(full.shape, (4, 91))
+        self.assertIs(full, self._ldt_obj.full_intensities())
+        np.testing.assert_array_equal(self._ldt_obj.c_plane(-90),
+                                      self._ldt_obj.c_plane(0))
+        intensities = np.array([[1.] * 91, [2.] * 91, [3.] * 91])
+        self._ldt_obj.set(symmetry_indicator=2,
+                          luminous_intensities=intensities)
+        np.testing.assert_array_equal(self._ldt_obj.c_plane(270),
+                                      intensities[1])
+        self.assertRaises(ValueError, lambda: self._ldt_obj.c_plane(45))
+
+    def test_compact(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        self._ldt_obj.set(number_mc=4, distance_dc=90,
+                          angles_c=[0, 90, 180, 270])
+        self._ldt_obj.compact(0)
+        self.assertEqual(self._ldt_obj.item('luminous_intensities').shape,
+                         (4, 91))
+        self._ldt_obj.compact()
+        self.assertEqual(self._ldt_obj.item('symmetry_indicator'), 1)
+        self.assertEqual(self._ldt_obj.item('luminous_intensities').shape,
+                         (1, 91))
+
+    def test_intensity_at(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        intensities = self._ldt_obj.item('luminous_intensities')
+        np.testing.assert_allclose(
+            self._ldt_obj.intensity_at([0, 90, 180], [0, 0, 90]),
+            intensities[0, [0, 0, 45]])
+        interpolator = self._ldt_obj._interpolator[1]
+        self._ldt_obj.intensity_at(0, 0)
+        self.assertIs(self._ldt_obj._interpolator[1], interpolator)
+        self._ldt_obj.set(luminous_intensities=intensities * 2)
+        self.assertAlmostEqual(float(self._ldt_obj.intensity_at(45, 0)),
+                               2 * intensities[0, 0])
+
+    def test_validation_cache(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        ies_obj = self._ldt_obj.to_ies()
+        with mock.patch.object(CompiledValidator, 'validate',
+                               autospec=True,
+                               side_effect=CompiledValidator.validate)\
+                as validate:
+            self._ldt_obj.text
+            ies_obj.text
+            validate.assert_not_called()
+            self._ldt_obj.set(luminaire_name='changed')
+            self._ldt_obj.text
+            self.assertEqual(validate.call_count, 1)
+            # item replaced without set() is validated before use
+            self._ldt_obj.document['dff'] = 'x'
+            self.assertRaises(PhotometryValidationError,
+                              lambda: self._ldt_obj.text)
+            self.assertEqual(list(validate.call_args[0][1]), ['dff'])
+        # incomplete document is validated as a whole
+        ldt_obj = LDT().set(luminaire_name='name')
+        self.assertRaises(PhotometryValidationError, lambda: ldt_obj.text)
+
+    def test_memory_footprint(self):
+        """."""
+        LDT().loads(ldt_set_input_valid)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            objects = [LDT().loads(ldt_set_input_valid) for _ in range(100)]
+            size = (tracemalloc.get_traced_memory()[0] - before) / 100
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(objects), 100)
+        # about 8.4 kB per object (1 kB file with 91 intensities)
+        self.assertLess(size, 10000)
+        self.assertFalse(hasattr(objects[0], '__dict__'))
+        self.assertIs(objects[0]._validator, objects[1]._validator)
+
+    def test_variant(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        text = self._ldt_obj.text
+        intensities = self._ldt_obj.item('luminous_intensities')
+        variant = self._ldt_obj.variant(luminaire_name='variant',
+                                        number_of_lamps=2)
+        self.assertEqual(self._ldt_obj.text, text)
+        self.assertEqual(variant.item('luminaire_name'), 'variant')
+        self.assertEqual(variant.item('lamps')[0]['number_of'], 2)
+        self.assertEqual(self._ldt_obj.item('lamps')[0]['number_of'], 1)
+        # arrays and rendered numeric block are shared
+        self.assertIs(variant.item('luminous_intensities'), intensities)
+        self.assertFalse(intensities.flags.writeable)
+        self.assertIs(variant._block(), self._ldt_obj._block())
+        self.assertTrue(variant.text.endswith(self._ldt_obj._block()))
+        # copy on write
+        variant.set(luminous_intensities=intensities * 2)
+        self.assertIs(self._ldt_obj.item('luminous_intensities'),
+                      intensities)
+        self.assertEqual(self._ldt_obj.text, text)
+        self.assertRaises(PhotometryValidationError,
+                          lambda: self._ldt_obj.variant(number_mc='x'))
+
+    def test_resample(self):
+        """."""
+        self._ldt_obj.loads(ldt_set_input_valid)
+        reference = self._ldt_obj.interpolator()
+        self._ldt_obj.resample(15, 5)
+        self.assertEqual(self._ldt_obj.item('number_mc', 'distance_dc',
+                                            'number_ng', 'distance_dg'),
+                         {'number_mc': 24, 'distance_dc': 15,
+                          'number_ng': 37, 'distance_dg': 5.})
+        self.assertEqual(self._ldt_obj.item('luminous_intensities').shape,
+                         (1, 37))
+        np.testing.assert_allclose(
+            self._ldt_obj.intensity_at(0, np.arange(0, 181, 5.)),
+            reference(0, np.arange(0, 181, 5.)))
+        self.assertFalse(self._ldt_obj.errors)
+        # file is consistent after resampling
+        self.assertEqual(LDT().loads(self._ldt_obj.text).item('number_ng'),
+                         37)
+        self.assertEqual(self._ldt_obj.text.split('\n')[4], '15')
+        # fractional distance between C-planes is kept
+        self._ldt_obj.resample(7.5, 5)
+        self.assertEqual(self._ldt_obj.item('distance_dc'), 7.5)
+        self.assertEqual(self._ldt_obj.text.split('\n')[4], '7.5')
+        self.assertEqual(LDT().loads(self._ldt_obj.text).item('distance_dc'),
+                         7.5)
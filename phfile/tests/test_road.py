@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for road lighting.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..road import (RTable, Road, evaluate, glare_index, glare_index_class,
+                    intensity_class, sweep)
+
+
+class TestRoad(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.ldt = LDT().loads(ldt_set_input_valid)
+        gamma = self.ldt.item('angles_g')
+        # no light beyond 60 degrees, all of it within 5 mounting heights
+        self.ldt.set(luminous_intensities=np.where(
+            gamma <= 60, 500 * np.cos(np.radians(gamma)), 0)[None, :],
+            luminous_length=600, luminous_width=200)
+        self.road = Road(RTable.lambertian(), lanes=2, lane_width=3.5)
+
+    def test_r_table(self):
+        """."""
+        table = RTable.lambertian(.1)
+        np.testing.assert_allclose(
+            table(np.array([0., 45, -170]), np.array([0., 1, 20])),
+            [.1, .1 / 2 ** 1.5, 0])
+        table = RTable([0, 90, 180], [0, 1], [[1, 2, 3], [3, 4, 5]], 1e-4)
+        self.assertAlmostEqual(float(table(np.array(45.), np.array(.5))),
+                               2.5e-4)
+        self.assertRaises(ValueError, lambda: RTable([0, 180], [0, 1],
+                                                     [[1, 2, 3]]))
+
+    def test_lambertian_surface(self):
+        """."""
+        road = Road(RTable.lambertian(.08))
+        result = evaluate(self.ldt, road, 25, 8, overhang=1)
+        # diffuse surface has luminance q0 E (r-table is interpolated)
+        self.assertAlmostEqual(result['average_luminance'],
+                               .08 * result['average_illuminance'],
+                               delta=1e-3 * result['average_luminance'])
+        self.assertAlmostEqual(result['uo'],
+                               result['minimum_illuminance']
+                               / result['average_illuminance'], 2)
+        self.assertEqual(result['ti'], 0)
+        opposite = evaluate(self.ldt, road, 25, 8, overhang=1,
+                            arrangement='opposite')
+        self.assertAlmostEqual(opposite['average_illuminance'],
+                               2 * result['average_illuminance'])
+        self.assertRaises(ValueError, lambda: evaluate(
+            self.ldt, road, 25, 8, arrangement='twin'))
+
+    def test_threshold_increment(self):
+        """."""
+        result = evaluate(LDT().loads(ldt_set_input_valid), self.road, 30,
+                          8)
+        self.assertGreater(result['ti'], 0)
+        # worked example: 100 cd in all directions, observer in centre of
+        # single lane 2.75 (10 - 1.5) = 23.375 m before the field sees
+        # only luminaire above lane at start of the field (the next one
+        # is 600 m away), 8.5 m above eye
+        self.ldt.set(luminous_intensities=np.full(
+            self.ldt.item('luminous_intensities').shape, 100.))
+        road = Road(RTable.lambertian(), lanes=1, lane_width=3.5)
+        result = evaluate(self.ldt, road, 600, 10, overhang=1.75,
+                          flux=1000)
+        theta = np.degrees(np.arctan(8.5 / 23.375))
+        self.assertLess(theta, 20)
+        veiling = 9.86 * 100 * np.cos(np.radians(theta))\
+            / (23.375 ** 2 + 8.5 ** 2) / theta ** 2
+        self.assertAlmostEqual(veiling, 3.751e-3, 6)
+        self.assertAlmostEqual(
+            result['ti'], 65 * veiling / result['average_luminance'] ** .8)
+
+    def test_classes(self):
+        """."""
+        self.assertEqual(intensity_class(self.ldt), 'G*6')
+        self.assertEqual(glare_index(self.ldt), 0)
+        self.assertEqual(glare_index_class(self.ldt), 'D6')
+        # 30 degrees of tilt bring intensities of 60 degrees to 90
+        self.assertIsNone(intensity_class(self.ldt, tilt=30))
+        self.assertGreater(glare_index(self.ldt, tilt=30), 0)
+
+    def test_sweep(self):
+        """."""
+        results = sweep(self.ldt, self.road, [20, 30, 40], [6, 8, 10],
+                        tilts=[0, 5], lighting_class='M6', best=5)
+        self.assertEqual(len(results), 5)
+        compliant = [result['compliant'] for result in results]
+        self.assertEqual(compliant, sorted(compliant, reverse=True))
+        self.assertEqual(set(results[0]) >= {'spacing', 'height',
+                                             'overhang', 'tilt', 'uo'},
+                         True)
+        self.assertEqual(
+            sweep(self.ldt, self.road, [20, 30, 40], [6, 8, 10],
+                  tilts=[0, 5], lighting_class='M6', best=5, processes=2),
+            results)
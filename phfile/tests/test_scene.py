@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for illuminance of many luminaires.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..illuminance import Luminaire, grid_points
+from ..scene import Scene
+
+
+class TestScene(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.ldts = [LDT().loads(ldt_set_input_valid),
+                     LDT().loads(ldt_set_input_valid).set(
+                         symmetry_indicator=0, number_mc=4, distance_dc=90,
+                         angles_c=[0, 90, 180, 270],
+                         luminous_intensities=np.linspace(1, 300, 4 * 91))]
+        rng = np.random.default_rng(0)
+        self.placements = [(self.ldts[i % 2],
+                            (rng.uniform(0, 30), rng.uniform(0, 30),
+                             rng.uniform(3, 6)),
+                            rng.uniform(0, 360), rng.uniform(0, 20))
+                           for i in range(30)]
+        self.x, self.y = grid_points(30, 30, 40, 40)
+
+    def scene(self, cutoff):
+        """."""
+        scene = Scene(cutoff)
+        for ldt, position, rotation, tilt in self.placements:
+            scene.add(ldt, position, rotation, tilt)
+        return scene
+
+    def test_illuminance(self):
+        """."""
+        scene = self.scene(1e-9)
+        self.assertEqual(len(scene), 30)
+        for kind in ('horizontal', 'cylindrical'):
+            with self.subTest(kind=kind):
+                expected = sum(Luminaire(*placement)
+                               .illuminance(self.x, self.y, 1, kind)
+                               for placement in self.placements)
+                np.testing.assert_allclose(
+                    scene.illuminance(self.x, self.y, 1, kind,
+                                      chunk_size=500),
+                    expected)
+
+    def test_cutoff(self):
+        """."""
+        expected = self.scene(1e-9).illuminance(self.x, self.y)
+        culled = self.scene(.05).illuminance(self.x, self.y)
+        self.assertTrue((culled <= expected + 1e-9).all())
+        # each of 30 luminaires misses less than cutoff
+        self.assertLess((expected - culled).max(), 30 * .05)
+
+    def test_processes(self):
+        """."""
+        scene = self.scene(.01)
+        np.testing.assert_allclose(
+            scene.illuminance(self.x, self.y, chunk_size=400, processes=2),
+            scene.illuminance(self.x, self.y))
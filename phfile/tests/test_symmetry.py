@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for symmetry of light distribution.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from ..symmetry import (compact, detect_symmetry, expand, plane_index,
+                        stored_planes)
+
+
+class TestSymmetry(unittest.TestCase):
+    """."""
+
+    def test_stored_planes(self):
+        """."""
+        self.assertEqual([stored_planes(i, 24) for i in range(0, 5)],
+                         [(1, 24), (1, 1), (1, 13), (19, 31), (1, 7)])
+        self.assertRaises(ValueError, lambda: stored_planes(5, 24))
+
+    def test_plane_index(self):
+        """."""
+        # 8 C-planes: C0, C45, ..., C315
+        results = {
+            0: [0, 1, 2, 3, 4, 5, 6, 7],
+            1: [0, 0, 0, 0, 0, 0, 0, 0],
+            2: [0, 1, 2, 3, 4, 3, 2, 1],
+            # stored C270, C315, C0, C45, C90
+            3: [2, 3, 4, 3, 2, 1, 0, 1],
+            4: [0, 1, 2, 1, 0, 1, 2, 1],
+        }
+        for symmetry, result in results.items():
+            with self.subTest(symmetry=symmetry):
+                np.testing.assert_array_equal(plane_index(symmetry, 8),
+                                              result)
+                mc1, mc2 = stored_planes(symmetry, 8)
+                self.assertEqual(max(result), mc2 - mc1)
+
+    def test_plane_index_cached(self):
+        """."""
+        self.assertIs(plane_index(3, 24), plane_index(3, 24))
+        self.assertFalse(plane_index(3, 24).flags.writeable)
+
+    def test_expand_compact(self):
+        """."""
+        full = np.arange(8 * 3, dtype=np.float64).reshape(8, 3)
+        for symmetry in range(0, 5):
+            with self.subTest(symmetry=symmetry):
+                stored = compact(full, symmetry)
+                mc1, mc2 = stored_planes(symmetry, 8)
+                self.assertEqual(stored.shape, (mc2 - mc1 + 1, 3))
+                expanded = expand(stored, symmetry, 8)
+                self.assertFalse(expanded.flags.writeable)
+                np.testing.assert_array_equal(compact(expanded, symmetry),
+                                              stored)
+                self.assertEqual(detect_symmetry(expanded), symmetry)
+        self.assertTrue(np.shares_memory(expand(full, 0, 8), full))
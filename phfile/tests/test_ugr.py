@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for unified glare rating tables.
+
+"""
+
+
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import LDT
+from ..ugr import REFLECTANCES, ROOMS, guth_index, ugr_table, ugr_tables
+
+
+class TestUGR(unittest.TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.ldt = LDT().loads(ldt_set_input_valid)
+
+    def test_guth_index(self):
+        """."""
+        self.assertAlmostEqual(float(guth_index(0, 0)), 1)
+        index = guth_index(np.array([0, 0, 45]), np.array([10, 40, 40]))
+        # glare source is less disturbing far from line of sight and
+        # below it
+        self.assertTrue(index[0] < index[1])
+        self.assertTrue(index[2] < index[1])
+
+    def test_ugr_table(self):
+        """."""
+        table = ugr_table(self.ldt)
+        self.assertEqual(table['crosswise'].shape,
+                         (len(ROOMS), len(REFLECTANCES)))
+        # rotationally symmetric luminaire with circular luminous area
+        np.testing.assert_allclose(table['crosswise'], table['endwise'])
+        # darker room has lower background luminance
+        self.assertTrue((table['crosswise'][:, 1]
+                         > table['crosswise'][:, 0]).all())
+        # luminance squared over background grows with flux
+        doubled = ugr_table(self.ldt, flux=196)
+        np.testing.assert_allclose(doubled['endwise'] - table['endwise'],
+                                   8 * np.log10(2))
+        # the same photometry with intensities doubled and halved factor
+        scaled = LDT().loads(ldt_set_input_valid)
+        scaled.set(luminous_intensities=scaled.item('luminous_intensities')
+                   * 2, conversion_factor=.5)
+        scaled = ugr_table(scaled)
+        for name in ('crosswise', 'endwise'):
+            np.testing.assert_allclose(scaled[name], table[name])
+        self.assertRaises(ValueError, lambda: ugr_table(
+            LDT().loads(ldt_set_input_valid).set(luminous_length=0)))
+
+    def test_ugr_tables(self):
+        """."""
+        rectangular = LDT().loads(ldt_set_input_valid).set(
+            luminous_length=1200, luminous_width=100)
+        tables = ugr_tables([self.ldt, rectangular])
+        np.testing.assert_allclose(tables[0]['endwise'],
+                                   ugr_table(self.ldt)['endwise'])
+        # larger luminous area has lower luminance
+        self.assertTrue((tables[1]['endwise']
+                         < tables[0]['endwise']).all())
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Tests for compiled validator.
+
+Compiled validator is compared against cerberus based reference validator.
+
+"""
+
+
+from concurrent import futures
+from unittest import mock
+import unittest
+
+import numpy as np
+
+from .test_data import ldt_set_input_valid
+from .. import IES, LDT
+from .. import PhotometryValidationError
+from ..schemas import ies_schema, ldt_schema
+from ..validator import CompiledValidator, Validator, shared_validator
+
+
+ldt_documents = [
+    {},
+    {'tilt': 'abc'},
+    {'tilt': None},
+    {'company': None},
+    {'dff': None},
+    {'number_mc': '7'},
+    {'distance_dg': '2,0'},
+    {'lamps': 'x'},
+    {'lamps': [5, None]},
+    {'lamps': [{'number_of': '2'}]},
+    {'lamps': [{'number_of': '1', 'type_of': 'LED', 'total_flux': '98',
+                'color_temp': '3000K', 'cri': '190', 'total_power': 'x'}]},
+    {'direct_ratios': [.5] * 9},
+    {'angles_c': [0, 400]},
+    {'angles_g': [3, 2, 1]},
+    {'angles_g': ['a']},
+    {'luminous_intensities': [[1, np.nan], [-1, 2]]},
+    {'fake_item': 1},
+]
+
+ies_documents = [
+    {},
+    {'future_use': '2', 'photometric_type': '0'},
+    {'future_use': 'x'},
+    {'vertical_angles': [0, '5', 90]},
+    {'vertical_angles': [0, 0]},
+    {'horizontal_angles': [-100]},
+    {'candela_values': ['x']},
+]
+
+
+class TestCompiledValidator(unittest.TestCase):
+    """."""
+
+    def assertSameResult(self, schema, document, update):
+        """."""
+        reference = Validator(schema)
+        compiled = CompiledValidator(schema)
+        self.assertEqual(reference.validate(document, update=update),
+                         compiled.validate(document, update=update))
+        self.assertEqual(reference.errors, compiled.errors)
+
+    def test_ldt_errors(self):
+        """."""
+        for document in ldt_documents:
+            for update in (True, False):
+                with self.subTest(document=document, update=update):
+                    self.assertSameResult(ldt_schema, document, update)
+
+    def test_ies_errors(self):
+        """."""
+        for document in ies_documents:
+            for update in (True, False):
+                with self.subTest(document=document, update=update):
+                    self.assertSameResult(ies_schema, document, update)
+
+    @mock.patch('builtins.open',
+                new_callable=mock.mock_open,
+                read_data=ldt_set_input_valid)
+    def test_ldt_document(self, m):
+        """."""
+        reference = LDT(strict=True).load('path/to/ldt/file').document
+        compiled = LDT().load('path/to/ldt/file').document
+        self.assertEqual(reference.keys(), compiled.keys())
+        for item, value in reference.items():
+            with self.subTest(item=item):
+                if isinstance(value, np.ndarray):
+                    np.testing.assert_array_equal(value, compiled[item])
+                else:
+                    self.assertEqual(value, compiled[item])
+
+    def test_exception(self):
+        """."""
+        for strict in (True, False):
+            with self.subTest(strict=strict):
+                ies_obj = IES(strict=strict)
+                with self.assertRaises(PhotometryValidationError):
+                    ies_obj.set(future_use=2)
+                with self.assertRaises(PhotometryValidationError):
+                    ies_obj.text
+
+    def test_unsupported_rule(self):
+        """."""
+        self.assertRaises(ValueError,
+                          lambda: CompiledValidator({'item': {'regex': '.'}}))
+
+    def test_shared(self):
+        """."""
+        for strict in (True, False):
+            with self.subTest(strict=strict):
+                self.assertIs(shared_validator(ldt_schema, strict),
+                              LDT(strict=strict)._validator)
+                self.assertIsNot(shared_validator(ldt_schema, strict),
+                                 shared_validator(ies_schema, strict))
+        # strict validators reuse the cached cerberus class
+        for schema in (ldt_schema, ies_schema):
+            self.assertIs(type(shared_validator(schema, True)._validator),
+                          Validator)
+        objects = [LDT().loads(ldt_set_input_valid) for _ in range(8)]
+
+        def rename(i):
+            ldt_obj = objects[i % 8]
+            ldt_obj.set(luminaire_name='name %s' % i, number_mc=i)
+            return ldt_obj.item('luminaire_name'), ldt_obj.item('number_mc')
+
+        with futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(rename, range(8)))
+        self.assertEqual(results, [('name %s' % i, i) for i in range(8)])
+        ldt_obj = LDT()
+        with self.assertRaises(PhotometryValidationError):
+            ldt_obj.set(number_mc='x')
+        self.assertTrue(ldt_obj.errors)
+        self.assertFalse(objects[0].errors)
@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Unified glare rating tables.
+
+Tables follow tabular method of CIE 117 / CIE 190: rooms of standard
+dimensions (multiples of H - height of luminaires above eye), regular
+array of luminaires with spacing 0.25 H, observer in the middle of
+wall, eye 1.2 m above floor, looking horizontally across room. Room
+dimension X is across, Y along line of sight. Crosswise view looks
+across luminaire axis (C0-C180 plane), endwise view along it.
+
+UGR = 8 log10(0.25 / Lb sum(L ** 2 omega / p ** 2)), position index p
+is computed with Guth formula, background luminance Lb is indirect
+illuminance of eye divided by pi. Indirect illuminance is flux
+reflected first time by room surfaces (direct ratios split downward flux
+between floor and walls) spread over room surfaces as in integrating
+sphere.
+
+"""
+
+
+import functools
+
+import numpy as np
+
+from .flux import ROOM_INDICES
+from .illuminance import directions, rotation_matrix
+
+
+# room dimensions X, Y in multiples of H
+ROOMS = (
+    (2, 2), (2, 3), (2, 4), (2, 6), (2, 8), (2, 12),
+    (4, 2), (4, 3), (4, 4), (4, 6), (4, 8), (4, 12),
+    (8, 4), (8, 6), (8, 8), (8, 12),
+    (12, 4), (12, 6), (12, 8),
+)
+
+# reflectances of ceiling, walls and floor
+REFLECTANCES = (
+    (.7, .5, .2),
+    (.7, .3, .2),
+    (.5, .5, .2),
+    (.5, .3, .2),
+    (.3, .3, .2),
+)
+
+EYE_HEIGHT = 1.2
+
+
+def guth_index(alpha, beta):
+    """Return Guth position index.
+
+    Args:
+        alpha (ndarray): angle from vertical of plane containing line of
+            sight and source in degrees
+        beta (ndarray): angle between line of sight and source in degrees
+
+    Returns --
+        (ndarray): position index
+    """
+    return np.exp((35.2 - .31889 * alpha - 1.22 * np.exp(-2 * alpha / 9))
+                  * 1e-3 * beta
+                  + (21 + .26667 * alpha - .002963 * alpha ** 2)
+                  * 1e-5 * beta ** 2)
+
+
+@functools.lru_cache(maxsize=16)
+def _geometry(height, spacing):
+    """Return geometry of luminaires seen by observer in standard rooms.
+
+    Returns --
+        (tuple): for crosswise and endwise view tuples of C and gamma
+            angles of directions to eye, squared distances, position
+            indexes; numbers of luminaires in rooms
+    """
+    step = spacing * height
+    vectors, counts = [], []
+    for x, y in ROOMS:
+        across = (np.arange(round(x / spacing)) + .5) * step - x * height / 2
+        along = (np.arange(round(y / spacing)) + .5) * step
+        across, along = (i.ravel() for i in np.meshgrid(across, along))
+        # line of sight is x axis
+        vectors.append(np.column_stack((along, across,
+                                        np.full(len(along), height))))
+        counts.append(len(along))
+    vectors = np.concatenate(vectors)
+    distance = np.einsum('ij,ij->i', vectors, vectors)
+    beta = np.degrees(np.arccos(vectors[:, 0] / np.sqrt(distance)))
+    alpha = np.degrees(np.arctan2(np.abs(vectors[:, 1]), vectors[:, 2]))
+    index = guth_index(alpha, beta)
+    views = []
+    for rotation in (90., 0.):
+        c, gamma = directions(-vectors, rotation_matrix(rotation))
+        views.append((c, gamma, distance, index))
+    return tuple(views), np.array(counts)
+
+
+def _projected_area(document, c, gamma):
+    """Return luminous area seen in directions (C, gamma) [m2]."""
+    length, width = (document[item] / 1000 for item
+                     in ('luminous_length', 'luminous_width'))
+    heights = [document[item] / 1000 for item in (
+        'luminous_height_c0', 'luminous_height_c90',
+        'luminaire_height_c180', 'luminaire_height_c270')]
+    c, gamma = np.radians(c), np.radians(gamma)
+    if width:
+        bottom = length * width
+        sides = np.maximum(np.cos(c), 0) * width * heights[0]\
+            + np.maximum(np.sin(c), 0) * length * heights[1]\
+            + np.maximum(-np.cos(c), 0) * width * heights[2]\
+            + np.maximum(-np.sin(c), 0) * length * heights[3]
+    else:
+        # circular luminous area of diameter length
+        bottom = np.pi * length ** 2 / 4
+        sides = length * np.mean(heights)
+    return bottom * np.maximum(np.cos(gamma), 0) + sides * np.sin(gamma)
+
+
+def ugr_table(ldt, height=2., spacing=.25, flux=None):
+    """Compute UGR table of luminaire.
+
+    Args:
+        ldt (obj): LDT object with luminous dimensions
+        height (float, optional): height of luminaires above eye [m]
+        spacing (float, optional): spacing of luminaires in multiples
+            of height
+        flux (float, optional): flux of lamps [lm], by default total
+            flux of the first set of lamps
+
+    Returns --
+        (dict): 'crosswise' and 'endwise' UGR, matrices of shape
+            (rooms, reflectances), see ROOMS and REFLECTANCES
+    """
+    document = ldt.document
+    if document['luminous_length'] <= 0:
+        raise ValueError('luminous area is not given')
+    if flux is None:
+        flux = document['lamps'][0]['total_flux']
+    scale = flux / 1000 * document['conversion_factor']
+    views, counts = _geometry(height, spacing)
+    bounds = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # background luminance for each room and reflectances
+    table = ldt.flux()
+    # flux table already includes conversion factor
+    output = table.total * flux / 1000
+    downward = table.downward
+    rooms = np.array(ROOMS, dtype=np.float64) * height
+    # direct ratios are given for work plane 0.85 m above floor
+    above = height + EYE_HEIGHT - .85
+    room_index = rooms.prod(axis=1) / (above * rooms.sum(axis=1))
+    direct = np.interp(room_index, ROOM_INDICES,
+                       ldt.compute_direct_ratios())
+    ceiling, walls, floor = np.array(REFLECTANCES).T[:, None, :]
+    horizontal = rooms.prod(axis=1)[:, None]
+    vertical = (2 * rooms.sum(axis=1) * (height + EYE_HEIGHT))[:, None]
+    reflected = counts[:, None] * output\
+        * (downward * (direct[:, None] * floor + (1 - direct[:, None])
+                       * walls) + (1 - downward) * ceiling)
+    mean = (horizontal * (ceiling + floor) + vertical * walls)\
+        / (2 * horizontal + vertical)
+    background = reflected / ((2 * horizontal + vertical) * (1 - mean))\
+        / np.pi
+    results = {}
+    for name, (c, gamma, distance, index) in zip(('crosswise', 'endwise'),
+                                                 views):
+        area = _projected_area(document, c, gamma)
+        intensities = ldt.intensity_at(c, gamma) * scale
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # L ** 2 omega = I ** 2 / (A r ** 2)
+            terms = np.where(area > 0, intensities ** 2
+                             / (area * distance) / index ** 2, 0)
+        sums = np.add.reduceat(terms, bounds)
+        with np.errstate(divide='ignore'):
+            results[name] = 8 * np.log10(.25 / background * sums[:, None])
+    return results
+
+
+def ugr_tables(ldts, height=2., spacing=.25):
+    """Compute UGR tables of many luminaires.
+
+    Geometry of standard rooms is computed once and shared.
+
+    Args:
+        ldts (iterable): LDT objects
+        height (float, optional): height of luminaires above eye [m]
+        spacing (float, optional): spacing of luminaires in multiples
+            of height
+
+    Returns --
+        (list): UGR tables, see ugr_table
+    """
+    return [ugr_table(ldt, height, spacing) for ldt in ldts]
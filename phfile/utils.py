@@ -7,6 +7,46 @@ Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
 """
 
 
+import codecs
+
+
+def detect_encoding(data):
+    """Detect encoding of text.
+
+    Args:
+        data (bytes): encoded text
+
+    Returns --
+        str: utf-8 (utf-8-sig with BOM), cp1252 or latin-1, the first
+            which decodes data
+    """
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    else:
+        return 'utf-8-sig' if data.startswith(codecs.BOM_UTF8) else 'utf-8'
+    try:
+        data.decode('cp1252')
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'cp1252'
+
+
+def decode(data, encoding=None):
+    """Decode text.
+
+    Args:
+        data (bytes): encoded text
+        encoding (str, optional): encoding, by default utf-8 (with
+            optional BOM), cp1252 and latin-1 are tried in this order
+
+    Returns --
+        str: decoded text
+    """
+    return data.decode(encoding or detect_encoding(data))
+
+
 def safe_filename(str, ext):
     """Safe file name.
 
@@ -0,0 +1,441 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Validators.
+
+Copyright (c) 2018 Przemysław Kaliś przemek.kalis@gmail.com
+
+"""
+
+
+from collections.abc import Mapping, Sequence
+from copy import copy
+import threading
+
+import numpy as np
+
+
+_MISSING = object()
+
+# same type definitions as in cerberus, (included types, excluded types)
+_TYPES = {
+    'dict': ((Mapping, ), ()),
+    'float': ((float, int), ()),
+    'integer': ((int, ), ()),
+    'list': ((Sequence, ), (str, )),
+    'ndarray': ((np.ndarray, ), ()),
+    'string': ((str, ), ()),
+}
+
+_compiled_schemas = {}
+
+_shared_validators = {}
+_shared_lock = threading.Lock()
+
+
+def _reference_validator():
+    """Create cerberus based validator class.
+
+    Cerberus is imported on first use of strict validation only.
+
+    Returns --
+        (type): Validator class
+    """
+    import cerberus
+
+    class Validator(cerberus.Validator):
+        """Cerberus validator aware of numpy arrays.
+
+        Used as strict / reference validator, see CompiledValidator.
+        """
+
+        types_mapping = {
+            **cerberus.Validator.types_mapping,
+            'ndarray': cerberus.TypeDefinition('ndarray',
+                                               (np.ndarray, ), ()),
+        }
+
+        def _validate_finite(self, finite, field, value):
+            """{'type': 'boolean'}"""
+            if finite and isinstance(value, np.ndarray)\
+                    and not np.isfinite(value).all():
+                self._error(field, 'must be finite')
+
+        def _validate_max(self, max_value, field, value):
+            """{'nullable': False }"""
+            if isinstance(value, np.ndarray):
+                if (value > max_value).any():
+                    self._error(field, cerberus.errors.MAX_VALUE)
+            else:
+                super()._validate_max(max_value, field, value)
+
+        def _validate_min(self, min_value, field, value):
+            """{'nullable': False }"""
+            if isinstance(value, np.ndarray):
+                if (value < min_value).any():
+                    self._error(field, cerberus.errors.MIN_VALUE)
+            else:
+                super()._validate_min(min_value, field, value)
+
+        def _validate_monotonic(self, monotonic, field, value):
+            """{'type': 'boolean'}"""
+            if monotonic and isinstance(value, np.ndarray)\
+                    and not (np.diff(value.ravel()) > 0).all():
+                self._error(field, 'must be strictly increasing')
+
+    return Validator
+
+
+def _cerberus_validator():
+    """Return reference Validator class, created once on first call."""
+    if 'Validator' not in globals():
+        globals()['Validator'] = _reference_validator()
+    return globals()['Validator']
+
+
+def __getattr__(name):
+    """Create reference Validator class on first access."""
+    if name == 'Validator':
+        return _cerberus_validator()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def _check_allowed(allowed):
+    def check(value):
+        if value not in allowed:
+            return 'unallowed value %s' % (value, )
+    return check
+
+
+def _check_finite(finite):
+    def check(value):
+        if finite and isinstance(value, np.ndarray)\
+                and not np.isfinite(value).all():
+            return 'must be finite'
+    return check
+
+
+def _check_max(max_value):
+    def check(value):
+        if isinstance(value, np.ndarray):
+            failed = (value > max_value).any()
+        else:
+            try:
+                failed = value > max_value
+            except TypeError:
+                failed = False
+        if failed:
+            return 'max value is %s' % (max_value, )
+    return check
+
+
+def _check_maxlength(max_length):
+    def check(value):
+        if len(value) > max_length:
+            return 'max length is %s' % (max_length, )
+    return check
+
+
+def _check_min(min_value):
+    def check(value):
+        if isinstance(value, np.ndarray):
+            failed = (value < min_value).any()
+        else:
+            try:
+                failed = value < min_value
+            except TypeError:
+                failed = False
+        if failed:
+            return 'min value is %s' % (min_value, )
+    return check
+
+
+def _check_minlength(min_length):
+    def check(value):
+        if len(value) < min_length:
+            return 'min length is %s' % (min_length, )
+    return check
+
+
+def _check_monotonic(monotonic):
+    def check(value):
+        if monotonic and isinstance(value, np.ndarray)\
+                and not (np.diff(value.ravel()) > 0).all():
+            return 'must be strictly increasing'
+    return check
+
+
+_CHECKS = {
+    'allowed': _check_allowed,
+    'finite': _check_finite,
+    'max': _check_max,
+    'maxlength': _check_maxlength,
+    'min': _check_min,
+    'minlength': _check_minlength,
+    'monotonic': _check_monotonic,
+}
+
+
+class _Field(object):
+    """Compiled rules of single field."""
+
+    __slots__ = (
+        'checks',
+        'coerce',
+        'default',
+        'items',
+        'mapping',
+        'nullable',
+        'required',
+        'type',
+    )
+
+    def __init__(self, rules):
+        """Class constructor.
+
+        Args:
+            rules (dict): field rules from validation schema
+        """
+        coerce = rules.get('coerce', ())
+        self.coerce = coerce if isinstance(coerce, tuple) else (coerce, )
+        self.default = rules.get('default', _MISSING)
+        self.nullable = rules.get('nullable', False)
+        self.required = rules.get('required', False)
+        self.type = rules.get('type')
+        self.checks = []
+        self.items = None
+        self.mapping = None
+        for rule, constraint in rules.items():
+            if rule in _CHECKS:
+                self.checks.append(_CHECKS[rule](constraint))
+            elif rule == 'schema' and self.type == 'list':
+                self.items = _Field(constraint)
+            elif rule == 'schema' and self.type == 'dict':
+                self.mapping = compile_schema(constraint)
+            elif rule not in ('coerce', 'default', 'nullable',
+                              'required', 'type'):
+                raise ValueError('rule %s is not supported' % rule)
+
+    def coerced(self, field, value):
+        """Return coerced value and coercion errors."""
+        if not self.coerce:
+            return value, []
+        try:
+            result = value
+            for func in self.coerce:
+                result = func(result)
+        except Exception as e:
+            return value, ["field '%s' cannot be coerced: %s" % (field, e)]
+        return result, []
+
+    def processed(self, value, update):
+        """Return normalized value and validation errors."""
+        if value is None:
+            return value, [] if self.nullable else ['null value not allowed']
+        if self.type is not None:
+            included, excluded = _TYPES[self.type]
+            if not isinstance(value, included)\
+                    or isinstance(value, excluded):
+                return value, ['must be of %s type' % self.type]
+        errors = [error for error in (check(value) for check in self.checks)
+                  if error]
+        if self.items is not None:
+            value = list(value)
+            items_errors = {}
+            for i, item in enumerate(value):
+                item, coerce_errors = self.items.coerced(i, item)
+                value[i], item_errors = self.items.processed(item, update)
+                if item_errors + coerce_errors:
+                    items_errors[i] = item_errors + coerce_errors
+            if items_errors:
+                errors.append(items_errors)
+        if self.mapping is not None:
+            value, mapping_errors = _process(self.mapping, value, update,
+                                             nested=True)
+            if mapping_errors:
+                errors.append(mapping_errors)
+        return value, errors
+
+
+def _process(fields, document, update, nested=False):
+    """Normalize and validate document against compiled schema.
+
+    Follows the order of cerberus processing: defaults, coercion, then
+    validation rules; for nested documents cerberus reports coercion
+    errors after the validation ones.
+
+    Returns --
+        (tuple): normalized document, errors
+    """
+    document = copy(document)
+    errors = {}
+    for field, rules in fields.items():
+        if rules.default is not _MISSING and document.get(field) is None\
+                and (field not in document or not rules.nullable):
+            document[field] = rules.default
+    for field, value in document.items():
+        rules = fields.get(field)
+        if rules is None:
+            errors[field] = ['unknown field']
+            continue
+        value, coerce_errors = rules.coerced(field, value)
+        document[field], field_errors = rules.processed(value, update)
+        field_errors = field_errors + coerce_errors if nested\
+            else coerce_errors + field_errors
+        if field_errors:
+            errors[field] = field_errors
+    if not update:
+        errors.update({field: ['required field']
+                       for field, rules in fields.items()
+                       if rules.required and field not in document})
+    return document, errors
+
+
+def compile_schema(schema):
+    """Compile validation schema.
+
+    Compiled schemas are cached, each schema is compiled only once.
+
+    Args:
+        schema (dict): validation schema
+
+    Returns --
+        (dict): compiled rules of fields
+    """
+    try:
+        return _compiled_schemas[id(schema)][1]
+    except KeyError:
+        fields = {field: _Field(rules) for field, rules in schema.items()}
+        # reference to schema keeps its id unique
+        _compiled_schemas[id(schema)] = (schema, fields)
+        return fields
+
+
+class CompiledValidator(object):
+    """Fast validator for schemas used by phfile.
+
+    Mimics cerberus.Validator interface (schema, validate, document,
+    errors), supported rules are checked directly, numeric arrays are
+    checked as a whole.
+    """
+
+    __slots__ = (
+        '_fields',
+        '_schema',
+        'document',
+        'errors',
+    )
+
+    def __init__(self, schema=None):
+        """Class constructor.
+
+        Args:
+            schema (dict, optional): validation schema
+        """
+        self._fields = {}
+        self._schema = None
+        self.document = None
+        self.errors = {}
+        if schema is not None:
+            self.schema = schema
+
+    @property
+    def schema(self):
+        """Return validation schema.
+
+        Returns --
+            (dict): schema
+        """
+        return self._schema
+
+    @schema.setter
+    def schema(self, schema):
+        """."""
+        self._fields = compile_schema(schema)
+        self._schema = schema
+
+    def validate(self, document, update=False):
+        """Normalize and validate document.
+
+        Args:
+            document (dict): document for validation
+            update (bool, optional): skip checking of required fields
+
+        Returns --
+            (bool): True if document is valid
+        """
+        self.document, self.errors = _process(self._fields, document, update)
+        return not self.errors
+
+
+class SharedValidator(object):
+    """Validator shared by all objects using the same schema.
+
+    Wraps single compiled or cerberus validator, calls of validate()
+    are serialised with lock and results are returned instead of being
+    kept, see shared_validator.
+    """
+
+    __slots__ = (
+        '_lock',
+        '_validator',
+        'strict',
+    )
+
+    def __init__(self, schema, strict=False):
+        """Class constructor.
+
+        Args:
+            schema (dict): validation schema
+            strict (bool, optional): use cerberus (reference) validator
+        """
+        self._lock = threading.Lock()
+        self._validator = _cerberus_validator()(schema) if strict\
+            else CompiledValidator(schema)
+        self.strict = strict
+
+    @property
+    def schema(self):
+        """Return validation schema.
+
+        Returns --
+            (dict): schema
+        """
+        return self._validator.schema
+
+    def validate(self, document, update=False):
+        """Normalize and validate document.
+
+        Args:
+            document (dict): document for validation
+            update (bool, optional): skip checking of required fields
+
+        Returns --
+            (tuple): normalized document, errors
+        """
+        with self._lock:
+            self._validator.validate(document, update=update)
+            return self._validator.document, self._validator.errors
+
+
+def shared_validator(schema, strict=False):
+    """Return validator shared by all objects using schema.
+
+    Validators are created once per schema, thread-safe.
+
+    Args:
+        schema (dict): validation schema
+        strict (bool, optional): use cerberus (reference) validator
+
+    Returns --
+        (obj): SharedValidator
+    """
+    key = (id(schema), strict)
+    try:
+        return _shared_validators[key][1]
+    except KeyError:
+        with _shared_lock:
+            if key not in _shared_validators:
+                # reference to schema keeps its id unique
+                _shared_validators[key] = (schema,
+                                           SharedValidator(schema, strict))
+            return _shared_validators[key][1]
@@ -11,6 +11,11 @@ from setuptools import setup
 
 setup(author='Przemek Kaliś',
       author_email='przemek.kalis@gmail.com',
+      entry_points={
+        'console_scripts': [
+            'phfile = phfile.cli:main',
+        ],
+      },
       description=('(very) Simple library for keeping and manipulating'
                    + ' photometric data in LDT and IES formats.'),
       install_requires=[